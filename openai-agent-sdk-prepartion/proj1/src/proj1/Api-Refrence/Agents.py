@@ -101,6 +101,7 @@ import os
 from dotenv import load_dotenv
 from dataclasses import dataclass
 from agents.extensions.handoff_prompt import RECOMMENDED_PROMPT_PREFIX
+from proj1.instruction_builder import InstructionBuilder
 
 
 
@@ -138,8 +139,10 @@ class User:
     name:str
 
 
-def customer_support_instruction(context:RunContextWrapper[User],agent:Agent):
-    return f" you are customer support agent which first greeting to user with his name {context.context.name} your task is to process user query if he ask about facebook password reset"
+customer_support_instruction = InstructionBuilder(
+    static=["you are customer support agent which first greeting to user with his name, your task is to process user query if he ask about facebook password reset"],
+    dynamic=[lambda context, agent: f"The user's name is {context.context.name}."],
+)
 
 user = User(name="shiraz")
 
@@ -7,6 +7,7 @@ from dotenv import load_dotenv
 from openai.types.responses import ResponseTextDeltaEvent
 from typing import Any
 import asyncio
+from proj1.stream_output import StdoutSink, stream_text
 
 load_dotenv()
 
@@ -49,9 +50,9 @@ async def main():
             run_config=config,
             # max_turns=0
             )
-    async for event in response.stream_events():
-        if event.type == "raw_response_event" and isinstance(event.data , ResponseTextDeltaEvent):
-            print(event.data.delta, end=" ", flush=True)
+    # Text deltas are written in coalesced chunks instead of one print and flush per token
+    stats = await stream_text(response, StdoutSink(), max_latency=0.05)
+    print(f"\n{stats.events} deltas in {stats.flushes} writes")
 
 
 
@@ -18,6 +18,8 @@ from openai import AsyncOpenAI
 from typing import cast
 import os
 from dotenv import load_dotenv
+from proj1.output_schema import output_schema
+from proj1.early_exit import run_until_fields
 from pydantic import BaseModel
 
 load_dotenv()
@@ -66,7 +68,7 @@ class MathOutput(BaseModel):
 guardial_agent:Agent = Agent(
     name="Guardial Check",
     instructions= "Check if the output includes any math",
-    output_type= MathOutput,
+    output_type= output_schema(MathOutput),
     model=model
 )
 
@@ -82,10 +84,11 @@ guardial_agent:Agent = Agent(
 
 @output_guardrail
 async def math_guardrail(context:RunContextWrapper[None], agent:Agent,input:str)-> GuardrailFunctionOutput:
-    response = await Runner.run(guardial_agent,input=input,context=context.context,run_config=config)
+    response = await run_until_fields(guardial_agent, input, fields=("is_math",), context=context.context, run_config=config)
     return GuardrailFunctionOutput(
-        output_info=response.final_output,
-        tripwire_triggered = response.final_output.is_math
+        output_info=response.output,
+        # The model may leave the field out; without it the output can't be cleared
+        tripwire_triggered = response.fields.get("is_math", True)
     )
 
 async def main():
@@ -11,6 +11,9 @@ from typing import cast
 import os
 from dotenv import load_dotenv
 from agents.handoffs import HandoffInputData
+from proj1.tool_executor import concurrent_function_tool
+from proj1.tool_policy import ToolPolicy, guarded_tool
+from proj1.usage_ledger import MeteredModel, UsageLedger
 
 load_dotenv()
 
@@ -26,10 +29,10 @@ external_client = AsyncOpenAI(
     base_url="https://generativelanguage.googleapis.com/v1beta/openai",
 )
 
-model = OpenAIChatCompletionsModel(
+model = MeteredModel(OpenAIChatCompletionsModel(
     model="gemini-2.0-flash",
     openai_client=external_client,
-)
+))
 
 config = RunConfig(
     model=model,
@@ -123,7 +126,8 @@ def privacy_focused_filter(input_data: HandoffInputData) -> HandoffInputData:
 # DEMO TOOLS FOR TESTING
 # =============================================================================
 
-@function_tool
+@guarded_tool(ToolPolicy(deadline=2.0, idempotent=True, fallback="Customer information is temporarily unavailable."))
+@concurrent_function_tool(failure_error_function=None)
 def get_customer_info(customer_id: str) -> str:
     """Simulate getting customer information."""
     return f"Customer {customer_id}: Premium member since 2020, last contact 2 days ago"
@@ -316,4 +320,7 @@ async def main():
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    # Handoffs and every test case are counted together, the runs stop once the budget is used up
+    with UsageLedger("hanoff2", max_tokens=50_000).activate() as ledger:
+        asyncio.run(main())
+    print(ledger.report())
@@ -3,6 +3,7 @@ from openai import AsyncOpenAI
 from typing import cast
 import os
 from dotenv import load_dotenv
+from proj1.usage_ledger import MeteredModel, UsageLedger
 
 load_dotenv()
 
@@ -18,10 +19,10 @@ external_client = AsyncOpenAI(
     base_url="https://generativelanguage.googleapis.com/v1beta/openai/",
 )
 
-model = OpenAIChatCompletionsModel(
+model = MeteredModel(OpenAIChatCompletionsModel(
     model="gemini-2.0-flash",
     openai_client=external_client,
-)
+))
 
 
 
@@ -57,7 +58,10 @@ panacloud_agent: Agent = Agent(
     model=model,
 )
 
-response = Runner.run_sync(panacloud_agent, "who is founder of pakistan", run_config=config)
+# include_usage reports tokens per response, the ledger adds them up and caps the whole request
+with UsageLedger("modelsettings", max_tokens=2_000).activate() as ledger:
+    response = Runner.run_sync(panacloud_agent, "who is founder of pakistan", run_config=config)
+print(ledger.report())
 print(response)
 print(response.final_output)
 print(response.raw_responses)
@@ -1,7 +1,7 @@
 
 from agents import Agent, Runner, set_tracing_disabled, OpenAIChatCompletionsModel, RunConfig, ModelProvider,function_tool,ItemHelpers
 from openai import AsyncOpenAI
-from openai.types.responses import ResponseTextDeltaEvent
+from proj1.stream_output import StdoutSink, stream_text
 from typing import cast
 import os
 from dotenv import load_dotenv
@@ -52,11 +52,8 @@ async def run_panacloud_agent():
 
     response = Runner.run_streamed(panacloud_agent, "what is current weather", run_config=config)
 
-    async for event in response.stream_events():
-        if event.type == "raw_response_event" and isinstance(event.data, ResponseTextDeltaEvent):
-            print(event.data.delta, end = "", flush=True)
-            # print()
-            # print(event.type)
+    stats = await stream_text(response, StdoutSink(), max_chars=256, max_latency=0.05)
+    print(f"\n{stats.events} deltas written in {stats.flushes} flushes ({stats.events_per_flush:.1f} per flush)")
         
        
         
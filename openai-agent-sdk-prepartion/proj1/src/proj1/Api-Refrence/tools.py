@@ -1,10 +1,12 @@
-from agents import Agent, Runner, set_tracing_disabled, OpenAIChatCompletionsModel, RunConfig, ModelProvider,RunContextWrapper,function_tool,
+from agents import Agent, Runner, set_tracing_disabled, OpenAIChatCompletionsModel, RunConfig, ModelProvider,RunContextWrapper,function_tool
 from openai import AsyncOpenAI
 from typing import cast, Any
 import os
 from dotenv import load_dotenv
 from agents import FunctionTool
 import json
+from pathlib import Path
+from proj1.tool_registry import ToolRegistry, install_converter_cache
 
 
 load_dotenv()
@@ -33,9 +35,12 @@ config = RunConfig(
 
 )
 
+# Schemas are cached on disk next to this file, keyed by the function source, so a restart skips rebuilding them
+registry = ToolRegistry(Path(__file__).with_name(".tool_schemas.json"))
+install_converter_cache(registry)
 
 
-@function_tool(
+@registry.tool(
         name_override="Add_two_numbers",
         description_override="This tool add two numbers", 
         strict_mode=True ,
@@ -46,6 +51,8 @@ config = RunConfig(
 def calculator(a,b):
     return a+b
 
+registry.save()
+
 
 panacloud_agent: Agent = Agent(
     name="panacloud_agent",
@@ -21,6 +21,9 @@ from agents.tracing import (
     Trace,
 )
 from agents.handoffs import handoff
+from proj1.tool_cache import cached_tool
+from proj1.tool_executor import CpuTimeExceeded, concurrent_function_tool
+from proj1.output_schema import output_schema
 from pydantic import BaseModel
 import os
 from dotenv import load_dotenv
@@ -103,7 +106,7 @@ set_trace_processors([custom_processor])
 
 # ================== TOOLS DEFINITION ==================
 
-@function_tool
+@concurrent_function_tool(executor="process", cpu_time_limit=2.0)
 def calculate_math(expression: str) -> str:
     """Calculate mathematical expressions safely."""
     try:
@@ -114,9 +117,12 @@ def calculate_math(expression: str) -> str:
             return f"Result: {expression} = {result}"
         else:
             return "Error: Only basic mathematical operations are allowed"
+    except CpuTimeExceeded:
+        raise
     except Exception as e:
         return f"Error calculating {expression}: {str(e)}"
 
+@cached_tool(ttl=600)
 @function_tool
 def get_weather_info(city: str) -> str:
     """Get weather information for a city (simulated)."""
@@ -129,6 +135,7 @@ def get_weather_info(city: str) -> str:
     }
     return weather_data.get(city, f"Weather data not available for {city}")
 
+@cached_tool
 @function_tool
 def get_pakistan_history(figure: str) -> str:
     """Get historical information about Pakistani figures."""
@@ -160,7 +167,7 @@ class HistoryCheckOutput(BaseModel):
 math_check_agent = Agent(
     name="MathCheckAgent",
     instructions="Check if the user input contains mathematical expressions or calculations. Return true if it's math-related, false otherwise.",
-    output_type=MathCheckOutput,
+    output_type=output_schema(MathCheckOutput),
     model=model
 )
 
@@ -168,7 +175,7 @@ math_check_agent = Agent(
 safety_check_agent = Agent(
     name="SafetyCheckAgent", 
     instructions="Check if the user input is safe and appropriate. Return true if it's safe, false if it contains inappropriate content.",
-    output_type=ContentSafetyOutput,
+    output_type=output_schema(ContentSafetyOutput),
     model=model
 )
 
@@ -176,7 +183,7 @@ safety_check_agent = Agent(
 history_check_agent = Agent(
     name="HistoryCheckAgent",
     instructions="Check if the user input is asking about Pakistani history or historical figures. Return true if it's history-related, false otherwise.",
-    output_type=HistoryCheckOutput,
+    output_type=output_schema(HistoryCheckOutput),
     model=model
 )
 
@@ -23,6 +23,8 @@ Based on: https://openai.github.io/openai-agents-python/tracing/
 import asyncio
 from agents import Agent, Runner, function_tool
 from agents.handoffs import handoff
+from proj1.tool_cache import cached_tool
+from proj1.tool_executor import CpuTimeExceeded, concurrent_function_tool
 from agents import Agent, Runner, set_tracing_disabled, OpenAIChatCompletionsModel, RunConfig, ModelProvider
 from openai import AsyncOpenAI
 from typing import cast
@@ -55,6 +57,22 @@ config = RunConfig(
 
 )
 
+# Runs in a worker process so a heavy expression does not stall the event loop.
+# Process tools have to be defined at module level.
+@concurrent_function_tool(executor="process", cpu_time_limit=2.0)
+def complex_calculation(expression: str) -> str:
+    """Perform a complex calculation with multiple steps."""
+    try:
+        # This tool execution creates a Function Span
+        # Note: In production, use safer evaluation
+        result = eval(expression)
+        return f"Calculation result: {expression} = {result}"
+    except CpuTimeExceeded:
+        # Let the executor see it, so the limit shows up in the span and in process_pool_stats
+        raise
+    except Exception:
+        return f"Could not calculate: {expression}"
+
 # ================== SPAN TYPES DEMONSTRATION ==================
 
 
@@ -172,6 +190,7 @@ async def demo_function_spans():
         else:
             return f"Unsupported shape: {shape}"
 
+    @cached_tool(ttl=600)
     @function_tool
     def get_weather_info(city: str) -> str:
         """Get weather information for a city (simulated)."""
@@ -292,17 +311,6 @@ async def demo_span_hierarchy():
     print("           └── 📈 Generation Span: Specialist LLM call")
     print()
 
-    @function_tool
-    def complex_calculation(expression: str) -> str:
-        """Perform a complex calculation with multiple steps."""
-        try:
-            # This tool execution creates a Function Span
-            # Note: In production, use safer evaluation
-            result = eval(expression)
-            return f"Calculation result: {expression} = {result}"
-        except:
-            return f"Could not calculate: {expression}"
-
     hierarchy_agent = Agent(
         name="HierarchyDemoAgent",
         instructions="""
@@ -4,6 +4,8 @@ from typing import cast
 import os
 from dotenv import load_dotenv
 from pydantic import BaseModel
+from proj1.instruction_builder import InstructionBuilder
+from proj1.instruction_cache import cached_instructions
 
 
 load_dotenv()
@@ -20,10 +22,16 @@ class UserContext(BaseModel):
     name:str
     is_alive:bool
 
-def dynamic_instructions(
-    context: RunContextWrapper[UserContext], agent: Agent[UserContext]
-) -> str:
-    return f"The user's name is {context.context.name}. Help them with their questions."
+# The static part comes first so it stays byte-identical across users and can be cached by the provider,
+# and the rendered text is reused for as long as the user's name is the same
+dynamic_instructions = cached_instructions(
+    InstructionBuilder(
+        static=["Help the user with their questions."],
+        dynamic=[lambda context, agent: f"The user's name is {context.context.name}."],
+    ),
+    fields=("name",),
+    name="dynamic_instructions",
+)
 
 
 
@@ -0,0 +1,268 @@
+"""
+Compile the agents reachable from a root agent into lookup tables, once.
+
+On every turn the runner rebuilds the current agent's handoff list. Each bare `Agent` in
+`handoffs=[...]` becomes a fresh `handoff(agent)` (name transform, JSON schema, strict pass), and then
+every tool and handoff is converted into a request tool spec again. `AgentGraph.compile` walks all
+agents reachable through handoffs and `as_tool()` once, and precomputes:
+
+- name -> agent, and per agent: tool name -> tool, handoff tool name -> target agent
+- the `Handoff` objects of every agent, and each agent's tool specs in Chat Completions form
+- handoff cycles (e.g. a specialist handing back to triage) and `as_tool()` recursion
+
+`install()` makes the runner use the precompiled handoffs and tool specs of compiled agents, and
+`uninstall()` (or leaving `with graph:`) stops it again. Anything the graph does not know about, and
+any agent whose `handoffs` or `tools` were changed after compiling, still goes through the SDK's
+normal path.
+
+    graph = AgentGraph.compile(triage_agent)
+    graph.install()
+    print(graph.describe())
+"""
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass, field
+from typing import Any
+
+from agents import Agent, FunctionTool, Handoff, Runner, handoff
+from agents.models.chatcmpl_converter import Converter
+
+from proj1.converter_hooks import add_tool_spec_lookup, remove_tool_spec_lookup
+
+
+def _captured_agent(func: Any, depth: int = 3) -> Agent[Any] | None:
+    """
+    The agent captured by a closure, which is how `handoff()` and `as_tool()` remember their agent.
+
+    `as_tool()` wraps its inner function with `function_tool`, so nested closures are searched too.
+    """
+    nested = []
+    for cell in getattr(func, "__closure__", None) or ():
+        try:
+            value = cell.cell_contents
+        except ValueError:
+            continue
+        if isinstance(value, Agent):
+            return value
+        if callable(value):
+            nested.append(value)
+    if depth > 1:
+        for inner in nested:
+            agent = _captured_agent(inner, depth - 1)
+            if agent is not None:
+                return agent
+    return None
+
+
+@dataclass
+class CompiledAgent:
+    agent: Agent[Any]
+    tools: dict[str, Any] = field(default_factory=dict)
+    handoffs: list[Handoff[Any]] = field(default_factory=list)
+    handoff_targets: dict[str, Agent[Any]] = field(default_factory=dict)
+    """Handoff tool name (e.g. `me_math_agent_ko_transfer_kr_raha_ho`) -> target agent."""
+    agent_tools: dict[str, Agent[Any]] = field(default_factory=dict)
+    """Tool name -> agent, for tools created with `as_tool()`."""
+    tool_specs: list[dict[str, Any]] = field(default_factory=list)
+    tool_specs_json: bytes = b"[]"
+    handoff_items: tuple[Any, ...] = ()
+    tool_items: tuple[Any, ...] = ()
+    """`agent.handoffs` and `agent.tools` as compiled, to notice when they were changed later."""
+
+    def is_current(self, agent: Agent[Any]) -> bool:
+        return (
+            self.agent is agent
+            and _same_items(self.handoff_items, agent.handoffs)
+            and _same_items(self.tool_items, agent.tools)
+        )
+
+
+def _same_items(compiled: tuple[Any, ...], current: list[Any]) -> bool:
+    return len(compiled) == len(current) and all(a is b for a, b in zip(compiled, current))
+
+
+_installed: list[AgentGraph] = []
+_originals: dict[str, Any] = {}
+
+
+def _compiled_for(agent: Agent[Any]) -> CompiledAgent | None:
+    for graph in _installed:
+        compiled = graph.compiled.get(id(agent))
+        if compiled is not None and compiled.is_current(agent):
+            return compiled
+    return None
+
+
+def _spec_for(owner: Any) -> dict[str, Any] | None:
+    for graph in _installed:
+        entry = graph._specs.get(id(owner))
+        if entry is not None and entry[0] is owner:
+            return entry[1]
+    return None
+
+
+def _get_handoffs(cls: type[Runner], agent: Agent[Any]) -> list[Handoff[Any]]:
+    compiled = _compiled_for(agent)
+    return compiled.handoffs if compiled is not None else _originals["_get_handoffs"](cls, agent)
+
+
+def _convert_handoff_tool(cls: type[Converter], handoff: Handoff[Any]) -> Any:
+    spec = _spec_for(handoff)
+    return spec if spec is not None else _originals["convert_handoff_tool"](cls, handoff)
+
+
+_patches = ((Runner, "_get_handoffs", _get_handoffs), (Converter, "convert_handoff_tool", _convert_handoff_tool))
+
+
+class AgentGraph:
+    def __init__(self, root: Agent[Any]):
+        self.root = root
+        self.agents: dict[str, Agent[Any]] = {}
+        self.compiled: dict[int, CompiledAgent] = {}
+        self.cycles: list[list[str]] = []
+        self.tool_cycles: list[list[str]] = []
+        self._specs: dict[int, tuple[Any, dict[str, Any]]] = {}
+        """id(tool or handoff) -> (the object itself, its spec), the object is compared on lookup."""
+
+    @classmethod
+    def compile(cls, root: Agent[Any], known_agents: list[Agent[Any]] | None = None) -> AgentGraph:
+        """
+        Walk every agent reachable from `root` through handoffs and agent tools.
+
+        Handoff targets are recovered from the `handoff()` closure. `known_agents` is a fallback by
+        name for handoffs built some other way.
+        """
+        graph = cls(root)
+        by_name = {agent.name: agent for agent in known_agents or []}
+        pending = [root]
+        while pending:
+            agent = pending.pop()
+            if id(agent) in graph.compiled:
+                continue
+            if graph.agents.get(agent.name, agent) is not agent:
+                raise ValueError(f"Two different agents are named {agent.name!r}, lookups by name would be ambiguous")
+            graph.agents[agent.name] = agent
+            compiled = graph.compiled[id(agent)] = CompiledAgent(
+                agent, handoff_items=tuple(agent.handoffs), tool_items=tuple(agent.tools)
+            )
+
+            for item in agent.handoffs:
+                target = item if isinstance(item, Agent) else _captured_agent(item.on_invoke_handoff)
+                target = target or by_name.get(item.agent_name)
+                compiled_handoff = handoff(item) if isinstance(item, Agent) else item
+                compiled.handoffs.append(compiled_handoff)
+                if target is not None:
+                    compiled.handoff_targets[compiled_handoff.tool_name] = target
+                    pending.append(target)
+
+            for tool in agent.tools:
+                compiled.tools[tool.name] = tool
+                target = _captured_agent(tool.on_invoke_tool) if isinstance(tool, FunctionTool) else None
+                if target is not None:
+                    compiled.agent_tools[tool.name] = target
+                    pending.append(target)
+
+            for tool in agent.tools:
+                if isinstance(tool, FunctionTool):
+                    compiled.tool_specs.append(graph._spec(tool, Converter.tool_to_openai(tool)))
+            for compiled_handoff in compiled.handoffs:
+                compiled.tool_specs.append(graph._spec(compiled_handoff, Converter.convert_handoff_tool(compiled_handoff)))
+            compiled.tool_specs_json = json.dumps(compiled.tool_specs, separators=(",", ":")).encode()
+
+        graph.cycles = graph._find_cycles(lambda c: c.handoff_targets.values())
+        graph.tool_cycles = graph._find_cycles(lambda c: c.agent_tools.values())
+        return graph
+
+    def _spec(self, owner: Any, spec: dict[str, Any]) -> dict[str, Any]:
+        self._specs[id(owner)] = (owner, spec)
+        return spec
+
+    def _find_cycles(self, edges: Any) -> list[list[str]]:
+        """Each cycle once, as the agent names along it, found with an iterative DFS."""
+        cycles: list[list[str]] = []
+        seen_cycles: set[frozenset[str]] = set()
+        state: dict[int, int] = {}  # 1 = on the current path, 2 = done
+        for start in self.compiled.values():
+            if id(start.agent) in state:
+                continue
+            path: list[Agent[Any]] = [start.agent]
+            stack = [iter(edges(start))]
+            state[id(start.agent)] = 1
+            while stack:
+                target = next(stack[-1], None)
+                if target is None:
+                    state[id(path.pop())] = 2
+                    stack.pop()
+                    continue
+                if state.get(id(target)) == 1:
+                    cycle = [a.name for a in path[path.index(target):]]
+                    if frozenset(cycle) not in seen_cycles:
+                        seen_cycles.add(frozenset(cycle))
+                        cycles.append(cycle + [target.name])
+                elif id(target) not in state:
+                    state[id(target)] = 1
+                    path.append(target)
+                    stack.append(iter(edges(self.compiled[id(target)])))
+        return cycles
+
+    def agent(self, name: str) -> Agent[Any]:
+        return self.agents[name]
+
+    def handoff_target(self, agent: Agent[Any], tool_name: str) -> Agent[Any] | None:
+        return self.compiled[id(agent)].handoff_targets.get(tool_name)
+
+    def tool(self, agent: Agent[Any], name: str) -> Any:
+        return self.compiled[id(agent)].tools.get(name)
+
+    def tool_specs_json(self, agent: Agent[Any]) -> bytes:
+        return self.compiled[id(agent)].tool_specs_json
+
+    def describe(self) -> str:
+        lines = []
+        for compiled in self.compiled.values():
+            targets = ", ".join(f"{name} -> {a.name}" for name, a in compiled.handoff_targets.items())
+            lines.append(f"{compiled.agent.name}: {len(compiled.tools)} tools, handoffs [{targets}]")
+        for cycle in self.cycles:
+            lines.append("handoff cycle: " + " -> ".join(cycle))
+        for cycle in self.tool_cycles:
+            lines.append("agent-as-tool recursion: " + " -> ".join(cycle))
+        return "\n".join(lines)
+
+    def install(self) -> None:
+        """
+        Serve the handoffs and tool specs of compiled agents from the graph inside the runner.
+
+        The SDK methods are patched once for all installed graphs, installing a graph again is a no-op.
+        """
+        for owner, name, wrapper in _patches:
+            if name not in _originals:
+                _originals[name] = owner.__dict__[name].__func__
+                setattr(owner, name, classmethod(wrapper))
+        # Tool specs go through the converter patch shared with the tool registry's cache
+        add_tool_spec_lookup(_spec_for)
+        if self not in _installed:
+            _installed.append(self)
+
+    def uninstall(self) -> None:
+        """
+        Stop serving this graph, the SDK methods are restored once no graph is installed.
+
+        A method that was patched again on top of ours is left alone (our wrapper then just forwards
+        to the SDK, since no graph is installed) so that the other patch keeps working.
+        """
+        if self in _installed:
+            _installed.remove(self)
+        if _installed:
+            return
+        remove_tool_spec_lookup(_spec_for)
+        for owner, name, wrapper in _patches:
+            if name in _originals and getattr(owner.__dict__[name], "__func__", None) is wrapper:
+                setattr(owner, name, classmethod(_originals.pop(name)))
+
+    def __enter__(self) -> AgentGraph:
+        self.install()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.uninstall()
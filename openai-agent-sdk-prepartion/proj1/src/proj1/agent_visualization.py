@@ -4,7 +4,8 @@ from typing import cast
 import os
 from dotenv import load_dotenv
 from pydantic import BaseModel
-from agents.extensions.visualization import draw_graph
+from proj1.graph_export import render_graph
+from proj1.instruction_cache import cached_instructions
 
 
 load_dotenv()
@@ -21,6 +22,8 @@ class UserContext(BaseModel):
     name:str
     is_alive:bool
 
+# Only depends on the name, so it is rendered once per user instead of on every turn
+@cached_instructions(fields=("name",))
 def dynamic_instructions(
     context: RunContextWrapper[UserContext], agent: Agent[UserContext]
 ) -> str:
@@ -55,13 +58,15 @@ panacloud_agent: Agent = Agent[UserContext](
     model=model,
 )
 
+# Needs no model run, and graphviz only runs again when the agent topology changes
+render_graph(panacloud_agent, "agent_graph")
+
 result = Runner.run_sync(panacloud_agent, "hello", run_config=config, context=user)
 for item in result.new_items:
         print(f"Item Type: {item.__class__.__name__}")
 print(result.final_output)
 print(result.raw_responses)
 
-draw_graph(panacloud_agent, filename="agent_graph")
 
 
 
@@ -1,4 +1,8 @@
-from fastapi import FastAPI, HTTPException
+import asyncio
+import logging
+import uuid
+from fastapi import FastAPI, Header, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
 from agents import Agent, Runner, set_tracing_disabled, OpenAIChatCompletionsModel, RunConfig, ModelProvider, trace
 from openai import AsyncOpenAI
@@ -6,10 +10,16 @@ from typing import cast
 import os
 from dotenv import load_dotenv
 from fastapi.middleware.cors import CORSMiddleware
+from proj1.stream_multiplex import StreamMultiplexer, serialize_event
+from proj1.resumable_stream import ResumableRunRegistry, sse_stream
+from proj1.output_schema import output_schema
+from proj1.usage_ledger import BudgetExceeded, MeteredModel, UsageLedger, export_metrics
 
 load_dotenv()
 set_tracing_disabled(disabled=True)
 
+logger = logging.getLogger(__name__)
+
 gemini_api_key = os.getenv("GEMINI_API_KEY")
 if not gemini_api_key:
     raise ValueError("GEMINI_API_KEY is not set. Please ensure it is defined in your .env file.")
@@ -19,10 +29,10 @@ external_client = AsyncOpenAI(
     base_url="https://generativelanguage.googleapis.com/v1beta/openai/",
 )
 
-model = OpenAIChatCompletionsModel(
+model = MeteredModel(OpenAIChatCompletionsModel(
     model="gemini-2.0-flash",
     openai_client=external_client,
-)
+))
 
 config = RunConfig(
     model=model,
@@ -42,7 +52,7 @@ class OutlineCheckerOutput(BaseModel):
 outline_checker_agent = Agent(
     name="outline_checker_agent",
     instructions="Read the given story outline, and judge the quality. Also, determine if it is a scifi story.",
-    output_type=OutlineCheckerOutput,
+    output_type=output_schema(OutlineCheckerOutput),
 )
 
 story_agent = Agent(
@@ -72,6 +82,8 @@ class StoryResponse(BaseModel):
 @app.post("/generate-story", response_model=StoryResponse)
 async def generate_story(request: StoryRequest):
     try:
+        # All three runs share one budget, a story that would go over it is stopped before the next turn
+        with UsageLedger("/generate-story", max_tokens=20_000, max_cost=0.01).activate():
             # Generate outline
             story_outline = await Runner.run(story_outline_agent, request.prompt, run_config=config)
             outline_text = story_outline.final_output
@@ -97,5 +109,100 @@ async def generate_story(request: StoryRequest):
             story_text = story_generate.final_output
 
             return StoryResponse(outline=outline_text, story=story_text)
+    except BudgetExceeded as e:
+        raise HTTPException(status_code=429, detail=str(e))
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e)) 
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+stream_agents = {agent.name: agent for agent in (story_outline_agent, outline_checker_agent, story_agent)}
+
+@app.websocket("/ws/runs")
+async def stream_runs(websocket: WebSocket):
+    """
+    Carries the event streams of any number of concurrent runs over one socket.
+
+    Client sends {"action": "start", "agent": "story_agent", "input": "...", "run_id": "optional"}
+    or {"action": "cancel", "run_id": "..."}. Every server message is tagged with its run_id.
+    """
+    await websocket.accept()
+    mux = StreamMultiplexer(buffer_size=256)
+    # Every message leaves through the writer task, so sends never interleave on the socket
+    outbox: asyncio.Queue[dict] = asyncio.Queue(maxsize=64)
+
+    async def forward_events():
+        async for event in mux:
+            message = serialize_event(event)
+            if message is not None:
+                await outbox.put(message)
+
+    async def write():
+        while True:
+            await websocket.send_json(await outbox.get())
+
+    forwarder = asyncio.create_task(forward_events())
+    writer = asyncio.create_task(write())
+    try:
+        while not writer.done():
+            message = await websocket.receive_json()
+            if message.get("action") == "cancel":
+                mux.cancel(message.get("run_id", ""))
+                continue
+
+            agent = stream_agents.get(message.get("agent", story_agent.name))
+            if agent is None or "input" not in message:
+                await outbox.put({"type": "error", "detail": "Expected a known agent and an input"})
+                continue
+            run_id = message.get("run_id") or uuid.uuid4().hex
+            if run_id in mux.active_runs:
+                await outbox.put({"run_id": run_id, "type": "error", "detail": "Run id already in use"})
+                continue
+            await outbox.put({"run_id": run_id, "type": "run_started", "agent": agent.name})
+            mux.add(run_id, Runner.run_streamed(agent, message["input"], run_config=config))
+    except WebSocketDisconnect:
+        pass
+    finally:
+        await mux.aclose()
+        for task in (forwarder, writer):
+            task.cancel()
+        for task, outcome in zip((forwarder, writer), await asyncio.gather(forwarder, writer, return_exceptions=True)):
+            if isinstance(outcome, Exception) and not isinstance(outcome, WebSocketDisconnect):
+                logger.warning("WebSocket %s task failed: %r", task.get_coroutine().__name__, outcome)
+
+
+run_registry = ResumableRunRegistry(max_events=10_000, max_bytes=4 * 1024 * 1024, max_age=600)
+
+class RunRequest(BaseModel):
+    input: str
+    agent: str = story_agent.name
+
+class RunStarted(BaseModel):
+    run_id: str
+
+@app.post("/runs", response_model=RunStarted)
+async def start_run(request: RunRequest):
+    agent = stream_agents.get(request.agent)
+    if agent is None:
+        raise HTTPException(status_code=404, detail=f"Unknown agent {request.agent!r}")
+    run_id = uuid.uuid4().hex
+    run_registry.start(run_id, Runner.run_streamed(agent, request.input, run_config=config))
+    return RunStarted(run_id=run_id)
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    return export_metrics()
+
+@app.get("/runs/{run_id}/events")
+async def run_events(run_id: str, last_event_id: str | None = Header(default=None)):
+    # Browsers' EventSource sends Last-Event-ID on reconnect, so a dropped client resumes where it left off
+    log = run_registry.get(run_id)
+    if log is None:
+        raise HTTPException(status_code=404, detail="Run not found or expired")
+    return StreamingResponse(sse_stream(log, last_event_id), media_type="text/event-stream")
+
+@app.delete("/runs/{run_id}")
+async def cancel_run(run_id: str):
+    if run_registry.get(run_id) is None:
+        raise HTTPException(status_code=404, detail="Run not found or expired")
+    run_registry.cancel(run_id)
+    return {"run_id": run_id, "cancelled": True}
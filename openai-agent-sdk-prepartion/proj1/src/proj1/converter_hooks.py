@@ -0,0 +1,54 @@
+"""
+One shared patch of `Converter.tool_to_openai` for features that serve precomputed tool specs.
+
+`AgentGraph.install` and `install_converter_cache` both answer `tool_to_openai` for the tools they
+know. Patching the classmethod separately would stack their wrappers, and undoing one would drop the
+other. Instead each adds a lookup here: the lookups are asked in the order they were added, the first
+spec returned wins, and the SDK converts the tool itself when none of them knows it. The method is
+patched when the first lookup is added and restored when the last one is removed.
+
+    add_tool_spec_lookup(registry.tool_param)
+    ...
+    remove_tool_spec_lookup(registry.tool_param)
+"""
+from __future__ import annotations
+
+from typing import Any, Callable
+
+from agents.models.chatcmpl_converter import Converter
+
+ToolSpecLookup = Callable[[Any], "dict[str, Any] | None"]
+
+_lookups: list[ToolSpecLookup] = []
+_originals: dict[str, Any] = {}
+
+
+def _tool_to_openai(cls: type[Converter], tool: Any) -> Any:
+    for lookup in _lookups:
+        spec = lookup(tool)
+        if spec is not None:
+            return spec
+    return _originals["tool_to_openai"](cls, tool)
+
+
+def add_tool_spec_lookup(lookup: ToolSpecLookup) -> None:
+    """Ask `lookup(tool)` for the spec of each tool before converting it, adding it again is a no-op."""
+    if not _originals:
+        _originals["tool_to_openai"] = Converter.__dict__["tool_to_openai"].__func__
+        Converter.tool_to_openai = classmethod(_tool_to_openai)
+    if lookup not in _lookups:
+        _lookups.append(lookup)
+
+
+def remove_tool_spec_lookup(lookup: ToolSpecLookup) -> None:
+    """
+    Stop asking `lookup`, the SDK method is restored once no lookup is left.
+
+    If something else patched `tool_to_openai` on top of ours in the meantime, the patch is left in
+    place (with no lookups it only forwards to the SDK) so that the other patch keeps working.
+    """
+    if lookup in _lookups:
+        _lookups.remove(lookup)
+    current = getattr(Converter.__dict__["tool_to_openai"], "__func__", None)
+    if not _lookups and _originals and current is _tool_to_openai:
+        Converter.tool_to_openai = classmethod(_originals.pop("tool_to_openai"))
@@ -1,6 +1,10 @@
 from agents import Agent, Runner, OpenAIChatCompletionsModel, RunConfig, ModelProvider,function_tool, RunContextWrapper
 from openai import AsyncOpenAI
-from openai.types.responses import ResponseTextDeltaEvent
+from proj1.stream_output import StdoutSink, stream_text
+from proj1.tool_cache import cached_tool
+from proj1.prerouter import PreRouter
+from proj1.routing_cache import CachedTriage, RoutingCache
+from proj1.instruction_builder import InstructionBuilder
 from typing import cast
 import os
 from dotenv import load_dotenv
@@ -44,6 +48,7 @@ class SupportResponse(BaseModel):
     
 
 
+@cached_tool(ttl=3600)
 @function_tool
 def get_product_info(product: str) -> str:
     return f"{product} has a 1-year warranty."
@@ -78,15 +83,21 @@ RefundAgent: Agent = Agent(
     model=model
 )
 
-def triage_instruction(context: RunContextWrapper[UserContext], agent: Agent[UserContext]) -> str:
-    return f"""You are assisting {context.context.name}. Your role is to delegate tasks to specialized agents:
+# The delegation rules are the same for every user, so they form a stable prefix and the name goes last
+triage_instruction = InstructionBuilder(
+    static=["""Your role is to delegate tasks to specialized agents:
 - For product-related questions or explicit requests to hand off to ProductAgent (e.g., 'I handoff to product agent'), hand off to ProductAgent with the input 'Provide general product information' if no specific product is mentioned.
 - For order status queries, hand off to OrderAgent.
 - For refund requests, hand off to RefundAgent.
-Ensure the handoff includes a clear input for the target agent."""
+Ensure the handoff includes a clear input for the target agent."""],
+    dynamic=[lambda context, agent: f"You are assisting {context.context.name}."],
+)
 
 user_context = UserContext(name="Shiraz Ali", is_premium=True)
 
+# Remembers which specialist live triage picked, shared by every conversation of this process
+routing_cache = RoutingCache(verify_rate=0.05)
+
 async def main():
     triageagent:Agent = Agent[UserContext](
         name= "Triage agent",
@@ -96,10 +107,12 @@ async def main():
     )
 
 
-    response =  Runner.run_streamed(triageagent, "process refund requests?", run_config=config ,context=user_context)
-    async for event in response.stream_events():
-        if event.type == "raw_response_event" and isinstance(event.data, ResponseTextDeltaEvent):
-            print(event.data.delta, end="", flush=True)
+    # Skip the triage model call for queries routed before or that clearly belong to one specialist
+    triage = CachedTriage(triageagent, routing_cache, router=PreRouter.from_agent(triageagent))
+    response = triage.run_streamed("process refund requests?", run_config=config, context=user_context)
+    # Deltas are coalesced into chunks instead of one print/flush per token
+    await stream_text(response, StdoutSink(), max_latency=0.05)
+    triage.finish(response)
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
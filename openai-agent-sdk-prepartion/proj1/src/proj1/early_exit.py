@@ -0,0 +1,125 @@
+"""
+Act on structured output fields as soon as they are streamed.
+
+Guardrail outputs like `Country(israel: bool, reason: str)` put the decisive boolean first and a long
+free-text `reason` after it, and `Runner.run` only returns once all of it was generated.
+`run_until_fields` streams the run instead, feeds the text deltas to a `PartialJSONParser`, validates
+each top-level field against its type in the output model as soon as it is complete and calls
+`on_field` with it. Once every field in `fields` is known the rest of the generation is cancelled,
+unless `cancel_when_complete=False`.
+
+    @input_guardrail
+    async def country_guardial(ctx, agent, input):
+        result = await run_until_fields(guardial_agent, input, fields=("israel",), run_config=config)
+        # A reply without the field can't clear the input
+        return GuardrailFunctionOutput(output_info=result.output, tripwire_triggered=result.fields.get("israel", True))
+
+A guardrail decided this way never sees `reason` when it was cancelled, `result.output` is then just the
+fields that arrived. The model should emit the decisive fields first, which the declared field order
+of the output model already asks for. A model that leaves a field out, or ends the reply before it,
+gives a result without it, so look fields up with a default that fails closed. A streamed field that
+does not match its type raises `ModelBehaviorError`, like an invalid final output does.
+
+A cancelled generation never gets to its `ResponseCompletedEvent`, which is where the usage is
+reported, so its tokens are missing from `result.context_wrapper.usage` and a `UsageLedger`.
+"""
+from __future__ import annotations
+
+import inspect
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable
+
+from agents import Agent, AgentOutputSchema, ModelBehaviorError, RunResultStreaming, Runner
+from openai.types.responses import ResponseCreatedEvent, ResponseTextDeltaEvent
+from pydantic import BaseModel, TypeAdapter, ValidationError
+
+from proj1.output_schema import PartialJSONParser
+
+FieldCallback = Callable[[str, Any], Awaitable[None] | None]
+
+_field_adapters: dict[tuple[type[BaseModel], str], TypeAdapter[Any]] = {}
+
+
+def _output_model(agent: Agent[Any]) -> type[BaseModel] | None:
+    output_type = agent.output_type
+    if isinstance(output_type, AgentOutputSchema):
+        output_type = output_type.output_type
+    if isinstance(output_type, type) and issubclass(output_type, BaseModel):
+        return output_type
+    return None
+
+
+def _validate_field(model: type[BaseModel] | None, name: str, value: Any) -> Any:
+    """Validate one field against its annotation, values of unknown fields are passed through."""
+    if model is None or name not in model.model_fields:
+        return value
+    adapter = _field_adapters.get((model, name))
+    if adapter is None:
+        adapter = _field_adapters[(model, name)] = TypeAdapter(model.model_fields[name].annotation)
+    try:
+        return adapter.validate_python(value)
+    except ValidationError as e:
+        raise ModelBehaviorError(f"Invalid value {value!r} for {model.__name__}.{name}; {e}") from e
+
+
+@dataclass
+class EarlyExitResult:
+    fields: dict[str, Any] = field(default_factory=dict)
+    final_output: Any = None
+    """The validated output, only set when the generation ran to completion."""
+    cancelled: bool = False
+    chars_received: int = 0
+    result: RunResultStreaming | None = None
+
+    @property
+    def output(self) -> Any:
+        return self.final_output if self.final_output is not None else self.fields
+
+
+async def run_until_fields(
+    agent: Agent[Any],
+    input: Any,
+    *,
+    fields: tuple[str, ...] = (),
+    on_field: FieldCallback | None = None,
+    cancel_when_complete: bool = True,
+    **run_kwargs: Any,
+) -> EarlyExitResult:
+    """
+    Stream `agent` and report its top-level output fields as they complete.
+
+    Returns once all of `fields` are known (cancelling the run) or the run finished. `run_kwargs` are
+    passed to `Runner.run_streamed`.
+    """
+    model = _output_model(agent)
+    streamed = Runner.run_streamed(agent, input, **run_kwargs)
+    outcome = EarlyExitResult(result=streamed)
+    wanted = set(fields)
+    parser = PartialJSONParser()
+
+    async for event in streamed.stream_events():
+        if event.type != "raw_response_event":
+            continue
+        if isinstance(event.data, ResponseCreatedEvent):
+            # A new model response, e.g. after a tool call, starts a new JSON document
+            parser = PartialJSONParser()
+            continue
+        if not isinstance(event.data, ResponseTextDeltaEvent):
+            continue
+        outcome.chars_received += len(event.data.delta)
+        for name, value in parser.feed(event.data.delta).items():
+            value = outcome.fields[name] = _validate_field(model, name, value)
+            if on_field is not None:
+                called = on_field(name, value)
+                if inspect.isawaitable(called):
+                    await called
+        if cancel_when_complete and wanted and wanted <= outcome.fields.keys():
+            streamed.cancel()
+            outcome.cancelled = True
+            return outcome
+
+    outcome.final_output = streamed.final_output
+    if isinstance(outcome.final_output, BaseModel):
+        for name in outcome.final_output.model_fields:
+            outcome.fields.setdefault(name, getattr(outcome.final_output, name))
+    return outcome
@@ -4,6 +4,7 @@ then picks which agents to call, as tools. In this case, it picks from a set of
 agents.
 """
 import asyncio
+import uuid
 from agents import Agent, ItemHelpers, MessageOutputItem, Runner, trace
 from agents import Agent, Runner, set_tracing_disabled, OpenAIChatCompletionsModel, RunConfig, ModelProvider
 from openai import AsyncOpenAI
@@ -11,6 +12,9 @@ from typing import cast
 import os
 from dotenv import load_dotenv
 
+from proj1.session_store import Session
+from proj1.usage_ledger import MeteredModel, UsageLedger
+
 
 load_dotenv()
 
@@ -26,10 +30,10 @@ external_client = AsyncOpenAI(
     base_url="https://generativelanguage.googleapis.com/v1beta/openai/",
 )
 
-model = OpenAIChatCompletionsModel(
+model = MeteredModel(OpenAIChatCompletionsModel(
     model="gemini-2.0-flash",
     openai_client=external_client,
-)
+))
 
 config = RunConfig(
     model=model,
@@ -45,18 +49,22 @@ spanish_agent = Agent(
     name="spanish_agent",
     instructions="You translate the user's message to Spanish",
     handoff_description="An english to spanish translator",
+    # as_tool() runs this agent without run_config, so it needs its own metered model
+    model=model.labelled("spanish_agent"),
 )
 
 french_agent = Agent(
     name="french_agent",
     instructions="You translate the user's message to French",
     handoff_description="An english to french translator",
+    model=model.labelled("french_agent"),
 )
 
 italian_agent = Agent(
     name="italian_agent",
     instructions="You translate the user's message to Italian",
     handoff_description="An english to italian translator",
+    model=model.labelled("italian_agent"),
 )
 
 orchestrator_agent = Agent(
@@ -90,10 +98,15 @@ synthesizer_agent = Agent(
 
 async def main():
     msg = input("Hi! What would you like translated, and to which languages? ")
+    # One session per invocation, kept in memory: each run starts from a clean history like to_input_list() did.
+    # Use SQLiteStore with a stable id (and session.compact()) to continue a conversation across runs.
+    session = Session(uuid.uuid4().hex)
 
     # Run the entire orchestration in a single trace
-    with trace("Orchestrator evaluator"):
-        orchestrator_result = await Runner.run(orchestrator_agent, msg, run_config=config)
+    # The translator agents run nested inside the orchestrator's tools, the ledger still sees their usage
+    with trace("Orchestrator evaluator"), UsageLedger("agent_as_tool").activate() as ledger:
+        orchestrator_result = await Runner.run(orchestrator_agent, session.input(msg), run_config=config)
+        session.add(orchestrator_result)
 
         for item in orchestrator_result.new_items:
             if isinstance(item, MessageOutputItem):
@@ -101,11 +114,12 @@ async def main():
                 if text:
                     print(f"  - Translation step: {text}")
 
-        synthesizer_result = await Runner.run(
-            synthesizer_agent, orchestrator_result.to_input_list(), run_config=config
-        )
+        # Only the items the orchestrator added were stored, the synthesizer reads the history from the session
+        synthesizer_result = await Runner.run(synthesizer_agent, session.input(), run_config=config)
+        session.add(synthesizer_result)
 
     print(f"\n\nFinal response:\n{synthesizer_result.final_output}")
+    print(ledger.report())
 
 
 if __name__ == "__main__":
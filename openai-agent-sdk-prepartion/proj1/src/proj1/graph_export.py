@@ -0,0 +1,164 @@
+"""
+Export agent graphs as DOT, JSON or Mermaid, and render them through a cache.
+
+`draw_graph(panacloud_agent, filename="agent_graph")` in `agent_visualization.py` runs graphviz every
+time the script runs. `render_graph` hashes the topology (agents, tools, handoffs and agent tools)
+and reuses the rendered file as long as that hash is unchanged, so only a real change in the graph
+pays for a graphviz layout. None of it needs a model run.
+
+    path = render_graph(panacloud_agent, "agent_graph")      # agent_graph.png, from cache if possible
+    print(to_mermaid(AgentGraph.compile(panacloud_agent)))
+
+Large topologies stay readable and fast to lay out: each agent is drawn as a cluster together with its
+tools, agents with more than `collapse_tools_over` tools show one summary node instead of every
+tool, and graphs above `LARGE_GRAPH_NODES` nodes are laid out with `sfdp` instead of `dot`.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+import shutil
+from pathlib import Path
+from typing import Any
+
+from agents import Agent
+
+from proj1.agent_graph import AgentGraph
+
+LARGE_GRAPH_NODES = 200
+
+
+def topology(graph: AgentGraph) -> dict[str, Any]:
+    """The graph as plain data, in a deterministic order."""
+    agents = []
+    for compiled in sorted(graph.compiled.values(), key=lambda c: c.agent.name):
+        agents.append(
+            {
+                "name": compiled.agent.name,
+                "tools": sorted(name for name in compiled.tools if name not in compiled.agent_tools),
+                "agent_tools": {name: agent.name for name, agent in sorted(compiled.agent_tools.items())},
+                "handoffs": {name: agent.name for name, agent in sorted(compiled.handoff_targets.items())},
+            }
+        )
+    return {"root": graph.root.name, "agents": agents}
+
+
+def topology_hash(graph: AgentGraph) -> str:
+    canonical = json.dumps(topology(graph), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode()).hexdigest()[:16]
+
+
+def to_json(graph: AgentGraph) -> str:
+    return json.dumps(topology(graph), indent=2)
+
+
+def _dot_quote(text: str) -> str:
+    return '"' + text.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+def to_dot(graph: AgentGraph, collapse_tools_over: int = 12) -> str:
+    data = topology(graph)
+    node_count = sum(1 + min(len(a["tools"]), collapse_tools_over + 1) for a in data["agents"])
+    lines = ["digraph G {", "    graph [splines=true, compound=true];", '    node [fontname="Arial"];']
+    if node_count > LARGE_GRAPH_NODES:
+        lines.append("    graph [layout=sfdp, overlap=prism];")
+    lines.append('    "__start__" [shape=ellipse, style=filled, fillcolor=lightblue];')
+    lines.append(f'    "__start__" -> {_dot_quote(data["root"])};')
+
+    for index, agent in enumerate(data["agents"]):
+        name = agent["name"]
+        lines.append(f"    subgraph cluster_{index} {{")
+        lines.append('        style=rounded; color=gray80; label="";')
+        lines.append(f"        {_dot_quote(name)} [shape=box, style=filled, fillcolor=lightyellow];")
+        tools = agent["tools"]
+        if len(tools) > collapse_tools_over:
+            tool_nodes = [(f"{name}::tools", f"{len(tools)} tools")]
+        else:
+            tool_nodes = [(f"{name}::{tool}", tool) for tool in tools]
+        for node_id, label in tool_nodes:
+            lines.append(
+                f"        {_dot_quote(node_id)} [label={_dot_quote(label)}, shape=ellipse, style=filled, fillcolor=lightgreen];"
+            )
+            lines.append(f"        {_dot_quote(name)} -> {_dot_quote(node_id)} [style=dotted];")
+        lines.append("    }")
+
+    for agent in data["agents"]:
+        for tool_name, target in agent["handoffs"].items():
+            lines.append(f"    {_dot_quote(agent['name'])} -> {_dot_quote(target)} [label={_dot_quote(tool_name)}];")
+        for tool_name, target in agent["agent_tools"].items():
+            lines.append(
+                f"    {_dot_quote(agent['name'])} -> {_dot_quote(target)} [label={_dot_quote(tool_name)}, style=dashed];"
+            )
+    lines.append("}")
+    return "\n".join(lines)
+
+
+def _mermaid_id(text: str, ids: dict[str, str]) -> str:
+    if text not in ids:
+        ids[text] = f"n{len(ids)}_" + re.sub(r"\W", "_", text)[:40]
+    return ids[text]
+
+
+def to_mermaid(graph: AgentGraph, collapse_tools_over: int = 12) -> str:
+    data = topology(graph)
+    ids: dict[str, str] = {}
+    lines = ["flowchart LR"]
+    for agent in data["agents"]:
+        node = _mermaid_id(agent["name"], ids)
+        label = agent["name"].replace('"', "'")
+        lines.append(f'    subgraph {node}_group[" "]')
+        lines.append(f'        {node}["{label}"]')
+        tools = agent["tools"]
+        if len(tools) > collapse_tools_over:
+            tools = [f"{len(tools)} tools"]
+        for tool in tools:
+            tool_node = _mermaid_id(f"{agent['name']}::{tool}", ids)
+            lines.append(f'        {tool_node}(["{tool}"])')
+            lines.append(f"        {node} -.-> {tool_node}")
+        lines.append("    end")
+    for agent in data["agents"]:
+        node = _mermaid_id(agent["name"], ids)
+        for tool_name, target in agent["handoffs"].items():
+            lines.append(f'    {node} -->|"{tool_name}"| {_mermaid_id(target, ids)}')
+        for tool_name, target in agent["agent_tools"].items():
+            lines.append(f'    {node} -.->|"{tool_name}"| {_mermaid_id(target, ids)}')
+    return "\n".join(lines)
+
+
+def render_graph(
+    agent: Agent[Any] | AgentGraph,
+    filename: str,
+    format: str = "png",
+    cache_dir: str | Path = ".graph_cache",
+    collapse_tools_over: int = 12,
+) -> Path:
+    """
+    Render the graph to `filename.format` with graphviz, or copy the cached render of the same topology.
+
+    Returns the path of the written file. `format="dot"`, `"json"` and `"mmd"` are written directly
+    without graphviz.
+    """
+    graph = agent if isinstance(agent, AgentGraph) else AgentGraph.compile(agent)
+    cache = Path(cache_dir)
+    cached = cache / f"{topology_hash(graph)}-{collapse_tools_over}.{format}"
+    target = Path(f"{filename}.{format}")
+
+    if not cached.exists():
+        cache.mkdir(parents=True, exist_ok=True)
+        if format == "dot":
+            cached.write_text(to_dot(graph, collapse_tools_over), encoding="utf-8")
+        elif format == "json":
+            cached.write_text(to_json(graph), encoding="utf-8")
+        elif format == "mmd":
+            cached.write_text(to_mermaid(graph, collapse_tools_over), encoding="utf-8")
+        else:
+            import graphviz
+
+            source = graphviz.Source(to_dot(graph, collapse_tools_over))
+            rendered = source.render(str(cached.with_suffix("")), format=format, cleanup=True)
+            Path(rendered).replace(cached)
+
+    if target.resolve() != cached.resolve():
+        shutil.copyfile(cached, target)
+    return target
@@ -4,6 +4,8 @@ from typing import cast
 import os
 from dotenv import load_dotenv
 from pydantic import BaseModel
+from proj1.output_schema import output_schema
+from proj1.early_exit import run_until_fields
 
 
 load_dotenv()
@@ -41,17 +43,19 @@ class Country(BaseModel):
 guardial_agent: Agent= Agent(
      name= "Guardial Agent",
      instructions= "Check user is asking about Israel?",
-     output_type=Country,
+     output_type=output_schema(Country),
      model= model
 
 )
 
 @input_guardrail
 async def country_guardial(ctx:RunContextWrapper[Country], agent:Agent, input:str | list[TResponseInputItem])->GuardrailFunctionOutput:
-     result = await Runner.run(guardial_agent, input,context=ctx.context, run_config=config)
+     # Decide on `israel` as soon as it is streamed, the long `reason` is not generated
+     result = await run_until_fields(guardial_agent, input, fields=("israel",), context=ctx.context, run_config=config)
      return GuardrailFunctionOutput(
-          output_info = result.final_output,
-          tripwire_triggered= result.final_output.israel
+          output_info = result.output,
+          # The model may leave the field out; without it the input can't be cleared
+          tripwire_triggered= result.fields.get("israel", True)
      )
 
 panacloud_agent: Agent = Agent(
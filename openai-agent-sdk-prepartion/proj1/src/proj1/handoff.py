@@ -6,6 +6,8 @@ from dotenv import load_dotenv
 import asyncio
 from pydantic import BaseModel
 from agents.extensions.handoff_prompt import RECOMMENDED_PROMPT_PREFIX
+from proj1.stream_subscription import subscribe
+from proj1.agent_graph import AgentGraph
 
 class EscalationData(BaseModel):
     reason: str
@@ -79,39 +81,46 @@ physics_handoff = handoff(
 )
 
 # Triage Agent (Handles the classification and handoff of math and physics questions)
-async def TriageAgent():
-    triage_agent: Agent = Agent(
-        name="Triage Agent",
-        instructions=(
-            "You are a triage agent that routes questions to the appropriate specialist. "
-            "For math questions, use the math_agent. For physics questions, use the physics_agent. "
-            "If the question is not related to either physics or math, handle it yourself. "
-            "Be precise in your classification to ensure questions go to the right specialist."
-        ),
-        handoffs=[math_handoff, physics_handoff],
-        model=model,
-    )
+triage_agent: Agent = Agent(
+    name="Triage Agent",
+    instructions=(
+        "You are a triage agent that routes questions to the appropriate specialist. "
+        "For math questions, use the math_agent. For physics questions, use the physics_agent. "
+        "If the question is not related to either physics or math, handle it yourself. "
+        "Be precise in your classification to ensure questions go to the right specialist."
+    ),
+    handoffs=[math_handoff, physics_handoff],
+    model=model,
+)
 
+# Build handoff lists and tool specs once for the process instead of on every turn, they are
+# served to the runner while the graph is installed (see main)
+graph = AgentGraph.compile(triage_agent)
+
+
+async def TriageAgent():
     # Simulate input query for the Triage Agent (Could be either Math or Physics related)
     user_query = """What is the Heisenberg Uncertainty Principle and how does it 
  affect the measurement of a particle's position and momentum?"""
 
-    # Use the Triage Agent to process the query
-    response =  Runner.run_streamed(triage_agent, user_query, run_config=config)
+    # Use the Triage Agent to process the query. No pre-routing here: both handoffs carry an
+    # EscalationData input and an on_handoff callback, which only run when the model makes the handoff.
+    response = Runner.run_streamed(triage_agent, user_query, run_config=config)
 
-    # Stream events and print relevant progress
-    async for event in response.stream_events():
-        if event.type == "raw_response_event":
-            continue
-        elif event.type == "agent_updated_stream_event":
+    # Stream events and print relevant progress, token deltas are never queued
+    events = subscribe(
+        response,
+        event_types={"agent_updated_stream_event"},
+        item_types={"handoff_call_item", "message_output_item"},
+    )
+    async for event in events:
+        if event.type == "agent_updated_stream_event":
             print(f"Agent Name: {event.new_agent.name}")
         elif event.type == "run_item_stream_event":
             if event.item.type == "handoff_call_item":
                 print(f"handoff occured : {event.item.agent.handoffs[0].tool_name}")
             elif event.item.type == "message_output_item":
                 print(f"Final response: {ItemHelpers.text_message_output(event.item)}")  # Final response
-            else:
-                pass
 
 
 
@@ -119,7 +128,8 @@ async def TriageAgent():
 
 # Main function to run the Triage Agent
 def main():
-    asyncio.run(TriageAgent())
+    with graph:
+        asyncio.run(TriageAgent())
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,207 @@
+"""
+Non-blocking dispatch for lifecycle hooks.
+
+Hooks like `TaskManagementHook` in `task_manager.py` or `MyRunHook` in `Api-Refrence/lifecycle.py` run
+inline, so a slow hook (writing to disk, sending metrics) adds straight to the latency the user sees.
+Wrapping them in `DispatchingRunHooks` / `DispatchingAgentHooks` makes every hook call return right
+away: the call is put on a queue and executed by a background task, one queue per run so hooks of
+the same run still execute in order. Sync hook methods run in a thread pool instead of on the event
+loop.
+
+    dispatcher = HookDispatcher(max_queue_size=1000, overflow="drop_oldest")
+    result = await Runner.run(agent, "...", hooks=DispatchingRunHooks(MyRunHook(), dispatcher))
+    await dispatcher.drain()
+    print(dispatcher.report())
+"""
+from __future__ import annotations
+
+import asyncio
+import inspect
+import logging
+import time
+from collections import deque
+from concurrent.futures import Executor
+from dataclasses import dataclass
+from functools import partial
+from typing import Any, Callable, Hashable, Literal
+
+from agents import Agent, AgentHooks, RunContextWrapper, RunHooks, Tool
+
+logger = logging.getLogger(__name__)
+
+OverflowPolicy = Literal["drop_newest", "drop_oldest", "block"]
+
+
+@dataclass
+class HookTiming:
+    count: int = 0
+    total: float = 0.0
+    max: float = 0.0
+    queue_wait: float = 0.0
+    errors: int = 0
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+
+class HookDispatcher:
+    """
+    Runs hook calls in the background, preserving order per run.
+
+    The queue is bounded across all runs by `max_queue_size`. When it is full the `overflow` policy
+    decides: `drop_newest` discards the incoming call, `drop_oldest` discards the oldest pending call
+    of the same run (or the incoming one if that run has nothing pending), and `block` makes the
+    caller wait for space, which turns the dispatch back into backpressure on the agent.
+    """
+
+    def __init__(
+        self,
+        max_queue_size: int = 1000,
+        overflow: OverflowPolicy = "drop_oldest",
+        executor: Executor | None = None,
+    ):
+        self.max_queue_size = max_queue_size
+        self.overflow = overflow
+        self.executor = executor
+
+        self.timings: dict[str, HookTiming] = {}
+        self.dropped = 0
+        self._pending: dict[Hashable, deque[tuple[str, Callable[..., Any], tuple[Any, ...], float]]] = {}
+        self._workers: dict[Hashable, asyncio.Task[None]] = {}
+        self._size = 0
+        self._space = asyncio.Condition()
+
+    @property
+    def queued(self) -> int:
+        return self._size
+
+    async def submit(self, key: Hashable, name: str, fn: Callable[..., Any], *args: Any) -> None:
+        if self._size >= self.max_queue_size:
+            if self.overflow == "block":
+                async with self._space:
+                    # Every blocked caller is woken, so check again: another one may have taken the space
+                    while self._size >= self.max_queue_size:
+                        await self._space.wait()
+                    self._enqueue(key, name, fn, args)
+                return
+            if self.overflow == "drop_oldest" and self._pending.get(key):
+                self._pending[key].popleft()
+                self._size -= 1
+                self.dropped += 1
+            else:
+                self.dropped += 1
+                return
+        self._enqueue(key, name, fn, args)
+
+    def _enqueue(self, key: Hashable, name: str, fn: Callable[..., Any], args: tuple[Any, ...]) -> None:
+        self._pending.setdefault(key, deque()).append((name, fn, args, time.perf_counter()))
+        self._size += 1
+        if key not in self._workers:
+            self._workers[key] = asyncio.create_task(self._drain_run(key))
+
+    async def _drain_run(self, key: Hashable) -> None:
+        pending = self._pending[key]
+        try:
+            while pending:
+                name, fn, args, enqueued = pending.popleft()
+                self._size -= 1
+                async with self._space:
+                    self._space.notify_all()
+                await self._invoke(name, fn, args, enqueued)
+        finally:
+            del self._workers[key]
+            if not pending:
+                self._pending.pop(key, None)
+
+    async def _invoke(self, name: str, fn: Callable[..., Any], args: tuple[Any, ...], enqueued: float) -> None:
+        timing = self.timings.setdefault(name, HookTiming())
+        started = time.perf_counter()
+        timing.queue_wait += started - enqueued
+        try:
+            if inspect.iscoroutinefunction(fn):
+                await fn(*args)
+            else:
+                result = await asyncio.get_running_loop().run_in_executor(self.executor, partial(fn, *args))
+                if inspect.isawaitable(result):
+                    await result
+        except Exception as e:
+            # A broken hook must not take the run down, but it should be visible
+            timing.errors += 1
+            logger.warning("Hook %s raised %s: %s", name, type(e).__name__, e, exc_info=e)
+        finally:
+            elapsed = time.perf_counter() - started
+            timing.count += 1
+            timing.total += elapsed
+            timing.max = max(timing.max, elapsed)
+
+    async def drain(self) -> None:
+        """Wait until every queued hook call has run."""
+        while self._workers:
+            await asyncio.gather(*self._workers.values())
+
+    def slowest(self, limit: int = 5) -> list[tuple[str, HookTiming]]:
+        return sorted(self.timings.items(), key=lambda kv: kv[1].max, reverse=True)[:limit]
+
+    def report(self) -> str:
+        lines = [f"Hook dispatch: {self._size} queued, {self.dropped} dropped"]
+        for name, timing in self.slowest(len(self.timings)):
+            lines.append(
+                f"  {name:<40} n={timing.count} mean={timing.mean * 1000:.2f}ms "
+                f"max={timing.max * 1000:.2f}ms waited={timing.queue_wait * 1000:.2f}ms errors={timing.errors}"
+            )
+        return "\n".join(lines)
+
+
+class DispatchingRunHooks(RunHooks[Any]):
+    """Queues every call to the wrapped `RunHooks` on a `HookDispatcher`."""
+
+    def __init__(self, inner: RunHooks[Any], dispatcher: HookDispatcher | None = None):
+        self.inner = inner
+        self.dispatcher = dispatcher or HookDispatcher()
+        self._prefix = type(inner).__name__
+
+    async def _submit(self, context: RunContextWrapper[Any], method: str, *args: Any) -> None:
+        await self.dispatcher.submit(id(context), f"{self._prefix}.{method}", getattr(self.inner, method), context, *args)
+
+    async def on_agent_start(self, context: RunContextWrapper[Any], agent: Agent[Any]) -> None:
+        await self._submit(context, "on_agent_start", agent)
+
+    async def on_agent_end(self, context: RunContextWrapper[Any], agent: Agent[Any], output: Any) -> None:
+        await self._submit(context, "on_agent_end", agent, output)
+
+    async def on_handoff(self, context: RunContextWrapper[Any], from_agent: Agent[Any], to_agent: Agent[Any]) -> None:
+        await self._submit(context, "on_handoff", from_agent, to_agent)
+
+    async def on_tool_start(self, context: RunContextWrapper[Any], agent: Agent[Any], tool: Tool) -> None:
+        await self._submit(context, "on_tool_start", agent, tool)
+
+    async def on_tool_end(self, context: RunContextWrapper[Any], agent: Agent[Any], tool: Tool, result: str) -> None:
+        await self._submit(context, "on_tool_end", agent, tool, result)
+
+
+class DispatchingAgentHooks(AgentHooks[Any]):
+    """Queues every call to the wrapped `AgentHooks` on a `HookDispatcher`."""
+
+    def __init__(self, inner: AgentHooks[Any], dispatcher: HookDispatcher | None = None):
+        self.inner = inner
+        self.dispatcher = dispatcher or HookDispatcher()
+        self._prefix = type(inner).__name__
+
+    async def _submit(self, context: RunContextWrapper[Any], method: str, *args: Any) -> None:
+        await self.dispatcher.submit(id(context), f"{self._prefix}.{method}", getattr(self.inner, method), context, *args)
+
+    async def on_start(self, context: RunContextWrapper[Any], agent: Agent[Any]) -> None:
+        await self._submit(context, "on_start", agent)
+
+    async def on_end(self, context: RunContextWrapper[Any], agent: Agent[Any], output: Any) -> None:
+        await self._submit(context, "on_end", agent, output)
+
+    async def on_handoff(self, context: RunContextWrapper[Any], agent: Agent[Any], source: Agent[Any]) -> None:
+        await self._submit(context, "on_handoff", agent, source)
+
+    async def on_tool_start(self, context: RunContextWrapper[Any], agent: Agent[Any], tool: Tool) -> None:
+        await self._submit(context, "on_tool_start", agent, tool)
+
+    async def on_tool_end(self, context: RunContextWrapper[Any], agent: Agent[Any], tool: Tool, result: str) -> None:
+        await self._submit(context, "on_tool_end", agent, tool, result)
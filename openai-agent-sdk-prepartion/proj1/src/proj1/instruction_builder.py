@@ -0,0 +1,110 @@
+"""
+Prefix-stable dynamic instructions.
+
+Providers cache prompts by exact prefix. An instruction like `dynamic_instructions` in `agent.py`
+("The user's name is {name}. Help them ...") puts per-user data in front, so no two users share a
+single cached byte and the whole system prompt is paid for on every request. `InstructionBuilder`
+splits instructions into static blocks, rendered once per agent and reused byte for byte, and
+dynamic blocks rendered per request and always placed after them.
+
+    instructions = InstructionBuilder(
+        static=["Help the user with their questions."],
+        dynamic=[lambda ctx, agent: f"The user's name is {ctx.context.name}."],
+    )
+    agent = Agent[UserContext](name="panacloud_agent", instructions=instructions, model=model)
+    print(instructions.report())
+
+Static blocks are strings or `(agent) -> str` callables, dynamic blocks are `(context, agent)`
+callables. With async dynamic blocks pass `instructions.async_instructions` to the agent instead.
+`report()` shows per agent how much of the prompt is a stable prefix.
+"""
+from __future__ import annotations
+
+import inspect
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Union
+
+from agents import Agent, RunContextWrapper
+
+StaticBlock = Union[str, Callable[[Agent[Any]], str]]
+DynamicBlock = Callable[[RunContextWrapper[Any], Agent[Any]], Union[str, Awaitable[str]]]
+
+
+@dataclass
+class PrefixStats:
+    prefix_bytes: int = 0
+    renders: int = 0
+    total_bytes: int = 0
+    prefix_changed: int = 0
+    """Times a static block rendered differently for the same agent, which breaks provider caching."""
+
+    @property
+    def cacheable_ratio(self) -> float:
+        mean_total = self.total_bytes / self.renders if self.renders else 0
+        return self.prefix_bytes / mean_total if mean_total else 0.0
+
+
+class InstructionBuilder:
+    def __init__(
+        self,
+        static: list[StaticBlock] | None = None,
+        dynamic: list[DynamicBlock] | None = None,
+        separator: str = "\n\n",
+    ):
+        self.static = list(static or [])
+        self.dynamic = list(dynamic or [])
+        self.separator = separator
+        self.stats: dict[str, PrefixStats] = {}
+        self._prefixes: dict[int, str] = {}
+
+    def prefix(self, agent: Agent[Any]) -> str:
+        """The static part for `agent`, rendered on first use and returned unchanged afterwards."""
+        prefix = self._prefixes.get(id(agent))
+        if prefix is None:
+            blocks = [block(agent) if callable(block) else block for block in self.static]
+            prefix = self.separator.join(block for block in blocks if block)
+            if self.dynamic and prefix:
+                prefix += self.separator
+            stats = self.stats.setdefault(agent.name, PrefixStats())
+            if stats.prefix_bytes and stats.prefix_bytes != len(prefix.encode()):
+                # Another agent object under the same name rendered a different prefix
+                stats.prefix_changed += 1
+            stats.prefix_bytes = len(prefix.encode())
+            self._prefixes[id(agent)] = prefix
+        return prefix
+
+    def _finish(self, agent: Agent[Any], parts: list[str]) -> str:
+        instructions = self.prefix(agent) + self.separator.join(part for part in parts if part)
+        stats = self.stats[agent.name]
+        stats.renders += 1
+        stats.total_bytes += len(instructions.encode())
+        return instructions
+
+    def __call__(self, context: RunContextWrapper[Any], agent: Agent[Any]) -> str:
+        parts = []
+        for block in self.dynamic:
+            text = block(context, agent)
+            if inspect.isawaitable(text):
+                if inspect.iscoroutine(text):
+                    text.close()
+                raise TypeError("A dynamic block is async, pass `builder.async_instructions` as the agent's instructions")
+            parts.append(text)
+        return self._finish(agent, parts)
+
+    async def async_instructions(self, context: RunContextWrapper[Any], agent: Agent[Any]) -> str:
+        """Use this as `instructions=` when any dynamic block is async, the SDK awaits it then."""
+        parts = []
+        for block in self.dynamic:
+            text = block(context, agent)
+            parts.append(await text if inspect.isawaitable(text) else text)
+        return self._finish(agent, parts)
+
+    def report(self) -> str:
+        lines = []
+        for name, stats in self.stats.items():
+            lines.append(
+                f"{name}: {stats.prefix_bytes} byte stable prefix (~{stats.prefix_bytes // 4} tokens), "
+                f"{stats.cacheable_ratio:.0%} of the average prompt, {stats.renders} renders"
+                + (f", prefix changed {stats.prefix_changed}x" if stats.prefix_changed else "")
+            )
+        return "\n".join(lines)
@@ -0,0 +1,114 @@
+"""
+Memoize dynamic instructions on the context fields they use.
+
+The runner calls an `instructions=` callable on every turn of every run. `dynamic_instructions` in
+`agent_visualization.py` only depends on `UserContext.name`, so all but the first call per user render
+the same text again. `cached_instructions` keeps rendered instructions in a bounded LRU keyed by the
+agent and the declared context fields.
+
+    @cached_instructions(fields=("name",))
+    def dynamic_instructions(context: RunContextWrapper[UserContext], agent: Agent[UserContext]) -> str:
+        return f"The user's name is {context.context.name}. Help them with their questions."
+
+Async instruction functions stay async, only a miss awaits the function. Hit rates per wrapper are in
+`instruction_cache_stats`, under `name` if given, else the function's qualified name or, for callable
+objects like an `InstructionBuilder`, the type name and a number. Declare every field the text
+depends on, a field left out means another user's instructions can be served.
+"""
+from __future__ import annotations
+
+import functools
+import inspect
+import itertools
+import weakref
+from typing import Any, Callable
+
+from agents import Agent, RunContextWrapper
+
+from proj1.tool_cache import CacheStats, TTLCache
+from proj1.tool_predicates import field_value
+
+_MISSING = object()
+
+instruction_cache_stats: dict[str, CacheStats] = {}
+
+# Agents are unhashable dataclasses, so each live agent object gets a serial number that is never reused
+_agent_serials: dict[int, tuple[weakref.ref[Agent[Any]], int]] = {}
+_next_serial = itertools.count()
+
+
+def _agent_serial(agent: Agent[Any]) -> int:
+    entry = _agent_serials.get(id(agent))
+    if entry is None or entry[0]() is not agent:
+        entry = _agent_serials[id(agent)] = (weakref.ref(agent), next(_next_serial))
+        weakref.finalize(agent, _agent_serials.pop, id(agent), None)
+    return entry[1]
+
+
+def _stats_name(func: Callable[..., Any]) -> str:
+    qualname = getattr(func, "__qualname__", None)
+    if qualname is not None:
+        return f"{func.__module__}.{qualname}"
+    # Callable objects have no name of their own, number them so they don't share one entry
+    for n in itertools.count(1):
+        name = f"{type(func).__name__}#{n}"
+        if name not in instruction_cache_stats:
+            return name
+
+
+def _named(wrapper: Callable[..., Any], func: Callable[..., Any]) -> Callable[..., Any]:
+    """Name the wrapper after `func`, with `functools.wraps` only for real functions."""
+    if inspect.isfunction(func) or inspect.ismethod(func):
+        return functools.wraps(func)(wrapper)
+    # wraps() would copy a callable object's state (its __dict__) onto the wrapper and leave it nameless
+    wrapper.__name__ = type(func).__name__
+    wrapper.__qualname__ = type(func).__qualname__
+    wrapper.__wrapped__ = func
+    return wrapper
+
+
+def cached_instructions(
+    func: Callable[..., Any] | None = None,
+    *,
+    fields: tuple[str, ...] = (),
+    maxsize: int = 1024,
+    name: str | None = None,
+) -> Any:
+    def decorate(func: Callable[..., Any]) -> Callable[..., Any]:
+        stats = instruction_cache_stats.setdefault(name or _stats_name(func), CacheStats())
+        cache = TTLCache(maxsize=maxsize, stats=stats)
+
+        def key_for(context: RunContextWrapper[Any], agent: Agent[Any]) -> str:
+            return repr((_agent_serial(agent), *(field_value(context.context, field) for field in fields)))
+
+        if inspect.iscoroutinefunction(func) or inspect.iscoroutinefunction(type(func).__call__):
+
+            async def async_wrapper(context: RunContextWrapper[Any], agent: Agent[Any]) -> str:
+                key = key_for(context, agent)
+                text = cache.get(key, _MISSING)
+                if text is not _MISSING:
+                    stats.hits += 1
+                    return text
+                stats.misses += 1
+                text = await func(context, agent)
+                cache.put(key, text)
+                return text
+
+            return _named(async_wrapper, func)
+
+        def wrapper(context: RunContextWrapper[Any], agent: Agent[Any]) -> str:
+            key = key_for(context, agent)
+            text = cache.get(key, _MISSING)
+            if text is not _MISSING:
+                stats.hits += 1
+                return text
+            stats.misses += 1
+            text = func(context, agent)
+            cache.put(key, text)
+            return text
+
+        return _named(wrapper, func)
+
+    if func is not None:
+        return decorate(func)
+    return decorate
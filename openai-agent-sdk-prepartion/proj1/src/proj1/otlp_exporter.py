@@ -0,0 +1,309 @@
+"""
+OpenTelemetry-compatible exporter for agent SDK traces.
+
+`OTLPFileTracingProcessor` maps SDK `Trace`/`Span` objects to OTLP spans using the OTLP/JSON
+encoding of `ExportTraceServiceRequest`, so any OpenTelemetry collector (`otlpjsonfile` receiver,
+or the OTLP/HTTP receiver on port 4318) can ingest them. Spans are queued in a bounded queue and
+batched, gzip-compressed and written by a background thread, so the agent loop never waits on I/O.
+
+    processor = OTLPFileTracingProcessor(RotatingFileSink("traces/agent-spans.jsonl.gz"))
+    # or: OTLPFileTracingProcessor(CollectorSink("http://localhost:4318/v1/traces"))
+    add_trace_processor(processor)
+"""
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import queue
+import threading
+from datetime import datetime
+from typing import Any, Protocol
+
+import httpx
+from agents.tracing import Span, Trace, TracingProcessor
+
+logger = logging.getLogger(__name__)
+
+# OTLP enum values, see opentelemetry/proto/trace/v1/trace.proto
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_CLIENT = 3
+STATUS_CODE_OK = 1
+STATUS_CODE_ERROR = 2
+
+# Generations and tool calls leave the process (or at least behave like a remote call)
+_CLIENT_SPAN_TYPES = {"generation", "response", "function", "mcp_tools"}
+
+
+def _hex_id(value: str, length: int) -> str:
+    """Turn an SDK id like `trace_<32 hex>` / `span_<24 hex>` into an OTLP hex id of `length` chars."""
+    raw = value.split("_", 1)[-1]
+    try:
+        int(raw, 16)
+    except ValueError:
+        raw = hashlib.sha256(value.encode()).hexdigest()
+    return raw[-length:].rjust(length, "0")
+
+
+def _unix_nanos(value: str | None) -> str:
+    # OTLP/JSON encodes 64 bit integers as strings
+    if value is None:
+        return "0"
+    return str(int(datetime.fromisoformat(value).timestamp() * 1_000_000_000))
+
+
+def _any_value(value: Any) -> dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    if isinstance(value, str):
+        return {"stringValue": value}
+    return {"stringValue": json.dumps(value, default=str)}
+
+
+def _attributes(values: dict[str, Any]) -> list[dict[str, Any]]:
+    return [{"key": k, "value": _any_value(v)} for k, v in values.items() if v is not None]
+
+
+def span_to_otlp(exported: dict[str, Any], workflow_name: str | None = None) -> dict[str, Any]:
+    """Map one `Span.export()` dict to an OTLP/JSON span."""
+    span_data = exported.get("span_data") or {}
+    kind = span_data.get("type", "custom")
+
+    attributes: dict[str, Any] = {"agents.span.type": kind, "agents.workflow_name": workflow_name}
+    for key, value in span_data.items():
+        if key != "type":
+            attributes[f"agents.{kind}.{key}"] = value
+    if kind == "generation":
+        # Map the common fields onto the GenAI semantic conventions as well
+        usage = span_data.get("usage") or {}
+        attributes["gen_ai.request.model"] = span_data.get("model")
+        attributes["gen_ai.usage.input_tokens"] = usage.get("input_tokens")
+        attributes["gen_ai.usage.output_tokens"] = usage.get("output_tokens")
+
+    if kind == "handoff":
+        name = f"handoff {span_data.get('from_agent')} -> {span_data.get('to_agent')}"
+    elif span_data.get("name") or span_data.get("model"):
+        name = f"{kind} {span_data.get('name') or span_data.get('model')}"
+    else:
+        name = kind
+
+    error = exported.get("error")
+    status = {"code": STATUS_CODE_ERROR, "message": error.get("message", "")} if error else {"code": STATUS_CODE_OK}
+
+    otlp_span = {
+        "traceId": _hex_id(exported["trace_id"], 32),
+        "spanId": _hex_id(exported["id"], 16),
+        "name": name,
+        "kind": SPAN_KIND_CLIENT if kind in _CLIENT_SPAN_TYPES else SPAN_KIND_INTERNAL,
+        "startTimeUnixNano": _unix_nanos(exported.get("started_at")),
+        "endTimeUnixNano": _unix_nanos(exported.get("ended_at")),
+        "attributes": _attributes(attributes),
+        "status": status,
+    }
+    if exported.get("parent_id"):
+        otlp_span["parentSpanId"] = _hex_id(exported["parent_id"], 16)
+    return otlp_span
+
+
+def build_export_request(spans: list[dict[str, Any]], service_name: str) -> dict[str, Any]:
+    """Wrap OTLP spans in an `ExportTraceServiceRequest`."""
+    return {
+        "resourceSpans": [
+            {
+                "resource": {"attributes": _attributes({"service.name": service_name})},
+                "scopeSpans": [{"scope": {"name": "openai-agents"}, "spans": spans}],
+            }
+        ]
+    }
+
+
+class OTLPSink(Protocol):
+    def write(self, payload: bytes) -> None:
+        """Write one gzip-compressed OTLP/JSON export request."""
+        ...
+
+    def close(self) -> None:
+        ...
+
+
+class RotatingFileSink:
+    """
+    Appends each batch as its own gzip member of a JSON-lines file, so the file stays a valid
+    `.jsonl.gz` at every point. Rotates to `path.1`, `path.2`, ... once `max_bytes` is reached.
+    """
+
+    def __init__(self, path: str, max_bytes: int = 10 * 1024 * 1024, backup_count: int = 5):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    def _rotate(self) -> None:
+        for i in range(self.backup_count - 1, 0, -1):
+            src = f"{self.path}.{i}"
+            if os.path.exists(src):
+                os.replace(src, f"{self.path}.{i + 1}")
+        if self.backup_count > 0:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+
+    def write(self, payload: bytes) -> None:
+        if os.path.exists(self.path) and os.path.getsize(self.path) + len(payload) > self.max_bytes:
+            self._rotate()
+        with open(self.path, "ab") as f:
+            f.write(payload)
+
+    def close(self) -> None:
+        pass
+
+
+class CollectorSink:
+    """Posts batches to a local OpenTelemetry collector over OTLP/HTTP (JSON, gzip)."""
+
+    def __init__(self, endpoint: str = "http://localhost:4318/v1/traces", timeout: float = 5.0):
+        self.endpoint = endpoint
+        self._client = httpx.Client(timeout=timeout)
+
+    def write(self, payload: bytes) -> None:
+        response = self._client.post(
+            self.endpoint,
+            content=payload,
+            headers={"Content-Type": "application/json", "Content-Encoding": "gzip"},
+        )
+        response.raise_for_status()
+
+    def close(self) -> None:
+        self._client.close()
+
+
+class OTLPFileTracingProcessor(TracingProcessor):
+    """
+    Batches finished spans and hands them to an `OTLPSink` from a background thread.
+
+    `on_span_end` only exports the span to a dict and puts it on a bounded queue. When the queue
+    is full the span is dropped and counted in `dropped_spans` rather than blocking the agent.
+    """
+
+    def __init__(
+        self,
+        sink: OTLPSink,
+        service_name: str = "proj1-agents",
+        max_queue_size: int = 8192,
+        max_batch_size: int = 512,
+        schedule_delay: float = 2.0,
+        compresslevel: int = 6,
+    ):
+        self.sink = sink
+        self.service_name = service_name
+        self.max_batch_size = max_batch_size
+        self.schedule_delay = schedule_delay
+        self.compresslevel = compresslevel
+
+        self.dropped_spans = 0
+        self.exported_spans = 0
+        self.failed_batches = 0
+
+        self._queue: queue.Queue[tuple[dict[str, Any], str | None]] = queue.Queue(maxsize=max_queue_size)
+        self._workflow_names: dict[str, str] = {}
+        self._flush_requested = threading.Event()
+        self._shutdown = threading.Event()
+        self._export_lock = threading.Lock()
+        # Spans end on whatever thread the agent runs on, `+=` on the counter is not atomic across them
+        self._dropped_lock = threading.Lock()
+        self._worker = threading.Thread(target=self._run, name="otlp-exporter", daemon=True)
+        self._worker.start()
+
+    def on_trace_start(self, trace: Trace) -> None:
+        self._workflow_names[trace.trace_id] = trace.name
+
+    def on_trace_end(self, trace: Trace) -> None:
+        self._workflow_names.pop(trace.trace_id, None)
+
+    def on_span_start(self, span: Span[Any]) -> None:
+        pass
+
+    def on_span_end(self, span: Span[Any]) -> None:
+        exported = span.export()
+        if not exported:
+            return
+        try:
+            self._queue.put_nowait((exported, self._workflow_names.get(span.trace_id)))
+        except queue.Full:
+            with self._dropped_lock:
+                self.dropped_spans += 1
+        if self._queue.qsize() >= self.max_batch_size:
+            self._flush_requested.set()
+
+    def _drain(self, limit: int) -> list[dict[str, Any]]:
+        spans = []
+        while len(spans) < limit:
+            try:
+                exported, workflow_name = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            spans.append(span_to_otlp(exported, workflow_name))
+        return spans
+
+    def _export_pending(self) -> None:
+        with self._export_lock:
+            while True:
+                spans = self._drain(self.max_batch_size)
+                if not spans:
+                    return
+                body = json.dumps(build_export_request(spans, self.service_name), separators=(",", ":"))
+                payload = gzip.compress(body.encode() + b"\n", compresslevel=self.compresslevel)
+                try:
+                    self.sink.write(payload)
+                    self.exported_spans += len(spans)
+                except Exception as e:
+                    # Exporting must never take the agent down with it
+                    self.failed_batches += 1
+                    logger.warning("Failed to write %d spans to %s: %s", len(spans), type(self.sink).__name__, e, exc_info=e)
+
+    def _run(self) -> None:
+        while not self._shutdown.is_set():
+            self._flush_requested.wait(timeout=self.schedule_delay)
+            self._flush_requested.clear()
+            self._export_pending()
+        self._export_pending()
+
+    def force_flush(self) -> None:
+        self._export_pending()
+
+    def shutdown(self) -> None:
+        self._shutdown.set()
+        self._flush_requested.set()
+        self._worker.join(timeout=self.schedule_delay * 2 + 5)
+        self.sink.close()
+
+
+def main():
+    import time
+    from agents.tracing import agent_span, function_span, generation_span, set_trace_processors, trace
+
+    processor = OTLPFileTracingProcessor(RotatingFileSink("traces/agent-spans.jsonl.gz"))
+    set_trace_processors([processor])
+
+    with trace("OTLP export demo"):
+        with agent_span("panacloud_agent"):
+            with generation_span(model="gemini-2.0-flash"):
+                time.sleep(0.01)
+            with function_span("get_weather_info", input='{"city": "Islamabad"}'):
+                time.sleep(0.005)
+
+    processor.shutdown()
+    print(f"Exported {processor.exported_spans} spans, dropped {processor.dropped_spans}")
+    with gzip.open("traces/agent-spans.jsonl.gz", "rt") as f:
+        for line in f:
+            print(json.dumps(json.loads(line), indent=2)[:1500])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,287 @@
+"""
+Prebuilt structured-output schemas and a streaming partial-JSON parser.
+
+For an agent with `output_type=OutlineCheckerOutput` the runner builds a new `AgentOutputSchema` for
+every run and for every streamed turn: a fresh pydantic `TypeAdapter` (core schema build), the JSON
+schema and its strict rewrite, all before the response is validated once. `output_schema()` builds
+each of those once per type and hands the same object to every agent and run, and validation runs
+`TypeAdapter.validate_json` directly on the raw text or bytes.
+
+    outline_checker_agent = Agent(
+        name="outline_checker_agent",
+        instructions="...",
+        output_type=output_schema(OutlineCheckerOutput),
+    )
+
+`install_output_schemas()` does the same for every agent that still passes a plain type, until
+`uninstall_output_schemas()`.
+
+Counts per schema are in `output_schema_stats`, keyed by the qualified name of the output type.
+Timing every validation costs about as much as a small validation itself, so it is off unless the
+schema is requested with `output_schema(..., timed=True)`.
+
+`PartialJSONParser` scans a streamed JSON object incrementally and reports each top-level field as soon
+as its value is complete, so `{"israel": true, "reason": "...` can be acted on after the first few
+tokens:
+
+    parser = PartialJSONParser()
+    for delta in deltas:
+        for name, value in parser.feed(delta).items():
+            ...
+
+Run this module to benchmark validations/sec against the SDK's per-run schemas.
+"""
+from __future__ import annotations
+
+import json
+import time
+from dataclasses import dataclass
+from typing import Any
+
+from agents import Agent, AgentOutputSchema, AgentOutputSchemaBase, ModelBehaviorError, Runner
+from pydantic import ValidationError
+from pydantic_core import from_json
+
+
+@dataclass
+class OutputSchemaStats:
+    validations: int = 0
+    failures: int = 0
+    partial_validations: int = 0
+    validate_seconds: float = 0.0
+
+    @property
+    def validations_per_second(self) -> float:
+        return self.validations / self.validate_seconds if self.validate_seconds else 0.0
+
+
+output_schema_stats: dict[str, OutputSchemaStats] = {}
+
+
+def _stats_key(output_type: Any, strict_json_schema: bool) -> str:
+    """`name()` is the bare type name, which types from different modules can share."""
+    module = getattr(output_type, "__module__", None)
+    qualname = getattr(output_type, "__qualname__", None)
+    key = f"{module}.{qualname}" if module and qualname else repr(output_type)
+    return key if strict_json_schema else f"{key} (non-strict)"
+
+
+class FastOutputSchema(AgentOutputSchema):
+    """An `AgentOutputSchema` built once per type and shared, validating raw JSON text or bytes."""
+
+    def __init__(self, output_type: type[Any], strict_json_schema: bool = True, timed: bool = False):
+        super().__init__(output_type, strict_json_schema)
+        self.stats = output_schema_stats.setdefault(_stats_key(output_type, strict_json_schema), OutputSchemaStats())
+        self.timed = timed
+
+    def validate_json(self, json_str: str | bytes) -> Any:
+        if self.timed:
+            started = time.perf_counter()
+            try:
+                return self._validate_json(json_str)
+            finally:
+                self.stats.validate_seconds += time.perf_counter() - started
+        return self._validate_json(json_str)
+
+    def _validate_json(self, json_str: str | bytes) -> Any:
+        stats = self.stats
+        stats.validations += 1
+        try:
+            validated = self._type_adapter.validate_json(json_str)
+        except ValidationError as e:
+            stats.failures += 1
+            raise ModelBehaviorError(f"Invalid JSON when parsing {json_str!r} for {self.name()}; {e}") from e
+        if self._is_wrapped:
+            if not isinstance(validated, dict) or "response" not in validated:
+                raise ModelBehaviorError(f"Could not find key 'response' in JSON: {json_str!r}")
+            return validated["response"]
+        return validated
+
+    def validate_partial(self, json_str: str | bytes) -> Any:
+        """Validate an unfinished response, incomplete trailing values are dropped or cut short."""
+        self.stats.partial_validations += 1
+        return self._type_adapter.validate_json(json_str, experimental_allow_partial="trailing-strings")
+
+
+_schemas: dict[tuple[Any, bool], FastOutputSchema] = {}
+
+
+def output_schema(output_type: type[Any], strict_json_schema: bool = True, timed: bool = False) -> FastOutputSchema:
+    """The shared schema for `output_type`, built on first use. `timed=True` turns on timing for it."""
+    key = (output_type, strict_json_schema)
+    schema = _schemas.get(key)
+    if schema is None:
+        schema = _schemas[key] = FastOutputSchema(output_type, strict_json_schema, timed)
+    elif timed:
+        schema.timed = True
+    return schema
+
+
+_originals: dict[str, Any] = {}
+
+
+def _get_output_schema(cls: type[Runner], agent: Agent[Any]) -> AgentOutputSchemaBase | None:
+    output_type = agent.output_type
+    if output_type is None or output_type is str or isinstance(output_type, AgentOutputSchemaBase):
+        return _originals["_get_output_schema"](cls, agent)
+    return output_schema(output_type)
+
+
+def install_output_schemas() -> None:
+    """Make the runner use shared schemas for agents whose `output_type` is a plain type, once."""
+    if "_get_output_schema" not in _originals:
+        _originals["_get_output_schema"] = Runner.__dict__["_get_output_schema"].__func__
+        Runner._get_output_schema = classmethod(_get_output_schema)
+
+
+def uninstall_output_schemas() -> None:
+    """
+    Let the runner build its own schemas again.
+
+    If something else patched `_get_output_schema` on top of ours in the meantime, the patch is left
+    in place so that the other one keeps working.
+    """
+    current = getattr(Runner.__dict__["_get_output_schema"], "__func__", None)
+    if "_get_output_schema" in _originals and current is _get_output_schema:
+        Runner._get_output_schema = classmethod(_originals.pop("_get_output_schema"))
+
+
+class PartialJSONParser:
+    """
+    Incremental scanner for one streamed JSON object.
+
+    Every character is looked at once across all `feed()` calls. A top-level string, object or array
+    value is complete at its closing character, numbers, booleans and null at the next `,` or `}`.
+    """
+
+    def __init__(self) -> None:
+        self.buffer = ""
+        self.fields: dict[str, Any] = {}
+        self.done = False
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._expect = "key"  # key, colon, value, in_value
+        self._key = ""
+        self._key_start = 0
+        self._value_start = 0
+        self._value_depth = 0  # depth the current value opened at, 0 for scalars
+
+    def feed(self, chunk: str) -> dict[str, Any]:
+        """Add streamed text, returns the fields completed by it."""
+        self.buffer += chunk
+        completed: dict[str, Any] = {}
+        buffer = self.buffer
+        for i in range(self._pos, len(buffer)):
+            if self.done:
+                break
+            c = buffer[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                    if self._depth == 1:
+                        if self._expect == "key":
+                            self._key = json.loads(buffer[self._key_start : i + 1])
+                            self._expect = "colon"
+                        elif self._expect == "in_value" and self._value_depth == 0:
+                            self._complete(buffer[self._value_start : i + 1], completed)
+                continue
+
+            if c == '"':
+                self._in_string = True
+                if self._depth == 1:
+                    if self._expect == "key":
+                        self._key_start = i
+                    elif self._expect == "value":
+                        self._start_value(i)
+            elif c in "{[":
+                if self._depth == 1 and self._expect == "value":
+                    self._start_value(i)
+                    self._value_depth = 2
+                self._depth += 1
+            elif c in "}]":
+                self._depth -= 1
+                if self._depth == 1 and self._expect == "in_value" and self._value_depth == 2:
+                    self._complete(buffer[self._value_start : i + 1], completed)
+                elif self._depth == 0:
+                    if self._expect == "in_value":
+                        self._complete(buffer[self._value_start : i], completed)
+                    self.done = True
+            elif self._depth == 1:
+                if c == ":" and self._expect == "colon":
+                    self._expect = "value"
+                elif c == ",":
+                    if self._expect == "in_value":
+                        self._complete(buffer[self._value_start : i], completed)
+                    self._expect = "key"
+                elif self._expect == "value" and not c.isspace():
+                    self._start_value(i)
+        self._pos = len(buffer)
+        return completed
+
+    def _start_value(self, index: int) -> None:
+        self._value_start = index
+        self._value_depth = 0
+        self._expect = "in_value"
+
+    def _complete(self, raw: str, completed: dict[str, Any]) -> None:
+        value = json.loads(raw)
+        self.fields[self._key] = completed[self._key] = value
+        self._expect = "after_value"
+
+    def partial(self) -> Any:
+        """Everything received so far as plain data, including an unfinished trailing string."""
+        if not self.buffer.strip():
+            return {}
+        return from_json(self.buffer, allow_partial="trailing-strings")
+
+
+def benchmark(output_type: type[Any], payload: str | bytes, iterations: int = 10_000) -> dict[str, float]:
+    """Validations/sec with a fresh SDK schema per validation (as per run) vs. the shared schema."""
+    started = time.perf_counter()
+    for _ in range(iterations // 10):
+        AgentOutputSchema(output_type).validate_json(payload)
+    per_run = (iterations // 10) / (time.perf_counter() - started)
+
+    prebuilt = AgentOutputSchema(output_type)
+    started = time.perf_counter()
+    for _ in range(iterations):
+        prebuilt.validate_json(payload)
+    sdk_prebuilt = iterations / (time.perf_counter() - started)
+
+    schema = output_schema(output_type)
+    raw = payload.encode() if isinstance(payload, str) else payload
+    started = time.perf_counter()
+    for _ in range(iterations):
+        schema.validate_json(raw)
+    shared = iterations / (time.perf_counter() - started)
+
+    started = time.perf_counter()
+    for _ in range(iterations // 10):
+        parser = PartialJSONParser()
+        for i in range(0, len(payload), 8):
+            parser.feed(payload[i : i + 8] if isinstance(payload, str) else payload[i : i + 8].decode())
+    streamed = (iterations // 10) / (time.perf_counter() - started)
+
+    return {"schema_per_run": per_run, "sdk_prebuilt": sdk_prebuilt, "shared_bytes": shared, "streamed_8_chars": streamed}
+
+
+def main() -> None:
+    from pydantic import BaseModel
+
+    class Country(BaseModel):
+        israel: bool
+        reason: str
+
+    payload = json.dumps({"israel": False, "reason": "The question is about the founder of Pakistan. " * 8})
+    for name, rate in benchmark(Country, payload).items():
+        print(f"{name:>18}: {rate:12,.0f} validations/sec")
+
+
+if __name__ == "__main__":
+    main()
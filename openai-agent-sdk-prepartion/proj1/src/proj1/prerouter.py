@@ -0,0 +1,213 @@
+"""
+Route queries to a specialist locally, without the triage model call.
+
+A triage agent like `TriageAgent` in `handoff.py` or the "Triage agent" in `customer_support_agent.py`
+spends a whole model call only to pick a specialist. `PreRouter` scores the query against a profile
+of each specialist (name, `handoff_description`, string instructions and optional example queries)
+with TF-IDF vectors and one NumPy matrix product for the cosine similarities. When the best
+specialist wins clearly the run starts at that specialist directly, otherwise the triage agent
+decides as before.
+
+    router = PreRouter.from_agent(triage_agent, examples={"RefundAgent": ["I want my money back"]})
+    result = await routed_run(router, triage_agent, "process refund requests?", run_config=config)
+    print(router.stats.direct_rate)
+
+A direct route skips the handoff itself. `from_agent` therefore leaves handoffs with an `on_handoff`
+callback or an `input_type` to the triage agent, those only run when the model makes the handoff.
+Pass `embed` to use a local embedding model instead of TF-IDF.
+"""
+from __future__ import annotations
+
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+import numpy as np
+from agents import Agent, Handoff, RunResult, RunResultStreaming, Runner
+from agents.extensions.handoff_prompt import RECOMMENDED_PROMPT_PREFIX
+
+Embed = Callable[[list[str]], np.ndarray]
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset(
+    "a an and are as at be by can do does for from how i if in is it me my of on or please so that the "
+    "their them then this to use user with you your what which who why will would".split()
+)
+
+
+def _has_handoff_effects(item: Handoff[Any]) -> bool:
+    """Whether the handoff takes model input or calls an `on_handoff` callback, both need the real handoff."""
+    if item.input_json_schema.get("properties"):
+        return True
+    invoke = item.on_invoke_handoff
+    code = getattr(invoke, "__code__", None)
+    if code is None or not invoke.__closure__:
+        return False
+    cells = dict(zip(code.co_freevars, invoke.__closure__))
+    callback = cells.get("on_handoff")
+    return callback is not None and callback.cell_contents is not None
+
+
+def tokenize(text: str) -> list[str]:
+    words = [w for w in _TOKEN.findall(text.lower()) if w not in _STOPWORDS]
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+class TfidfIndex:
+    """Sublinear TF-IDF over a fixed set of documents, rows L2-normalized."""
+
+    def __init__(self, documents: list[str]):
+        tokenized = [tokenize(doc) for doc in documents]
+        document_frequency = Counter(term for tokens in tokenized for term in set(tokens))
+        self.vocabulary = {term: i for i, term in enumerate(sorted(document_frequency))}
+        n = len(documents)
+        self.idf = np.array(
+            [math.log((1 + n) / (1 + document_frequency[term])) + 1 for term in self.vocabulary], dtype=np.float32
+        )
+        self.matrix = np.vstack([self.vectorize_tokens(tokens) for tokens in tokenized])
+
+    def vectorize_tokens(self, tokens: list[str]) -> np.ndarray:
+        vector = np.zeros(len(self.vocabulary), dtype=np.float32)
+        for term, count in Counter(tokens).items():
+            index = self.vocabulary.get(term)
+            if index is not None:
+                vector[index] = 1 + math.log(count)
+        vector *= self.idf
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def vectorize(self, text: str) -> np.ndarray:
+        return self.vectorize_tokens(tokenize(text))
+
+
+@dataclass
+class RouteDecision:
+    agent: Agent[Any] | None
+    """The specialist to start at, or None to let the triage agent decide."""
+    confidence: float
+    scores: dict[str, float]
+
+
+@dataclass
+class RouterStats:
+    queries: int = 0
+    direct: int = 0
+    by_agent: Counter[str] = field(default_factory=Counter)
+
+    @property
+    def fallback(self) -> int:
+        return self.queries - self.direct
+
+    @property
+    def direct_rate(self) -> float:
+        return self.direct / self.queries if self.queries else 0.0
+
+
+def agent_profile(agent: Agent[Any]) -> str:
+    parts = [agent.name.replace("_", " "), agent.handoff_description or ""]
+    if isinstance(agent.instructions, str):
+        parts.append(agent.instructions.replace(RECOMMENDED_PROMPT_PREFIX, ""))
+    return "\n".join(parts)
+
+
+class PreRouter:
+    def __init__(
+        self,
+        agents: list[Agent[Any]],
+        examples: dict[str, list[str]] | None = None,
+        min_score: float = 0.15,
+        min_margin: float = 0.08,
+        embed: Embed | None = None,
+    ):
+        """
+        `examples` maps agent names to sample queries that are added to their profile. A query is
+        routed directly if its best similarity is at least `min_score` and beats the runner-up by at
+        least `min_margin`.
+        """
+        if not agents:
+            raise ValueError("PreRouter needs at least one agent to route to")
+        self.agents = agents
+        self.min_score = min_score
+        self.min_margin = min_margin
+        self.embed = embed
+        self.stats = RouterStats()
+
+        examples = examples or {}
+        profiles = [agent_profile(agent) + "\n" + "\n".join(examples.get(agent.name, [])) for agent in agents]
+        if embed is None:
+            self._index: TfidfIndex | None = TfidfIndex(profiles)
+            self._matrix = self._index.matrix
+        else:
+            self._index = None
+            vectors = np.asarray(embed(profiles), dtype=np.float32)
+            self._matrix = vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+    @classmethod
+    def from_agent(
+        cls, triage_agent: Agent[Any], known_agents: list[Agent[Any]] | None = None, **kwargs: Any
+    ) -> PreRouter:
+        """
+        Build a router over the handoffs of `triage_agent`.
+
+        `Handoff` objects only carry the target's name, so the agents behind them have to be passed in
+        `known_agents`. Handoffs whose agent is unknown, or that have an `on_handoff` callback or
+        `input_type`, are left to the triage agent.
+        """
+        by_name = {agent.name: agent for agent in known_agents or []}
+        agents = []
+        for target in triage_agent.handoffs:
+            if isinstance(target, Agent):
+                agents.append(target)
+            elif isinstance(target, Handoff) and target.agent_name in by_name and not _has_handoff_effects(target):
+                agents.append(by_name[target.agent_name])
+        return cls(agents, **kwargs)
+
+    def _query_vector(self, query: str) -> np.ndarray:
+        if self._index is not None:
+            return self._index.vectorize(query)
+        vector = np.asarray(self.embed([query]), dtype=np.float32)[0]
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def route(self, query: str) -> RouteDecision:
+        scores = self._matrix @ self._query_vector(query)
+        order = np.argsort(scores)[::-1]
+        best = float(scores[order[0]])
+        runner_up = float(scores[order[1]]) if len(order) > 1 else 0.0
+        confident = best >= self.min_score and best - runner_up >= self.min_margin
+
+        agent = self.agents[int(order[0])] if confident else None
+        self.stats.queries += 1
+        if agent is not None:
+            self.stats.direct += 1
+            self.stats.by_agent[agent.name] += 1
+        return RouteDecision(
+            agent=agent,
+            confidence=best - runner_up,
+            scores={a.name: round(float(s), 4) for a, s in zip(self.agents, scores)},
+        )
+
+
+def query_text(input: str | list[Any]) -> str:
+    if isinstance(input, str):
+        return input
+    for item in reversed(input):
+        if isinstance(item, dict) and item.get("role") == "user" and isinstance(item.get("content"), str):
+            return item["content"]
+    return ""
+
+
+async def routed_run(router: PreRouter, triage_agent: Agent[Any], input: str | list[Any], **kwargs: Any) -> RunResult:
+    """`Runner.run` that starts at the routed specialist when the router is confident."""
+    decision = router.route(query_text(input))
+    return await Runner.run(decision.agent or triage_agent, input, **kwargs)
+
+
+def routed_run_streamed(
+    router: PreRouter, triage_agent: Agent[Any], input: str | list[Any], **kwargs: Any
+) -> RunResultStreaming:
+    """`Runner.run_streamed` that starts at the routed specialist when the router is confident."""
+    decision = router.route(query_text(input))
+    return Runner.run_streamed(decision.agent or triage_agent, input, **kwargs)
@@ -0,0 +1,398 @@
+"""
+Per-turn profiler built on RunHooks.
+
+`ProfilingRunHooks` is a drop-in replacement for `MyRunHook` in `Api-Refrence/lifecycle.py`. Instead
+of printing, every hook call is recorded as (event code, name id, monotonic timestamp) into
+preallocated `array` buffers that belong to the run. When the run ends the buffers are turned into
+per-tool and per-agent latency distributions, the time between turns and the time spent inside the
+hooks themselves.
+
+Runs that take longer than `slow_run_threshold` seconds additionally get a capture window: from the
+moment the threshold is crossed until the end of the run, `cProfile` and `tracemalloc` are switched on
+and their top entries are kept on the finished `RunSummary`.
+
+    hooks = ProfilingRunHooks(slow_run_threshold=5.0)
+    with hooks.track():
+        await Runner.run(agent, "...", run_config=config, hooks=hooks)
+    print(hooks.report())
+
+A run is finished by `on_agent_end`, which a run that raises never gets to. `track()` finishes the runs
+started inside it on the way out, whatever happened, and closes their capture window. Runs outside of
+`track()` that never ended are only finished once their context is gone and its id is used again.
+
+The SDK used here has no LLM hooks and calls `on_agent_start` only for the first turn and after
+handoffs, so the time between turns cannot be read off turn boundaries. Without LLM hooks it is taken
+as the time from the agent starting, or from its last running tool ending, to the next hook call,
+which is the time spent waiting for the model.
+"""
+from __future__ import annotations
+
+import cProfile
+import io
+import pstats
+import statistics
+import time
+import tracemalloc
+import weakref
+from array import array
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Iterator
+
+from agents import Agent, RunContextWrapper, RunHooks, Tool
+
+AGENT_START = 0
+AGENT_END = 1
+HANDOFF = 2
+TOOL_START = 3
+TOOL_END = 4
+LLM_START = 5
+LLM_END = 6
+
+EVENT_NAMES = ("agent_start", "agent_end", "handoff", "tool_start", "tool_end", "llm_start", "llm_end")
+
+# Ids of the run contexts first seen inside the innermost `ProfilingRunHooks.track()`
+_tracked: ContextVar[list[int] | None] = ContextVar("profiling_tracked", default=None)
+
+
+@dataclass
+class LatencyStats:
+    count: int
+    mean: float
+    p50: float
+    p95: float
+    max: float
+
+    @classmethod
+    def from_samples(cls, samples: list[float]) -> LatencyStats:
+        ordered = sorted(samples)
+        p95_index = min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))
+        return cls(
+            count=len(ordered),
+            mean=statistics.fmean(ordered),
+            p50=statistics.median(ordered),
+            p95=ordered[p95_index],
+            max=ordered[-1],
+        )
+
+    def __str__(self) -> str:
+        return (
+            f"n={self.count} mean={self.mean * 1000:.1f}ms p50={self.p50 * 1000:.1f}ms "
+            f"p95={self.p95 * 1000:.1f}ms max={self.max * 1000:.1f}ms"
+        )
+
+
+class RunProfile:
+    """Event buffer for a single run. Arrays grow by doubling if `capacity` is exceeded."""
+
+    __slots__ = ("events", "name_ids", "timestamps", "hook_time", "size", "started_at", "context",
+                 "capture_profiler", "capture_started_at", "cprofile_stats", "top_allocations")
+
+    def __init__(self, capacity: int, context: RunContextWrapper[Any]):
+        self.events = array("B", bytes(capacity))
+        self.name_ids = array("H", [0]) * capacity
+        self.timestamps = array("d", [0.0]) * capacity
+        self.hook_time = array("d", [0.0]) * capacity
+        self.size = 0
+        self.started_at = time.perf_counter()
+        self.context = weakref.ref(context)
+        self.capture_profiler: cProfile.Profile | None = None
+        self.capture_started_at: float | None = None
+        self.cprofile_stats: str | None = None
+        self.top_allocations: list[str] = []
+
+    def record(self, event: int, name_id: int, timestamp: float) -> int:
+        if self.size == len(self.events):
+            self.events.extend(bytes(self.size))
+            self.name_ids.extend(array("H", [0]) * self.size)
+            self.timestamps.extend(array("d", [0.0]) * self.size)
+            self.hook_time.extend(array("d", [0.0]) * self.size)
+        index = self.size
+        self.events[index] = event
+        self.name_ids[index] = name_id
+        self.timestamps[index] = timestamp
+        self.size += 1
+        return index
+
+    @property
+    def duration(self) -> float:
+        if self.size == 0:
+            return 0.0
+        return self.timestamps[self.size - 1] - self.started_at
+
+
+@dataclass
+class RunSummary:
+    duration: float
+    events: int
+    hook_overhead: float
+    tool_samples: dict[str, list[float]] = field(default_factory=dict)
+    agent_samples: dict[str, list[float]] = field(default_factory=dict)
+    turn_gaps: list[float] = field(default_factory=list)
+    cprofile_stats: str | None = None
+    top_allocations: list[str] = field(default_factory=list)
+    completed: bool = True
+    """False for runs finished without `on_agent_end`, e.g. because they raised."""
+
+    @property
+    def tool_latency(self) -> dict[str, LatencyStats]:
+        return {name: LatencyStats.from_samples(v) for name, v in self.tool_samples.items()}
+
+    @property
+    def agent_latency(self) -> dict[str, LatencyStats]:
+        return {name: LatencyStats.from_samples(v) for name, v in self.agent_samples.items()}
+
+    @property
+    def between_turns(self) -> LatencyStats | None:
+        return LatencyStats.from_samples(self.turn_gaps) if self.turn_gaps else None
+
+
+class ProfilingRunHooks(RunHooks[Any]):
+    def __init__(
+        self,
+        capacity: int = 256,
+        slow_run_threshold: float | None = None,
+        capture_top_n: int = 20,
+        max_runs: int = 1000,
+    ):
+        self.capacity = capacity
+        self.slow_run_threshold = slow_run_threshold
+        self.capture_top_n = capture_top_n
+        self.max_runs = max_runs
+
+        self._names: list[str] = []
+        self._name_ids: dict[str, int] = {}
+        self._active: dict[int, RunProfile] = {}
+        self.finished: list[RunSummary] = []
+        # Only one cProfile/tracemalloc window can be open per process
+        self._capturing: RunProfile | None = None
+        self._owns_tracemalloc = False
+
+    def _name_id(self, name: str) -> int:
+        name_id = self._name_ids.get(name)
+        if name_id is None:
+            name_id = self._name_ids[name] = len(self._names)
+            self._names.append(name)
+        return name_id
+
+    def _record(self, context: RunContextWrapper[Any], event: int, name: str) -> RunProfile:
+        entered = time.perf_counter()
+        profile = self._active.get(id(context))
+        if profile is None or profile.context() is not context:
+            if profile is not None:
+                # The context of a run that never ended is gone and its id was reused
+                self._finish(id(context), completed=False)
+            profile = self._active[id(context)] = RunProfile(self.capacity, context)
+            tracked = _tracked.get()
+            if tracked is not None:
+                tracked.append(id(context))
+        index = profile.record(event, self._name_id(name), entered)
+
+        if (
+            self.slow_run_threshold is not None
+            and self._capturing is None
+            and profile.capture_started_at is None
+            and entered - profile.started_at > self.slow_run_threshold
+        ):
+            self._start_capture(profile)
+
+        profile.hook_time[index] = time.perf_counter() - entered
+        return profile
+
+    def _start_capture(self, profile: RunProfile) -> None:
+        profile.capture_started_at = time.perf_counter()
+        profile.capture_profiler = cProfile.Profile()
+        try:
+            profile.capture_profiler.enable()
+        except ValueError:
+            # Another profiler is already active in this process
+            profile.capture_profiler = None
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._owns_tracemalloc = True
+        self._capturing = profile
+
+    def _stop_capture(self, profile: RunProfile) -> None:
+        if profile.capture_profiler is not None:
+            profile.capture_profiler.disable()
+            out = io.StringIO()
+            pstats.Stats(profile.capture_profiler, stream=out).sort_stats("cumulative").print_stats(self.capture_top_n)
+            profile.cprofile_stats = out.getvalue()
+            profile.capture_profiler = None
+        if self._owns_tracemalloc:
+            snapshot = tracemalloc.take_snapshot()
+            tracemalloc.stop()
+            self._owns_tracemalloc = False
+            profile.top_allocations = [str(stat) for stat in snapshot.statistics("lineno")[: self.capture_top_n]]
+        self._capturing = None
+
+    @contextmanager
+    def track(self) -> Iterator[ProfilingRunHooks]:
+        """Finish the runs started inside this block when it exits, including runs that raised."""
+        tracked: list[int] = []
+        token = _tracked.set(tracked)
+        try:
+            yield self
+        finally:
+            _tracked.reset(token)
+            for key in tracked:
+                self._finish(key, completed=False)
+
+    def _finish(self, key: int, completed: bool = True) -> None:
+        profile = self._active.pop(key, None)
+        if profile is None:
+            return
+        if self._capturing is profile:
+            self._stop_capture(profile)
+        summary = self._summarize(profile)
+        summary.completed = completed
+        self.finished.append(summary)
+        if len(self.finished) > self.max_runs:
+            del self.finished[: len(self.finished) - self.max_runs]
+
+    def _summarize(self, profile: RunProfile) -> RunSummary:
+        tool_samples: dict[str, list[float]] = defaultdict(list)
+        agent_samples: dict[str, list[float]] = defaultdict(list)
+        open_tools: dict[int, list[float]] = defaultdict(list)
+        running_tools = 0
+        turn_marks: list[float] = []
+        model_waits: list[float] = []
+        waiting_since: float | None = None
+        current_agent: tuple[int, float] | None = None
+
+        for i in range(profile.size):
+            event, name_id, ts = profile.events[i], profile.name_ids[i], profile.timestamps[i]
+            if waiting_since is not None and event in (TOOL_START, HANDOFF, AGENT_END):
+                model_waits.append(ts - waiting_since)
+                waiting_since = None
+            if event == TOOL_START:
+                open_tools[name_id].append(ts)
+                running_tools += 1
+            elif event == TOOL_END and open_tools[name_id]:
+                # Tools of one turn run concurrently, so pair starts and ends first-in first-out
+                tool_samples[self._names[name_id]].append(ts - open_tools[name_id].pop(0))
+                running_tools -= 1
+                if running_tools == 0:
+                    # The SDK calls every start hook of a turn before any end hook, so this was its last tool
+                    waiting_since = ts
+            elif event in (AGENT_START, LLM_START):
+                turn_marks.append(ts)
+                if event == AGENT_START:
+                    current_agent = (name_id, ts)
+                    waiting_since = ts
+            elif event in (HANDOFF, AGENT_END) and current_agent is not None:
+                agent_id, started = current_agent
+                agent_samples[self._names[agent_id]].append(ts - started)
+                current_agent = None
+
+        if LLM_START in profile.events[: profile.size]:
+            gaps = [b - a for a, b in zip(turn_marks, turn_marks[1:])]
+        else:
+            gaps = model_waits
+        return RunSummary(
+            duration=profile.duration,
+            events=profile.size,
+            hook_overhead=sum(profile.hook_time[: profile.size]),
+            tool_samples=dict(tool_samples),
+            agent_samples=dict(agent_samples),
+            turn_gaps=gaps,
+            cprofile_stats=profile.cprofile_stats,
+            top_allocations=profile.top_allocations,
+        )
+
+    async def on_agent_start(self, context: RunContextWrapper[Any], agent: Agent[Any]) -> None:
+        self._record(context, AGENT_START, agent.name)
+
+    async def on_agent_end(self, context: RunContextWrapper[Any], agent: Agent[Any], output: Any) -> None:
+        self._record(context, AGENT_END, agent.name)
+        self._finish(id(context))
+
+    async def on_handoff(self, context: RunContextWrapper[Any], from_agent: Agent[Any], to_agent: Agent[Any]) -> None:
+        self._record(context, HANDOFF, from_agent.name)
+
+    async def on_tool_start(self, context: RunContextWrapper[Any], agent: Agent[Any], tool: Tool) -> None:
+        self._record(context, TOOL_START, tool.name)
+
+    async def on_tool_end(self, context: RunContextWrapper[Any], agent: Agent[Any], tool: Tool, result: str) -> None:
+        self._record(context, TOOL_END, tool.name)
+
+    # Only called by SDK versions that have LLM hooks; they give exact turn boundaries
+    async def on_llm_start(self, context: RunContextWrapper[Any], agent: Agent[Any], *args: Any) -> None:
+        self._record(context, LLM_START, agent.name)
+
+    async def on_llm_end(self, context: RunContextWrapper[Any], agent: Agent[Any], *args: Any) -> None:
+        self._record(context, LLM_END, agent.name)
+
+    def aggregate(self) -> RunSummary:
+        """Merge the samples of all finished runs into one summary."""
+        total = RunSummary(duration=0.0, events=0, hook_overhead=0.0)
+        for run in self.finished:
+            total.duration += run.duration
+            total.events += run.events
+            total.hook_overhead += run.hook_overhead
+            total.turn_gaps.extend(run.turn_gaps)
+            for name, samples in run.tool_samples.items():
+                total.tool_samples.setdefault(name, []).extend(samples)
+            for name, samples in run.agent_samples.items():
+                total.agent_samples.setdefault(name, []).extend(samples)
+        return total
+
+    def report(self) -> str:
+        lines = []
+        for i, run in enumerate(self.finished, 1):
+            lines.append(
+                f"Run {i}: {run.duration * 1000:.1f} ms, {run.events} hook events, "
+                f"{run.hook_overhead * 1_000_000:.0f} us in hooks{'' if run.completed else ', did not finish'}"
+            )
+            for name, stats in run.agent_latency.items():
+                lines.append(f"  agent {name:<25} {stats}")
+            for name, stats in run.tool_latency.items():
+                lines.append(f"  tool  {name:<25} {stats}")
+            if run.between_turns:
+                lines.append(f"  between turns {run.between_turns}")
+            if run.cprofile_stats:
+                lines.append("  slow run capture (cProfile):")
+                lines.extend(f"    {line}" for line in run.cprofile_stats.splitlines() if line.strip())
+            if run.top_allocations:
+                lines.append("  slow run capture (tracemalloc):")
+                lines.extend(f"    {line}" for line in run.top_allocations)
+        return "\n".join(lines)
+
+
+async def main():
+    import os
+    from typing import cast
+    from dotenv import load_dotenv
+    from openai import AsyncOpenAI
+    from agents import ModelProvider, OpenAIChatCompletionsModel, RunConfig, Runner, function_tool
+
+    load_dotenv()
+    gemini_api_key = os.getenv("GEMINI_API_KEY")
+    if not gemini_api_key:
+        raise ValueError("GEMINI_API_KEY is not set. Please ensure it is defined in your .env file.")
+
+    external_client = AsyncOpenAI(
+        api_key=gemini_api_key,
+        base_url="https://generativelanguage.googleapis.com/v1beta/openai/",
+    )
+    model = OpenAIChatCompletionsModel(model="gemini-2.0-flash", openai_client=external_client)
+    config = RunConfig(model=model, model_provider=cast(ModelProvider, external_client), tracing_disabled=True)
+
+    @function_tool
+    def calculator(a: int, b: int) -> int:
+        """Add two numbers"""
+        return a + b
+
+    agent: Agent = Agent(name="panacloud_agent", instructions="Use the calculator for sums.", model=model, tools=[calculator])
+    hooks = ProfilingRunHooks(slow_run_threshold=3.0)
+    for question in ["What is 2 + 40?", "What is 17 + 25?"]:
+        with hooks.track():
+            await Runner.run(agent, question, run_config=config, hooks=hooks)
+    print(hooks.report())
+
+
+if __name__ == "__main__":
+    import asyncio
+    asyncio.run(main())
@@ -0,0 +1,493 @@
+"""
+Record a live agent run and replay it offline.
+
+`RecordingModel` wraps the real model and writes every model request digest, response (or stream
+events) and latency into a compact gzip JSON-lines file. While the `Recorder` is entered, every
+function tool call made in that context is written too, with its arguments and its result. A
+`ReplayModel` built from that file then answers `Runner.run` / `Runner.run_streamed` with exactly
+the recorded responses, either with the recorded latency, accelerated, or with no delay at all, and
+the tools are answered from the recording instead of being executed, so the framework overhead of a
+workload can be measured and regressions caught without network access or side effects.
+
+    with Recorder("recordings/multi_agent.jsonl.gz") as recorder:
+        config = RunConfig(model=RecordingModel(model, recorder), tracing_disabled=True)
+        await Runner.run(panacloud_agent, "Calculate (15 + 7) * 3", run_config=config)
+
+    report = await replay_run(panacloud_agent, "Calculate (15 + 7) * 3", "recordings/multi_agent.jsonl.gz", speed=0)
+    print(report)
+
+`replay_run(..., stub_tools=False)` runs the real tools instead and compares their results with the
+recorded ones. Run this module for a record and replay of a small calculator agent.
+
+The SDK's tool hooks do not see the call arguments, so tool calls are captured by wrapping the tools
+the runner is about to execute (`RunImpl.execute_function_tool_calls`). The wrapper is installed on
+first use and only acts in a context where a `Recorder` or a replay is active.
+"""
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import dataclasses
+import gzip
+import hashlib
+import json
+import time
+from collections import deque
+from collections.abc import AsyncIterator
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+from agents import Agent, FunctionTool, RunConfig, RunContextWrapper, Runner, Tool
+from agents._run_impl import RunImpl, ToolRunFunction
+from agents.agent_output import AgentOutputSchemaBase
+from agents.handoffs import Handoff
+from agents.items import ModelResponse, TResponseInputItem, TResponseOutputItem, TResponseStreamEvent
+from agents.model_settings import ModelSettings
+from agents.models.interface import Model, ModelTracing
+from agents.usage import Usage
+from openai.types.responses.response_usage import InputTokensDetails, OutputTokensDetails
+from pydantic import TypeAdapter
+
+from proj1.tool_cache import canonical_arguments
+
+FORMAT_VERSION = 2
+
+_output_items = TypeAdapter(list[TResponseOutputItem])
+_stream_event = TypeAdapter(TResponseStreamEvent)
+
+ToolWrapper = Callable[[Agent[Any], FunctionTool], FunctionTool]
+
+_tool_wrapper: contextvars.ContextVar[ToolWrapper | None] = contextvars.ContextVar("replay_tool_wrapper", default=None)
+_execute_function_tool_calls = RunImpl.__dict__["execute_function_tool_calls"].__func__
+
+
+async def _execute_wrapped_tools(cls: type[RunImpl], *, agent: Agent[Any], tool_runs: list[ToolRunFunction], **kwargs: Any) -> Any:
+    wrap = _tool_wrapper.get()
+    if wrap is not None:
+        tool_runs = [ToolRunFunction(tool_call=run.tool_call, function_tool=wrap(agent, run.function_tool)) for run in tool_runs]
+    return await _execute_function_tool_calls(cls, agent=agent, tool_runs=tool_runs, **kwargs)
+
+
+def _install_tool_wrapper() -> None:
+    if RunImpl.__dict__["execute_function_tool_calls"].__func__ is not _execute_wrapped_tools:
+        RunImpl.execute_function_tool_calls = classmethod(_execute_wrapped_tools)
+
+
+def request_digest(system_instructions: str | None, input: str | list[TResponseInputItem], tools: list[Tool], handoffs: list[Handoff]) -> str:
+    """Stable hash of what the framework sent to the model. A changed digest means changed behaviour."""
+    payload = {
+        "instructions": system_instructions,
+        "input": input,
+        "tools": sorted(tool.name for tool in tools),
+        "handoffs": sorted(h.tool_name for h in handoffs),
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+
+def _dump_usage(usage: Usage) -> dict[str, int]:
+    return {
+        "requests": usage.requests,
+        "input_tokens": usage.input_tokens,
+        "output_tokens": usage.output_tokens,
+        "total_tokens": usage.total_tokens,
+        "cached_tokens": usage.input_tokens_details.cached_tokens,
+        "reasoning_tokens": usage.output_tokens_details.reasoning_tokens,
+    }
+
+
+def _load_usage(data: dict[str, int]) -> Usage:
+    return Usage(
+        requests=data["requests"],
+        input_tokens=data["input_tokens"],
+        output_tokens=data["output_tokens"],
+        total_tokens=data["total_tokens"],
+        input_tokens_details=InputTokensDetails(cached_tokens=data["cached_tokens"]),
+        output_tokens_details=OutputTokensDetails(reasoning_tokens=data["reasoning_tokens"]),
+    )
+
+
+class Recorder:
+    """
+    Appends recording entries to a gzip JSON-lines file.
+
+    Entering it records the function tool calls made in the block, leaving it closes the file.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = gzip.open(path, "wt", encoding="utf-8")
+        self._write({"kind": "header", "version": FORMAT_VERSION, "created": time.time()})
+        self.model_calls = 0
+        self._token: contextvars.Token[ToolWrapper | None] | None = None
+
+    def __enter__(self) -> Recorder:
+        _install_tool_wrapper()
+        self._token = _tool_wrapper.set(self._wrap_tool)
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        if self._token is not None:
+            _tool_wrapper.reset(self._token)
+            self._token = None
+        self.close()
+
+    def _wrap_tool(self, agent: Agent[Any], tool: FunctionTool) -> FunctionTool:
+        invoke = tool.on_invoke_tool
+
+        async def on_invoke_tool(ctx: RunContextWrapper[Any], arguments: str) -> Any:
+            result = await invoke(ctx, arguments)
+            self.record_tool(agent.name, tool.name, arguments, result)
+            return result
+
+        return dataclasses.replace(tool, on_invoke_tool=on_invoke_tool)
+
+    def _write(self, entry: dict[str, Any]) -> None:
+        if self._file.closed:
+            # e.g. a cancelled stream that is only finalized after the recorder was left
+            return
+        self._file.write(json.dumps(entry, separators=(",", ":"), default=str) + "\n")
+
+    def record_response(self, digest: str, latency: float, response: ModelResponse) -> None:
+        self._write({
+            "kind": "model",
+            "mode": "response",
+            "call": self.model_calls,
+            "digest": digest,
+            "latency": latency,
+            "output": [item.model_dump(mode="json", exclude_unset=True) for item in response.output],
+            "usage": _dump_usage(response.usage),
+            "response_id": response.response_id,
+        })
+        self.model_calls += 1
+
+    def record_stream(self, digest: str, events: list[tuple[float, TResponseStreamEvent]], complete: bool = True) -> None:
+        self._write({
+            "kind": "model",
+            "mode": "stream",
+            "call": self.model_calls,
+            "digest": digest,
+            "latency": events[-1][0] if events else 0.0,
+            "events": [[offset, event.model_dump(mode="json", exclude_unset=True)] for offset, event in events],
+            "complete": complete,
+        })
+        self.model_calls += 1
+
+    def record_tool(self, agent: str, tool: str, arguments: str, result: Any) -> None:
+        self._write({"kind": "tool", "agent": agent, "tool": tool, "arguments": arguments, "result": str(result)})
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class RecordingModel(Model):
+    """Passes calls through to `inner` and records what came back."""
+
+    def __init__(self, inner: Model, recorder: Recorder):
+        self.inner = inner
+        self.recorder = recorder
+
+    async def get_response(
+        self,
+        system_instructions: str | None,
+        input: str | list[TResponseInputItem],
+        model_settings: ModelSettings,
+        tools: list[Tool],
+        output_schema: AgentOutputSchemaBase | None,
+        handoffs: list[Handoff],
+        tracing: ModelTracing,
+        **kwargs: Any,
+    ) -> ModelResponse:
+        digest = request_digest(system_instructions, input, tools, handoffs)
+        started = time.perf_counter()
+        response = await self.inner.get_response(
+            system_instructions, input, model_settings, tools, output_schema, handoffs, tracing, **kwargs
+        )
+        self.recorder.record_response(digest, time.perf_counter() - started, response)
+        return response
+
+    async def stream_response(
+        self,
+        system_instructions: str | None,
+        input: str | list[TResponseInputItem],
+        model_settings: ModelSettings,
+        tools: list[Tool],
+        output_schema: AgentOutputSchemaBase | None,
+        handoffs: list[Handoff],
+        tracing: ModelTracing,
+        **kwargs: Any,
+    ) -> AsyncIterator[TResponseStreamEvent]:
+        digest = request_digest(system_instructions, input, tools, handoffs)
+        started = time.perf_counter()
+        events = []
+        complete = False
+        try:
+            async for event in self.inner.stream_response(
+                system_instructions, input, model_settings, tools, output_schema, handoffs, tracing, **kwargs
+            ):
+                events.append((time.perf_counter() - started, event))
+                yield event
+            complete = True
+        finally:
+            # A cancelled or failed stream is recorded too, with what arrived before it stopped
+            self.recorder.record_stream(digest, events, complete)
+
+
+@dataclass
+class Recording:
+    model_calls: list[dict[str, Any]] = field(default_factory=list)
+    tool_results: list[dict[str, Any]] = field(default_factory=list)
+
+    @classmethod
+    def load(cls, path: str) -> Recording:
+        recording = cls()
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                entry = json.loads(line)
+                if entry["kind"] == "header" and entry["version"] != FORMAT_VERSION:
+                    raise ValueError(f"Unsupported recording version {entry['version']} in {path}")
+                elif entry["kind"] == "model":
+                    recording.model_calls.append(entry)
+                elif entry["kind"] == "tool":
+                    recording.tool_results.append(entry)
+        return recording
+
+
+class ReplayExhausted(Exception):
+    """The run asked the model for more responses than were recorded."""
+
+
+class ReplayModel(Model):
+    """
+    Answers every model call with the next recorded response.
+
+    `speed` scales the recorded latency: 1.0 replays in real time, 10.0 ten times faster and 0
+    skips the delay so only framework time is left. Requests whose digest differs from the recording
+    are collected in `divergences` instead of failing the run, so a regression report can list them all.
+    """
+
+    def __init__(self, recording: Recording, speed: float = 0.0):
+        self.recording = recording
+        self.speed = speed
+        self.calls = 0
+        self.simulated_latency = 0.0
+        self.divergences: list[tuple[int, str, str]] = []
+
+    def _next(
+        self,
+        system_instructions: str | None,
+        input: str | list[TResponseInputItem],
+        tools: list[Tool],
+        handoffs: list[Handoff],
+    ) -> dict[str, Any]:
+        if self.calls >= len(self.recording.model_calls):
+            raise ReplayExhausted(f"Recording has only {len(self.recording.model_calls)} model calls")
+        entry = self.recording.model_calls[self.calls]
+        digest = request_digest(system_instructions, input, tools, handoffs)
+        if digest != entry["digest"]:
+            self.divergences.append((self.calls, entry["digest"], digest))
+        self.calls += 1
+        return entry
+
+    async def _sleep(self, seconds: float) -> None:
+        if self.speed and seconds > 0:
+            delay = seconds / self.speed
+            self.simulated_latency += delay
+            await asyncio.sleep(delay)
+
+    async def get_response(
+        self,
+        system_instructions: str | None,
+        input: str | list[TResponseInputItem],
+        model_settings: ModelSettings,
+        tools: list[Tool],
+        output_schema: AgentOutputSchemaBase | None,
+        handoffs: list[Handoff],
+        tracing: ModelTracing,
+        **kwargs: Any,
+    ) -> ModelResponse:
+        entry = self._next(system_instructions, input, tools, handoffs)
+        if entry["mode"] != "response":
+            raise ValueError(f"Model call {entry['call']} was recorded as a stream, replay it with Runner.run_streamed")
+        await self._sleep(entry["latency"])
+        return ModelResponse(
+            output=_output_items.validate_python(entry["output"]),
+            usage=_load_usage(entry["usage"]),
+            response_id=entry["response_id"],
+        )
+
+    async def stream_response(
+        self,
+        system_instructions: str | None,
+        input: str | list[TResponseInputItem],
+        model_settings: ModelSettings,
+        tools: list[Tool],
+        output_schema: AgentOutputSchemaBase | None,
+        handoffs: list[Handoff],
+        tracing: ModelTracing,
+        **kwargs: Any,
+    ) -> AsyncIterator[TResponseStreamEvent]:
+        entry = self._next(system_instructions, input, tools, handoffs)
+        if entry["mode"] != "stream":
+            raise ValueError(f"Model call {entry['call']} was recorded without streaming, replay it with Runner.run")
+        previous = 0.0
+        for offset, event in entry["events"]:
+            await self._sleep(offset - previous)
+            previous = offset
+            yield _stream_event.validate_python(event)
+        if not entry.get("complete", True):
+            raise ReplayExhausted(f"Model call {entry['call']} was interrupted after {len(entry['events'])} events when recorded")
+
+
+class ReplayTools:
+    """
+    Answers tool calls from the recording, by tool name and arguments.
+
+    A call that was recorded several times gets the recorded results in order. A call that was never
+    recorded runs the real tool and is listed in `mismatches`. With `stub=False` every tool runs and
+    its result is compared with the recorded one instead.
+    """
+
+    def __init__(self, recording: Recording, stub: bool = True):
+        self.stub = stub
+        self.calls = 0
+        self.mismatches: list[tuple[str, str, str]] = []
+        self._results: dict[tuple[str, str], deque[str]] = {}
+        for entry in recording.tool_results:
+            key = (entry["tool"], canonical_arguments(entry["arguments"]))
+            self._results.setdefault(key, deque()).append(entry["result"])
+
+    def wrap(self, agent: Agent[Any], tool: FunctionTool) -> FunctionTool:
+        invoke = tool.on_invoke_tool
+
+        async def on_invoke_tool(ctx: RunContextWrapper[Any], arguments: str) -> Any:
+            self.calls += 1
+            recorded = self._results.get((tool.name, canonical_arguments(arguments)))
+            if not recorded:
+                result = await invoke(ctx, arguments)
+                self.mismatches.append((tool.name, f"<not recorded for {arguments}>", str(result)))
+                return result
+            expected = recorded.popleft() if len(recorded) > 1 else recorded[0]
+            if self.stub:
+                return expected
+            result = await invoke(ctx, arguments)
+            if str(result) != expected:
+                self.mismatches.append((tool.name, expected, str(result)))
+            return result
+
+        return dataclasses.replace(tool, on_invoke_tool=on_invoke_tool)
+
+
+@dataclass
+class ReplayReport:
+    wall_time: float
+    simulated_latency: float
+    model_calls: int
+    divergences: list[tuple[int, str, str]]
+    tool_mismatches: list[tuple[str, str, str]]
+    final_output: Any
+
+    @property
+    def framework_overhead(self) -> float:
+        return self.wall_time - self.simulated_latency
+
+    @property
+    def identical(self) -> bool:
+        return not self.divergences and not self.tool_mismatches
+
+    def __str__(self) -> str:
+        return (
+            f"Replayed {self.model_calls} model calls in {self.wall_time * 1000:.1f} ms "
+            f"(framework overhead {self.framework_overhead * 1000:.1f} ms), "
+            f"{len(self.divergences)} request divergences, {len(self.tool_mismatches)} tool mismatches"
+        )
+
+
+async def replay_run(
+    starting_agent: Agent[Any],
+    input: str | list[TResponseInputItem],
+    recording_path: str,
+    speed: float = 0.0,
+    context: Any = None,
+    streamed: bool = False,
+    stub_tools: bool = True,
+) -> ReplayReport:
+    """
+    Drive `Runner.run` (or `Runner.run_streamed`) with the responses from `recording_path`.
+
+    Tools are answered from the recording unless `stub_tools=False`, see `ReplayTools`.
+    """
+    recording = Recording.load(recording_path)
+    model = ReplayModel(recording, speed=speed)
+    tools = ReplayTools(recording, stub=stub_tools)
+    config = RunConfig(model=model, tracing_disabled=True)
+
+    _install_tool_wrapper()
+    token = _tool_wrapper.set(tools.wrap)
+    started = time.perf_counter()
+    try:
+        if streamed:
+            result = Runner.run_streamed(starting_agent, input, context=context, run_config=config)
+            async for _ in result.stream_events():
+                pass
+        else:
+            result = await Runner.run(starting_agent, input, context=context, run_config=config)
+    finally:
+        _tool_wrapper.reset(token)
+    wall_time = time.perf_counter() - started
+
+    return ReplayReport(
+        wall_time=wall_time,
+        simulated_latency=model.simulated_latency,
+        model_calls=model.calls,
+        divergences=model.divergences,
+        tool_mismatches=tools.mismatches,
+        final_output=result.final_output,
+    )
+
+
+async def main():
+    import os
+    import tempfile
+    from typing import cast
+    from dotenv import load_dotenv
+    from openai import AsyncOpenAI
+    from agents import ModelProvider, OpenAIChatCompletionsModel, function_tool
+
+    load_dotenv()
+    gemini_api_key = os.getenv("GEMINI_API_KEY")
+    if not gemini_api_key:
+        raise ValueError("GEMINI_API_KEY is not set. Please ensure it is defined in your .env file.")
+
+    external_client = AsyncOpenAI(
+        api_key=gemini_api_key,
+        base_url="https://generativelanguage.googleapis.com/v1beta/openai/",
+    )
+    model = OpenAIChatCompletionsModel(model="gemini-2.0-flash", openai_client=external_client)
+
+    executed: list[str] = []
+
+    @function_tool
+    def calculator(a: int, b: int, operation: str) -> int:
+        """Apply `operation` (add or multiply) to two numbers"""
+        executed.append(f"{operation}({a}, {b})")
+        return a + b if operation == "add" else a * b
+
+    agent: Agent = Agent(name="panacloud_agent", instructions="Use the calculator for every step.", tools=[calculator])
+    question = "Calculate (15 + 7) * 3"
+    path = os.path.join(tempfile.gettempdir(), "panacloud_agent.jsonl.gz")
+
+    with Recorder(path) as recorder:
+        config = RunConfig(model=RecordingModel(model, recorder), model_provider=cast(ModelProvider, external_client), tracing_disabled=True)
+        live_started = time.perf_counter()
+        live = await Runner.run(agent, question, run_config=config)
+        live_time = time.perf_counter() - live_started
+    print(f"Recorded {recorder.model_calls} model calls and tools {executed} in {live_time * 1000:.1f} ms to {path}")
+
+    executed.clear()
+    report = await replay_run(agent, question, path, speed=0)
+    print(report)
+    print(f"Tools executed during replay: {executed}, same output: {report.final_output == live.final_output}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,184 @@
+"""
+Resumable streamed runs.
+
+A run started through `ResumableRunRegistry` is pumped by a background task that writes every event
+into a bounded per-run `RunEventLog` with monotonically increasing offsets, independent of whether
+any client is listening. A client that drops (for example during the triage flow in `handoff.py`)
+reconnects with the last offset it saw, the SSE `Last-Event-ID`, and continues from there while
+the run keeps going upstream, instead of paying for the whole run again.
+
+Retention is limited per run by number of events, total bytes and age, and finished runs are
+forgotten `finished_ttl` seconds after they complete.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from collections import deque
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
+from itertools import islice
+from typing import Any
+
+from agents import RunResultStreaming
+
+from proj1.stream_multiplex import MultiplexedEvent, serialize_event
+
+
+@dataclass
+class LoggedEvent:
+    offset: int
+    created_at: float
+    payload: str
+
+
+class EventsExpired(Exception):
+    """The requested offset has already been evicted from the run's log."""
+
+    def __init__(self, requested: int, oldest: int):
+        super().__init__(f"Events after offset {requested} are gone, the oldest retained offset is {oldest}")
+        self.requested = requested
+        self.oldest = oldest
+
+
+class RunEventLog:
+    def __init__(self, max_events: int = 10_000, max_bytes: int = 4 * 1024 * 1024, max_age: float = 600.0):
+        self.max_events = max_events
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+
+        self._events: deque[LoggedEvent] = deque()
+        self._bytes = 0
+        self._next_offset = 1
+        self._changed = asyncio.Condition()
+        self.completed_at: float | None = None
+
+    @property
+    def completed(self) -> bool:
+        return self.completed_at is not None
+
+    @property
+    def last_offset(self) -> int:
+        return self._next_offset - 1
+
+    def _evict(self, now: float) -> None:
+        while self._events and (
+            len(self._events) > self.max_events
+            or self._bytes > self.max_bytes
+            or now - self._events[0].created_at > self.max_age
+        ):
+            self._bytes -= len(self._events.popleft().payload)
+
+    async def append(self, message: dict[str, Any]) -> int:
+        now = time.monotonic()
+        event = LoggedEvent(self._next_offset, now, json.dumps(message, separators=(",", ":")))
+        self._next_offset += 1
+        self._events.append(event)
+        self._bytes += len(event.payload)
+        self._evict(now)
+        async with self._changed:
+            self._changed.notify_all()
+        return event.offset
+
+    async def complete(self) -> None:
+        self.completed_at = time.monotonic()
+        async with self._changed:
+            self._changed.notify_all()
+
+    def _after(self, offset: int | None) -> list[LoggedEvent]:
+        self._evict(time.monotonic())
+        if offset is None:
+            return list(self._events)
+        if self._events and offset + 1 < self._events[0].offset:
+            raise EventsExpired(offset, self._events[0].offset)
+        if not self._events and offset < self.last_offset:
+            raise EventsExpired(offset, self._next_offset)
+        # Offsets are dense, so the position in the deque follows from the first offset
+        start = offset + 1 - self._events[0].offset if self._events else 0
+        return list(islice(self._events, max(0, start), None))
+
+    async def read(self, after: int | None = None) -> AsyncIterator[LoggedEvent]:
+        """
+        Yield events with an offset greater than `after`, following the log until the run completes.
+
+        Without `after` reading starts at the oldest event still retained. Raises `EventsExpired` when
+        events right after `after` have already been evicted.
+        """
+        cursor = after
+        while True:
+            for event in self._after(cursor):
+                cursor = event.offset
+                yield event
+            if cursor is None:
+                cursor = self.last_offset
+            if self.completed and cursor >= self.last_offset:
+                return
+            async with self._changed:
+                await self._changed.wait_for(lambda: self.completed or self.last_offset > cursor)
+
+
+class ResumableRunRegistry:
+    def __init__(
+        self,
+        max_events: int = 10_000,
+        max_bytes: int = 4 * 1024 * 1024,
+        max_age: float = 600.0,
+        finished_ttl: float = 300.0,
+    ):
+        self.max_events = max_events
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.finished_ttl = finished_ttl
+        self._logs: dict[str, RunEventLog] = {}
+        self._pumps: dict[str, asyncio.Task[None]] = {}
+
+    def start(self, run_id: str, result: RunResultStreaming) -> RunEventLog:
+        self._prune()
+        if run_id in self._logs:
+            raise ValueError(f"Run {run_id!r} already exists")
+        log = RunEventLog(self.max_events, self.max_bytes, self.max_age)
+        self._logs[run_id] = log
+        self._pumps[run_id] = asyncio.create_task(self._pump(run_id, result, log))
+        return log
+
+    async def _pump(self, run_id: str, result: RunResultStreaming, log: RunEventLog) -> None:
+        error = None
+        try:
+            async for event in result.stream_events():
+                message = serialize_event(MultiplexedEvent(run_id, event))
+                if message is not None:
+                    await log.append(message)
+        except asyncio.CancelledError:
+            result.cancel()
+            error = asyncio.CancelledError("run cancelled")
+        except Exception as e:
+            error = e
+        await log.append(serialize_event(MultiplexedEvent(run_id, None, error)))
+        await log.complete()
+        self._pumps.pop(run_id, None)
+
+    def get(self, run_id: str) -> RunEventLog | None:
+        self._prune()
+        return self._logs.get(run_id)
+
+    def cancel(self, run_id: str) -> None:
+        pump = self._pumps.get(run_id)
+        if pump is not None:
+            pump.cancel()
+
+    def _prune(self) -> None:
+        now = time.monotonic()
+        for run_id, log in list(self._logs.items()):
+            if log.completed_at is not None and now - log.completed_at > self.finished_ttl:
+                del self._logs[run_id]
+
+
+async def sse_stream(log: RunEventLog, last_event_id: str | None = None) -> AsyncIterator[str]:
+    """Format a run log as Server-Sent Events, resuming after `last_event_id` when given."""
+    after = int(last_event_id) if last_event_id and last_event_id.isdigit() else None
+    try:
+        async for event in log.read(after):
+            yield f"id: {event.offset}\ndata: {event.payload}\n\n"
+    except EventsExpired as e:
+        yield f"event: expired\ndata: {json.dumps({'requested': e.requested, 'oldest': e.oldest})}\n\n"
@@ -0,0 +1,295 @@
+"""
+Remember which specialist the triage agent picked for a query.
+
+`customer_support_agent.py` sends "process refund requests?" through the triage model every time,
+although the answer (RefundAgent) never changes. `RoutingCache` remembers the handoff target chosen
+by live triage, for the exact normalized query and for similar queries found through locality
+sensitive hashing (random hyperplanes over hashed TF-IDF features). Entries lose confidence over
+time (`half_life`) and are evicted once they drop below `min_confidence` or fall out of the LRU.
+
+A fraction of cache hits (`verify_rate`) still goes through live triage, which measures the cache's
+accuracy and corrects entries that are wrong.
+
+A cache hit starts at the specialist and skips the triage handoff, so targets reached through a
+handoff that takes model input, calls `on_handoff` or has an `input_filter` are never cached, and
+nothing is cached for a run config with a `handoff_input_filter`.
+
+    triage = CachedTriage(triage_agent, RoutingCache(verify_rate=0.05))
+    result = await triage.run("process refund requests?", run_config=config)
+    print(triage.cache.stats.hit_rate, triage.cache.stats.accuracy)
+"""
+from __future__ import annotations
+
+import random
+import re
+import time
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+from agents import Agent, Handoff, RunConfig, RunResult, RunResultStreaming, Runner
+from agents.result import RunResultBase
+
+from proj1.prerouter import PreRouter, _has_handoff_effects, query_text, tokenize
+
+_PUNCTUATION = re.compile(r"[^\w\s]")
+
+
+def normalize_query(query: str) -> str:
+    return " ".join(_PUNCTUATION.sub(" ", query.lower()).split())
+
+
+@dataclass
+class CachedRoute:
+    agent: Agent[Any]
+    vector: np.ndarray
+    buckets: tuple[int, ...]
+    learned_at: float
+    confidence: float = 1.0
+
+
+@dataclass
+class RoutingCacheStats:
+    lookups: int = 0
+    exact_hits: int = 0
+    similar_hits: int = 0
+    verified: int = 0
+    agreed: int = 0
+    evicted: int = 0
+    decayed: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        return (self.exact_hits + self.similar_hits) / self.lookups if self.lookups else 0.0
+
+    @property
+    def accuracy(self) -> float | None:
+        """Share of verified cache hits that live triage agreed with, None before any verification."""
+        return self.agreed / self.verified if self.verified else None
+
+
+class RoutingCache:
+    def __init__(
+        self,
+        maxsize: int = 10_000,
+        half_life: float = 24 * 3600.0,
+        min_confidence: float = 0.5,
+        similarity: float = 0.85,
+        verify_rate: float = 0.05,
+        dimensions: int = 4096,
+        bits: int = 32,
+        bands: int = 8,
+        seed: int = 0,
+    ):
+        """
+        `similarity` is the cosine a cached query needs to count as the same question. The LSH
+        signature has `bits` hyperplanes split into `bands` buckets, a query is compared with every
+        cached query that shares at least one bucket.
+        """
+        if bits % bands:
+            raise ValueError("bits must be a multiple of bands")
+        self.maxsize = maxsize
+        self.half_life = half_life
+        self.min_confidence = min_confidence
+        self.similarity = similarity
+        self.verify_rate = verify_rate
+        self.dimensions = dimensions
+        self.bands = bands
+        self.stats = RoutingCacheStats()
+
+        rng = np.random.default_rng(seed)
+        self._planes = rng.standard_normal((bits, dimensions)).astype(np.float32)
+        self._band_weights = 1 << np.arange(bits // bands)
+        self._routes: OrderedDict[str, CachedRoute] = OrderedDict()
+        self._buckets: dict[tuple[int, int], set[str]] = {}
+        self._random = random.Random(seed)
+
+    def __len__(self) -> int:
+        return len(self._routes)
+
+    def _vectorize(self, normalized: str) -> np.ndarray:
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        for token in tokenize(normalized):
+            vector[zlib.crc32(token.encode()) % self.dimensions] += 1.0
+        np.log1p(vector, out=vector)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _signature(self, vector: np.ndarray) -> tuple[int, ...]:
+        bits = (self._planes @ vector > 0).reshape(self.bands, -1)
+        return tuple(int(b) for b in bits @ self._band_weights)
+
+    def _confidence(self, route: CachedRoute, now: float) -> float:
+        return route.confidence * 0.5 ** ((now - route.learned_at) / self.half_life)
+
+    def _remove(self, key: str) -> None:
+        route = self._routes.pop(key)
+        for band, bucket in enumerate(route.buckets):
+            members = self._buckets.get((band, bucket))
+            if members is not None:
+                members.discard(key)
+                if not members:
+                    del self._buckets[(band, bucket)]
+
+    def lookup(self, query: str) -> Agent[Any] | None:
+        """The remembered target for `query` or a similar query, None on a miss."""
+        self.stats.lookups += 1
+        now = time.monotonic()
+        key = normalize_query(query)
+
+        route = self._routes.get(key)
+        if route is not None:
+            if self._confidence(route, now) >= self.min_confidence:
+                self._routes.move_to_end(key)
+                self.stats.exact_hits += 1
+                return route.agent
+            self._remove(key)
+            self.stats.decayed += 1
+            return None
+
+        vector = self._vectorize(key)
+        candidates = set()
+        for band, bucket in enumerate(self._signature(vector)):
+            candidates |= self._buckets.get((band, bucket), set())
+        best_key, best_score = None, self.similarity
+        for candidate in candidates:
+            route = self._routes[candidate]
+            score = float(route.vector @ vector)
+            if score >= best_score and self._confidence(route, now) >= self.min_confidence:
+                best_key, best_score = candidate, score
+        if best_key is None:
+            return None
+        self._routes.move_to_end(best_key)
+        self.stats.similar_hits += 1
+        return self._routes[best_key].agent
+
+    def learn(self, query: str, agent: Agent[Any]) -> None:
+        """Remember that live triage routed `query` to `agent`."""
+        key = normalize_query(query)
+        existing = self._routes.get(key)
+        if existing is not None and existing.agent is agent:
+            # Confirmed again, start decaying from full confidence
+            existing.learned_at = time.monotonic()
+            existing.confidence = 1.0
+            self._routes.move_to_end(key)
+            return
+        if existing is not None:
+            self._remove(key)
+
+        vector = self._vectorize(key)
+        route = CachedRoute(agent, vector, self._signature(vector), time.monotonic())
+        self._routes[key] = route
+        for band, bucket in enumerate(route.buckets):
+            self._buckets.setdefault((band, bucket), set()).add(key)
+        while len(self._routes) > self.maxsize:
+            self._remove(next(iter(self._routes)))
+            self.stats.evicted += 1
+
+    def forget(self, query: str) -> None:
+        key = normalize_query(query)
+        if key in self._routes:
+            self._remove(key)
+
+    def should_verify(self) -> bool:
+        return self._random.random() < self.verify_rate
+
+    def record_verification(self, query: str, cached: Agent[Any], live: Agent[Any] | None) -> None:
+        self.stats.verified += 1
+        if live is cached:
+            self.stats.agreed += 1
+        if live is not None:
+            self.learn(query, live)
+        else:
+            # Live triage answered itself, there is no specialist to remember
+            self.forget(query)
+
+
+def handoff_target(result: RunResultBase) -> Agent[Any] | None:
+    """The agent the first handoff of a run went to, None if the starting agent answered itself."""
+    for item in result.new_items:
+        if item.type == "handoff_output_item":
+            return item.target_agent
+    return None
+
+
+def _handoff_has_effects(result: RunResultBase) -> bool:
+    """Whether the first handoff of a run does more than switch agents, which a cache hit would skip."""
+    for call in result.new_items:
+        if call.type == "handoff_call_item":
+            break
+    else:
+        return False
+    for item in call.agent.handoffs:
+        if isinstance(item, Handoff) and item.tool_name == call.raw_item.name:
+            return _has_handoff_effects(item) or item.input_filter is not None
+    return False
+
+
+@dataclass
+class _Pending:
+    query: str
+    cached: Agent[Any] | None
+    verifying: bool
+
+
+class CachedTriage:
+    """
+    Runs a triage agent, starting at the cached specialist when the query has been routed before.
+
+    With a `router`, a cache miss is first offered to the local `PreRouter` and only goes to live
+    triage when the router is not confident either.
+    """
+
+    def __init__(self, triage_agent: Agent[Any], cache: RoutingCache | None = None, router: PreRouter | None = None):
+        self.triage_agent = triage_agent
+        self.cache = cache if cache is not None else RoutingCache()
+        self.router = router
+        self._pending: dict[int, _Pending] = {}
+
+    def _start_agent(self, input: str | list[Any], run_config: RunConfig | None) -> tuple[Agent[Any], _Pending]:
+        if run_config is not None and run_config.handoff_input_filter is not None:
+            # Every handoff is filtered, starting past one would skip it: no lookup, nothing to learn
+            return self.triage_agent, _Pending("", None, False)
+        query = query_text(input)
+        cached = self.cache.lookup(query) if query else None
+        verifying = cached is not None and self.cache.should_verify()
+        pending = _Pending(query, cached, verifying)
+        if cached is not None and not verifying:
+            return cached, pending
+        if cached is None and self.router is not None and query:
+            routed = self.router.route(query).agent
+            if routed is not None:
+                return routed, pending
+        return self.triage_agent, pending
+
+    def _observe(self, pending: _Pending, result: RunResultBase) -> None:
+        if pending.cached is not None and not pending.verifying or not pending.query:
+            return
+        live = handoff_target(result)
+        if live is not None and _handoff_has_effects(result):
+            self.cache.forget(pending.query)
+            return
+        if pending.verifying:
+            self.cache.record_verification(pending.query, pending.cached, live)
+        elif live is not None:
+            self.cache.learn(pending.query, live)
+
+    async def run(self, input: str | list[Any], **kwargs: Any) -> RunResult:
+        agent, pending = self._start_agent(input, kwargs.get("run_config"))
+        result = await Runner.run(agent, input, **kwargs)
+        self._observe(pending, result)
+        return result
+
+    def run_streamed(self, input: str | list[Any], **kwargs: Any) -> RunResultStreaming:
+        """Like `run`, call `finish(result)` once the stream is consumed so live triage is learned."""
+        agent, pending = self._start_agent(input, kwargs.get("run_config"))
+        result = Runner.run_streamed(agent, input, **kwargs)
+        self._pending[id(result)] = pending
+        return result
+
+    def finish(self, result: RunResultStreaming) -> None:
+        pending = self._pending.pop(id(result), None)
+        if pending is not None:
+            self._observe(pending, result)
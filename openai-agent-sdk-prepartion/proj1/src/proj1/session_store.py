@@ -0,0 +1,214 @@
+"""
+Conversation sessions backed by an append-only store.
+
+`examples/agent_as_tool.py` hands `orchestrator_result.to_input_list()` to the next `Runner.run`, which
+deep-copies the original input and converts every new item again, on every hop, and a multi-turn chat
+built that way carries its whole growing history around in every result. A `Session` keeps the
+history in a store instead, appends only the items each run added, and keeps just the most recent
+turns in memory. Older turns are read back from the store when the input is built, nothing is
+dropped silently: `compact()` is what folds them into a summary so what is sent to the model stays
+bounded.
+
+    session = Session("translations", SQLiteStore("sessions.db"))
+    result = await Runner.run(orchestrator_agent, session.input(msg), run_config=config)
+    session.add(result)
+    result = await Runner.run(synthesizer_agent, session.input(), run_config=config)
+    session.add(result)
+
+`MemoryStore` keeps everything in the process, `SQLiteStore` writes to SQLite in WAL mode so readers
+never block the writer.
+"""
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+from collections import deque
+from typing import Callable, Protocol
+
+from agents import ItemHelpers
+from agents.items import TResponseInputItem
+from agents.result import RunResultBase
+
+Summarizer = Callable[[list[TResponseInputItem]], TResponseInputItem | None]
+
+
+class SessionStore(Protocol):
+    def append(self, session_id: str, turn: int, items: list[TResponseInputItem]) -> None: ...
+
+    def load(self, session_id: str, from_turn: int = 0) -> list[tuple[int, TResponseInputItem]]:
+        """`(turn, item)` pairs of turn `from_turn` onwards, in order."""
+        ...
+
+    def last_turn(self, session_id: str) -> int:
+        """The highest turn stored for the session, -1 if there is none."""
+        ...
+
+    def replace_before(self, session_id: str, turn: int, summary: TResponseInputItem | None) -> None:
+        """Drop all turns before `turn` and store `summary`, if any, as their replacement."""
+        ...
+
+
+class MemoryStore:
+    def __init__(self) -> None:
+        self._items: dict[str, list[tuple[int, TResponseInputItem]]] = {}
+
+    def append(self, session_id: str, turn: int, items: list[TResponseInputItem]) -> None:
+        self._items.setdefault(session_id, []).extend((turn, item) for item in items)
+
+    def load(self, session_id: str, from_turn: int = 0) -> list[tuple[int, TResponseInputItem]]:
+        return [entry for entry in self._items.get(session_id, []) if entry[0] >= from_turn]
+
+    def last_turn(self, session_id: str) -> int:
+        items = self._items.get(session_id)
+        return items[-1][0] if items else -1
+
+    def replace_before(self, session_id: str, turn: int, summary: TResponseInputItem | None) -> None:
+        kept = [entry for entry in self._items.get(session_id, []) if entry[0] >= turn]
+        self._items[session_id] = ([(turn - 1, summary)] if summary is not None else []) + kept
+
+
+class SQLiteStore:
+    def __init__(self, path: str = "sessions.db"):
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS session_items ("
+            " session_id TEXT NOT NULL, seq INTEGER NOT NULL, turn INTEGER NOT NULL, item TEXT NOT NULL,"
+            " PRIMARY KEY (session_id, seq))"
+        )
+
+    def append(self, session_id: str, turn: int, items: list[TResponseInputItem]) -> None:
+        with self._lock:
+            cursor = self._connection.cursor()
+            cursor.execute("BEGIN")
+            (last,) = cursor.execute(
+                "SELECT COALESCE(MAX(seq), -1) FROM session_items WHERE session_id = ?", (session_id,)
+            ).fetchone()
+            cursor.executemany(
+                "INSERT INTO session_items (session_id, seq, turn, item) VALUES (?, ?, ?, ?)",
+                [(session_id, last + 1 + i, turn, json.dumps(item)) for i, item in enumerate(items)],
+            )
+            cursor.execute("COMMIT")
+
+    def load(self, session_id: str, from_turn: int = 0) -> list[tuple[int, TResponseInputItem]]:
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT turn, item FROM session_items WHERE session_id = ? AND turn >= ? ORDER BY seq",
+                (session_id, from_turn),
+            ).fetchall()
+        return [(turn, json.loads(item)) for turn, item in rows]
+
+    def last_turn(self, session_id: str) -> int:
+        with self._lock:
+            (turn,) = self._connection.execute(
+                "SELECT COALESCE(MAX(turn), -1) FROM session_items WHERE session_id = ?", (session_id,)
+            ).fetchone()
+        return turn
+
+    def replace_before(self, session_id: str, turn: int, summary: TResponseInputItem | None) -> None:
+        with self._lock:
+            cursor = self._connection.cursor()
+            cursor.execute("BEGIN")
+            (first,) = cursor.execute(
+                "SELECT COALESCE(MIN(seq), 0) FROM session_items WHERE session_id = ? AND turn >= ?",
+                (session_id, turn),
+            ).fetchone()
+            cursor.execute("DELETE FROM session_items WHERE session_id = ? AND turn < ?", (session_id, turn))
+            if summary is not None:
+                # Sequence numbers only have to be ordered, the summary slots in right before what is kept
+                cursor.execute(
+                    "INSERT INTO session_items (session_id, seq, turn, item) VALUES (?, ?, ?, ?)",
+                    (session_id, first - 1, turn - 1, json.dumps(summary)),
+                )
+            cursor.execute("COMMIT")
+
+    def close(self) -> None:
+        self._connection.close()
+
+
+def default_summary(items: list[TResponseInputItem]) -> TResponseInputItem | None:
+    """A plain-text digest of the compacted messages. Pass a model-backed summarizer for better ones."""
+    lines = []
+    for item in items:
+        role = item.get("role")
+        content = item.get("content")
+        if isinstance(content, list):
+            content = " ".join(part.get("text", "") for part in content if isinstance(part, dict))
+        if role and content:
+            lines.append(f"{role}: {content[:200]}")
+    if not lines:
+        return None
+    return {"role": "system", "content": "Summary of the earlier conversation:\n" + "\n".join(lines)}
+
+
+class Session:
+    def __init__(self, session_id: str, store: SessionStore | None = None, max_loaded_turns: int = 20):
+        self.session_id = session_id
+        self.store = store if store is not None else MemoryStore()
+        self.max_loaded_turns = max_loaded_turns
+
+        self._turns: deque[tuple[int, list[TResponseInputItem]]] | None = None
+        self._next_turn = 0
+        self._pending: list[TResponseInputItem] = []
+
+    def _loaded(self) -> deque[tuple[int, list[TResponseInputItem]]]:
+        """The recent turns, read from the store on first use only."""
+        if self._turns is None:
+            last = self.store.last_turn(self.session_id)
+            self._next_turn = last + 1
+            turns: dict[int, list[TResponseInputItem]] = {}
+            for turn, item in self.store.load(self.session_id, from_turn=last + 1 - self.max_loaded_turns):
+                turns.setdefault(turn, []).append(item)
+            self._turns = deque(sorted(turns.items()), maxlen=self.max_loaded_turns)
+        return self._turns
+
+    def items(self) -> list[TResponseInputItem]:
+        """
+        The history the next run sees, oldest first: every stored turn, including the summary left by
+        `compact()`.
+
+        Only the last `max_loaded_turns` turns are kept in memory. Once there are more, the older ones
+        are read from the store on every call, so call `compact()` to keep long sessions cheap.
+        """
+        turns = self._loaded()
+        recent = [item for _, items in turns for item in items]
+        if len(turns) < self.max_loaded_turns:
+            return recent
+        first = turns[0][0]
+        return [item for turn, item in self.store.load(self.session_id) if turn < first] + recent
+
+    def history(self) -> list[TResponseInputItem]:
+        """The full stored history, including turns no longer kept in memory."""
+        return [item for _, item in self.store.load(self.session_id)]
+
+    def input(self, new_input: str | list[TResponseInputItem] | None = None) -> list[TResponseInputItem]:
+        """Input for the next `Runner.run`: the history plus `new_input`, which is stored by `add`."""
+        self._pending = ItemHelpers.input_to_new_input_list(new_input) if new_input else []
+        return self.items() + self._pending
+
+    def add(self, result: RunResultBase) -> None:
+        """Append the new input and the items the run produced as one turn."""
+        new_items = self._pending + [item.to_input_item() for item in result.new_items]
+        self._pending = []
+        turns = self._loaded()
+        if not new_items:
+            return
+        turn = self._next_turn
+        self._next_turn += 1
+        self.store.append(self.session_id, turn, new_items)
+        turns.append((turn, new_items))
+
+    def compact(self, keep_last_turns: int = 4, summarize: Summarizer | None = default_summary) -> None:
+        """Replace everything before the last `keep_last_turns` turns with one summary item."""
+        self._loaded()
+        cutoff = self._next_turn - keep_last_turns
+        if cutoff <= 0:
+            return
+        old = [item for turn, item in self.store.load(self.session_id) if turn < cutoff]
+        if not old:
+            return
+        self.store.replace_before(self.session_id, cutoff, summarize(old) if summarize else None)
+        self._turns = None
@@ -0,0 +1,154 @@
+"""
+Merge the event streams of many concurrent `Runner.run_streamed` runs into one async iterator.
+
+Each run gets a pump task that copies its events into a bounded per-run buffer. A full buffer pauses
+that run's pump only, so one chatty run can not grow memory or starve the others. The iterator
+visits the runs round-robin and takes at most `quantum` events from each per round, so every run
+gets a fair share of the single consumer (for example one WebSocket, see `api/story_api.py`).
+
+    mux = StreamMultiplexer(buffer_size=256)
+    mux.add("run-1", Runner.run_streamed(agent_a, "...", run_config=config))
+    mux.add("run-2", Runner.run_streamed(agent_b, "...", run_config=config))
+    async for event in mux:
+        print(event.run_id, event.type)
+"""
+from __future__ import annotations
+
+import asyncio
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any
+
+from agents import ItemHelpers, RunResultStreaming
+from agents.stream_events import StreamEvent
+from openai.types.responses import ResponseTextDeltaEvent
+
+_DONE = object()
+
+
+@dataclass
+class MultiplexedEvent:
+    run_id: str
+    event: StreamEvent | None
+    """None for the final `run_complete` event of a run."""
+    error: BaseException | None = None
+
+    @property
+    def type(self) -> str:
+        return self.event.type if self.event is not None else "run_complete"
+
+
+def serialize_event(event: MultiplexedEvent) -> dict[str, Any] | None:
+    """JSON-friendly form of an event, or None for raw events a client has no use for."""
+    inner = event.event
+    if inner is None:
+        message = {"run_id": event.run_id, "type": "run_complete"}
+        if event.error is not None:
+            message["error"] = f"{type(event.error).__name__}: {event.error}"
+        return message
+    if inner.type == "raw_response_event":
+        if isinstance(inner.data, ResponseTextDeltaEvent):
+            return {"run_id": event.run_id, "type": "text_delta", "delta": inner.data.delta}
+        return None
+    if inner.type == "agent_updated_stream_event":
+        return {"run_id": event.run_id, "type": "agent_updated", "agent": inner.new_agent.name}
+    message = {"run_id": event.run_id, "type": "run_item", "name": inner.name, "item_type": inner.item.type}
+    if inner.item.type == "message_output_item":
+        message["text"] = ItemHelpers.text_message_output(inner.item)
+    return message
+
+
+class StreamMultiplexer:
+    def __init__(self, buffer_size: int = 256, quantum: int = 16, close_when_idle: bool = False):
+        self.buffer_size = buffer_size
+        self.quantum = quantum
+        self.close_when_idle = close_when_idle
+
+        self._buffers: OrderedDict[str, asyncio.Queue[Any]] = OrderedDict()
+        self._pumps: dict[str, asyncio.Task[None]] = {}
+        self._errors: dict[str, BaseException] = {}
+        self._ready = asyncio.Event()
+        self._closed = False
+
+    @property
+    def active_runs(self) -> list[str]:
+        return list(self._buffers)
+
+    def add(self, run_id: str, result: RunResultStreaming) -> None:
+        if run_id in self._buffers:
+            raise ValueError(f"Run {run_id!r} is already being multiplexed")
+        self._buffers[run_id] = asyncio.Queue(maxsize=self.buffer_size)
+        self._pumps[run_id] = asyncio.create_task(self._pump(run_id, result))
+
+    def cancel(self, run_id: str) -> None:
+        pump = self._pumps.get(run_id)
+        if pump is not None:
+            pump.cancel()
+
+    async def _pump(self, run_id: str, result: RunResultStreaming) -> None:
+        buffer = self._buffers[run_id]
+        cancelled = False
+        try:
+            async for event in result.stream_events():
+                await buffer.put(event)
+                self._ready.set()
+        except asyncio.CancelledError:
+            cancelled = True
+            result.cancel()
+            self._errors[run_id] = asyncio.CancelledError("run cancelled")
+        except Exception as e:
+            self._errors[run_id] = e
+        finally:
+            if cancelled or self._closed:
+                # Nobody may drain this buffer any more, so undelivered events of a cancelled run are
+                # dropped and the sentinel never waits for a slot
+                while not buffer.empty():
+                    buffer.get_nowait()
+                buffer.put_nowait(_DONE)
+            else:
+                # The sentinel may have to wait for the consumer to free a slot, like any event
+                await buffer.put(_DONE)
+            self._ready.set()
+
+    def close(self) -> None:
+        """Stop iterating once the current runs have finished."""
+        self._closed = True
+        self._ready.set()
+
+    async def aclose(self) -> None:
+        self.close()
+        pumps = list(self._pumps.values())
+        for pump in pumps:
+            pump.cancel()
+        await asyncio.gather(*pumps, return_exceptions=True)
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        while True:
+            delivered = False
+            for run_id in list(self._buffers):
+                buffer = self._buffers[run_id]
+                for _ in range(self.quantum):
+                    try:
+                        item = buffer.get_nowait()
+                    except asyncio.QueueEmpty:
+                        break
+                    delivered = True
+                    if item is _DONE:
+                        del self._buffers[run_id]
+                        self._pumps.pop(run_id, None)
+                        yield MultiplexedEvent(run_id, None, self._errors.pop(run_id, None))
+                        break
+                    yield MultiplexedEvent(run_id, item)
+
+            if delivered:
+                continue
+            if not self._buffers and (self._closed or self.close_when_idle):
+                return
+            self._ready.clear()
+            # Re-check after clearing, a pump may have published between the scan and the clear
+            if any(not buffer.empty() for buffer in self._buffers.values()):
+                continue
+            await self._ready.wait()
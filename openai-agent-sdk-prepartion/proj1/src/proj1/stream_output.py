@@ -0,0 +1,163 @@
+"""
+Coalesce streamed text deltas before writing them out.
+
+`print(event.data.delta, end="", flush=True)` per `ResponseTextDeltaEvent` means one write and one
+flush per token. `DeltaCoalescer` buffers deltas and flushes them as one chunk once `max_chars` is
+reached or the oldest buffered delta is `max_latency` seconds old, whichever comes first, so the
+user never waits longer than `max_latency` for text that has already arrived.
+
+    result = Runner.run_streamed(agent, "who is founder of pakistan", run_config=config)
+    stats = await stream_text(result, StdoutSink(), max_latency=0.05)
+    print(f"\\n{stats.events} deltas in {stats.flushes} writes")
+"""
+from __future__ import annotations
+
+import asyncio
+import inspect
+import sys
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, TextIO
+
+from agents import RunResultStreaming
+from openai.types.responses import ResponseTextDeltaEvent
+
+Sink = Callable[[str], Awaitable[None] | None]
+
+
+class StdoutSink:
+    def __init__(self, stream: TextIO | None = None):
+        self.stream = stream or sys.stdout
+
+    def __call__(self, chunk: str) -> None:
+        self.stream.write(chunk)
+        self.stream.flush()
+
+
+class SSESink:
+    """Formats chunks as Server-Sent Events and puts them on a queue, e.g. for a StreamingResponse."""
+
+    def __init__(self, queue: asyncio.Queue[str], event: str = "delta"):
+        self.queue = queue
+        self.event = event
+
+    async def __call__(self, chunk: str) -> None:
+        data = "\n".join(f"data: {line}" for line in chunk.split("\n"))
+        await self.queue.put(f"event: {self.event}\n{data}\n\n")
+
+
+class WriterSink:
+    """Writes chunks to an `asyncio.StreamWriter` (a raw socket connection)."""
+
+    def __init__(self, writer: asyncio.StreamWriter):
+        self.writer = writer
+
+    async def __call__(self, chunk: str) -> None:
+        self.writer.write(chunk.encode())
+        await self.writer.drain()
+
+
+@dataclass
+class CoalesceStats:
+    events: int = 0
+    flushes: int = 0
+    chars: int = 0
+    max_flush_delay: float = 0.0
+
+    @property
+    def events_per_flush(self) -> float:
+        return self.events / self.flushes if self.flushes else 0.0
+
+
+class DeltaCoalescer:
+    def __init__(self, sink: Sink, max_chars: int = 256, max_latency: float = 0.05):
+        self.sink = sink
+        self.max_chars = max_chars
+        self.max_latency = max_latency
+        self.stats = CoalesceStats()
+
+        self._buffer: list[str] = []
+        self._buffered_chars = 0
+        self._first_at: float | None = None
+        self._timer: asyncio.TimerHandle | None = None
+        self._flush_task: asyncio.Task[None] | None = None
+        self._lock = asyncio.Lock()
+
+    async def feed(self, delta: str) -> None:
+        if not delta:
+            return
+        self.stats.events += 1
+        self._buffer.append(delta)
+        self._buffered_chars += len(delta)
+        if self._first_at is None:
+            self._first_at = time.perf_counter()
+            # Flush on the deadline even if no further delta arrives to trigger it
+            self._timer = asyncio.get_running_loop().call_later(self.max_latency, self._flush_on_deadline)
+        if self._buffered_chars >= self.max_chars:
+            await self.flush()
+
+    def _flush_on_deadline(self) -> None:
+        self._timer = None
+        self._flush_task = asyncio.ensure_future(self.flush())
+
+    async def flush(self) -> None:
+        async with self._lock:
+            # Holding the lock, a deadline flush is not writing yet and can be dropped, this flush covers it
+            if self._flush_task is not None and self._flush_task is not asyncio.current_task():
+                self._flush_task.cancel()
+                self._flush_task = None
+            if not self._buffer:
+                return
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            chunk = "".join(self._buffer)
+            delay = time.perf_counter() - self._first_at
+            self._buffer.clear()
+            self._buffered_chars = 0
+            self._first_at = None
+
+            self.stats.flushes += 1
+            self.stats.chars += len(chunk)
+            self.stats.max_flush_delay = max(self.stats.max_flush_delay, delay)
+            result = self.sink(chunk)
+            if inspect.isawaitable(result):
+                await result
+
+    async def aclose(self) -> None:
+        await self.flush()
+        if self._flush_task is not None:
+            # A deadline flush that started writing before this one, wait for it and surface its error
+            (outcome,) = await asyncio.gather(self._flush_task, return_exceptions=True)
+            self._flush_task = None
+            if isinstance(outcome, Exception):
+                raise outcome
+
+
+async def stream_text(
+    result: RunResultStreaming,
+    sink: Sink | None = None,
+    max_chars: int = 256,
+    max_latency: float = 0.05,
+    on_event: Callable[[Any], Awaitable[None] | None] | None = None,
+) -> CoalesceStats:
+    """
+    Write the text deltas of a streamed run through a `DeltaCoalescer`.
+
+    Every other stream event is handed to `on_event` unchanged, so item and agent-update handling can
+    stay where it is.
+    """
+    coalescer = DeltaCoalescer(sink or StdoutSink(), max_chars=max_chars, max_latency=max_latency)
+    try:
+        async for event in result.stream_events():
+            if event.type == "raw_response_event" and isinstance(event.data, ResponseTextDeltaEvent):
+                await coalescer.feed(event.data.delta)
+            elif on_event is not None:
+                # Keep output ordered: text that arrived before this event goes out first
+                await coalescer.flush()
+                handled = on_event(event)
+                if inspect.isawaitable(handled):
+                    await handled
+    finally:
+        await coalescer.aclose()
+    return coalescer.stats
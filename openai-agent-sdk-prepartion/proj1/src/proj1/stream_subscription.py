@@ -0,0 +1,206 @@
+"""
+Typed, filtered subscriptions on a streamed run.
+
+Consumers like `run_panacloud_agent` in `streaming.py` or `TriageAgent` in `handoff.py` iterate every
+event of `stream_events()` and skip `raw_response_event` with a string comparison, so every token
+delta still goes through the queue, wakes the consumer and is dispatched to Python code only to be
+thrown away. `subscribe()` swaps the run's event queue for one that drops unwanted events in
+`put_nowait`. The SDK has built the event by then, what is saved is queueing it, waking the consumer
+and dispatching it there.
+
+    result = Runner.run_streamed(triage_agent, user_query, run_config=config)
+    async for event in subscribe(result, item_types={"handoff_call_item", "message_output_item"}):
+        ...
+
+Call `subscribe()` right after `Runner.run_streamed`, before the first `await`, so the filter is in
+place before the run produces its first event.
+
+The run's queue is the private `RunResultStreaming._event_queue`. It is only swapped on SDK versions
+in `QUEUE_SWAP_VERSIONS`, which have been checked to have it. On any other version the same filter is
+applied to `stream_events()` instead, which gives the same events without the savings.
+"""
+from __future__ import annotations
+
+import asyncio
+import weakref
+from collections import Counter
+from collections.abc import AsyncIterator, Collection
+from importlib.metadata import PackageNotFoundError, version
+from typing import Any
+
+from agents import RunResultStreaming
+from agents.stream_events import StreamEvent
+
+EVENT_TYPES = ("raw_response_event", "run_item_stream_event", "agent_updated_stream_event")
+
+QUEUE_SWAP_VERSIONS = ((0, 0, 17), (0, 1, 0))
+"""SDK versions, from inclusive to exclusive, whose streamed results keep events in `_event_queue`."""
+
+
+def _sdk_version() -> tuple[int, ...] | None:
+    try:
+        return tuple(int(part) for part in version("openai-agents").split(".")[:3])
+    except (PackageNotFoundError, ValueError):
+        return None
+
+
+_SDK_VERSION = _sdk_version()
+
+# Filters of subscriptions on results whose queue could not be swapped, by result id while it lives
+_iteration_filters: dict[int, FilteringEventQueue] = {}
+
+
+def can_swap_queue(result: RunResultStreaming) -> bool:
+    low, high = QUEUE_SWAP_VERSIONS
+    return (
+        _SDK_VERSION is not None
+        and low <= _SDK_VERSION < high
+        and isinstance(getattr(result, "_event_queue", None), asyncio.Queue)
+    )
+
+
+class FilteringEventQueue(asyncio.Queue):
+    """An `asyncio.Queue` that only accepts stream events matching the subscription."""
+
+    def __init__(
+        self,
+        event_types: Collection[str] | None = None,
+        item_types: Collection[str] | None = None,
+        raw_types: tuple[type, ...] | None = None,
+    ):
+        super().__init__()
+        self.event_types = frozenset(event_types) if event_types is not None else None
+        self.item_types = frozenset(item_types) if item_types is not None else None
+        self.raw_types = raw_types
+        self.accepted = 0
+        self.dropped: Counter[str] = Counter()
+
+    def accepts(self, event: StreamEvent) -> bool:
+        event_type = event.type
+        if event_type == "run_item_stream_event" and self.item_types is not None:
+            return event.item.type in self.item_types
+        if event_type == "raw_response_event" and self.raw_types is not None:
+            return isinstance(event.data, self.raw_types)
+        return self.event_types is None or event_type in self.event_types
+
+    def put_nowait(self, item: Any) -> None:
+        # QueueCompleteSentinel and anything else that is not a stream event always passes
+        if getattr(item, "type", None) in EVENT_TYPES and not self.accepts(item):
+            self.dropped[item.type] += 1
+            return
+        self.accepted += 1
+        super().put_nowait(item)
+
+
+def subscribe(
+    result: RunResultStreaming,
+    event_types: Collection[str] | None = None,
+    item_types: Collection[str] | None = None,
+    raw_types: tuple[type, ...] | None = None,
+) -> AsyncIterator[StreamEvent]:
+    """
+    Filter the events of `result` and return its event iterator.
+
+    - `event_types`: stream event types to keep, e.g. `{"agent_updated_stream_event"}`.
+    - `item_types`: run item types to keep, e.g. `{"tool_call_item", "message_output_item"}`. Passing
+      it subscribes to `run_item_stream_event` implicitly.
+    - `raw_types`: classes of raw response events to keep, e.g. `(ResponseTextDeltaEvent,)`. Passing
+      it subscribes to `raw_response_event` implicitly.
+
+    With none of them given, everything passes, which is the same as `result.stream_events()`.
+    """
+    if item_types is not None or raw_types is not None:
+        event_types = set(event_types or ())
+        if item_types is not None:
+            event_types.add("run_item_stream_event")
+        if raw_types is not None:
+            event_types.add("raw_response_event")
+
+    queue = FilteringEventQueue(event_types, item_types, raw_types)
+    if not can_swap_queue(result):
+        _iteration_filters[id(result)] = queue
+        weakref.finalize(result, _iteration_filters.pop, id(result), None)
+        return _filtered_events(result, queue)
+    # Keep anything the run managed to enqueue already, applying the filter to it
+    while not result._event_queue.empty():
+        queue.put_nowait(result._event_queue.get_nowait())
+    result._event_queue = queue
+    return result.stream_events()
+
+
+async def _filtered_events(result: RunResultStreaming, queue: FilteringEventQueue) -> AsyncIterator[StreamEvent]:
+    async for event in result.stream_events():
+        if queue.accepts(event):
+            queue.accepted += 1
+            yield event
+        else:
+            queue.dropped[event.type] += 1
+
+
+def subscription_stats(result: RunResultStreaming) -> tuple[int, dict[str, int]]:
+    """Return `(accepted, dropped_by_event_type)` for a subscribed result."""
+    queue = _iteration_filters.get(id(result)) or getattr(result, "_event_queue", None)
+    if not isinstance(queue, FilteringEventQueue):
+        return 0, {}
+    return queue.accepted, dict(queue.dropped)
+
+
+async def benchmark(deltas: int = 20_000, repeat: int = 3) -> None:
+    """Events/sec of a full `Runner.run_streamed` run with and without filtering out token deltas."""
+    import time
+    from agents import Agent, RunConfig, Runner
+    from agents.items import ModelResponse
+    from agents.models.interface import Model
+    from agents.usage import Usage
+    from openai.types.responses import (
+        Response,
+        ResponseCompletedEvent,
+        ResponseOutputMessage,
+        ResponseOutputText,
+        ResponseTextDeltaEvent,
+    )
+
+    message = ResponseOutputMessage(
+        id="msg", role="assistant", status="completed", type="message",
+        content=[ResponseOutputText(text="x" * deltas, type="output_text", annotations=[])],
+    )
+
+    class SyntheticStreamModel(Model):
+        """Answers with one message of `deltas` characters, streamed a character at a time."""
+
+        async def get_response(self, *args: Any, **kwargs: Any) -> ModelResponse:
+            return ModelResponse(output=[message], usage=Usage(requests=1), response_id="resp")
+
+        async def stream_response(self, *args: Any, **kwargs: Any):
+            for i in range(deltas):
+                yield ResponseTextDeltaEvent(
+                    content_index=0, delta="x", item_id="msg", output_index=0,
+                    sequence_number=i, type="response.output_text.delta",
+                )
+            response = Response(
+                id="resp", created_at=0, model="synthetic", object="response", output=[message],
+                parallel_tool_calls=False, tool_choice="auto", tools=[],
+            )
+            yield ResponseCompletedEvent(response=response, sequence_number=deltas, type="response.completed")
+
+    agent = Agent(name="bench_agent", instructions="benchmark")
+    config = RunConfig(model=SyntheticStreamModel(), tracing_disabled=True)
+
+    async def run_once(filtered: bool) -> float:
+        result = Runner.run_streamed(agent, "go", run_config=config)
+        events = subscribe(result, item_types={"message_output_item"}) if filtered else result.stream_events()
+        started = time.perf_counter()
+        async for event in events:
+            if event.type == "raw_response_event":
+                continue
+        return time.perf_counter() - started
+
+    produced = deltas + 3  # deltas, agent update, message item, completed event
+    for filtered in (False, True):
+        best = min([await run_once(filtered) for _ in range(repeat)])
+        label = "filtered  " if filtered else "unfiltered"
+        print(f"{label} {produced / best:>12,.0f} produced events/sec  ({best * 1000:.1f} ms per run)")
+
+
+if __name__ == "__main__":
+    asyncio.run(benchmark())
@@ -60,6 +60,7 @@ from typing import cast
 import os
 from dotenv import load_dotenv
 
+from proj1.stream_subscription import subscribe
 import asyncio
 
 load_dotenv()
@@ -106,10 +107,13 @@ async def run_panacloud_agent():
 
     response = Runner.run_streamed(panacloud_agent, "what is current weather", run_config=config)
 
-    async for event in response.stream_events():
-        if event.type == "raw_response_event":
-           continue
-        elif event.type =="agent_updated_stream_event":
+    events = subscribe(
+        response,
+        event_types={"agent_updated_stream_event"},
+        item_types={"tool_call_item", "tool_call_output_item", "message_output_item"},
+    )
+    async for event in events:
+        if event.type =="agent_updated_stream_event":
            print(f"Agent Updated: {event.new_agent.name}")
         elif event.type == "run_item_stream_event":
             if event.item.type == "tool_call_item":
@@ -1,9 +1,12 @@
+import asyncio
 from agents import Agent, Runner, OpenAIChatCompletionsModel, RunConfig, ModelProvider, function_tool, ModelSettings, AgentHooks, RunContextWrapper
 from openai import AsyncOpenAI
 from typing import Coroutine, cast, Any
 import os
 from dotenv import load_dotenv
 from pydantic import BaseModel
+from proj1.hook_dispatch import DispatchingAgentHooks, HookDispatcher
+from proj1.tool_executor import concurrent_function_tool
 
 # Load environment variables
 load_dotenv()
@@ -39,15 +42,15 @@ class SupportResponse(BaseModel):
     response: str
 
 # Define function tools
-@function_tool
+@concurrent_function_tool(max_concurrency=2, timeout=5)
 def add_task() -> str:
     return "Your task has been added."
 
-@function_tool
+@concurrent_function_tool(max_concurrency=2, timeout=5)
 def check_due_date() -> str:
     return "Due date is 7/12/2025."
 
-@function_tool
+@concurrent_function_tool(max_concurrency=2, timeout=5)
 def mark_complete() -> str:
     return "Task has been completed!"
 
@@ -59,17 +62,27 @@ class TaskManagementHook(AgentHooks):
     def on_tool_call(self, agent: Agent[Any], tool_name: str, tool_input: Any):
         print(f"[HOOK] Agent {agent.name} called tool {tool_name} with input: {tool_input}")
 
+# The hooks run in background tasks on this dispatcher, which has to be drained before the loop ends
+dispatcher = HookDispatcher()
+
 # Initialize the agent with tools, instructions, and hooks
 TaskAgent: Agent = Agent(
     name="Task Agent",
     instructions="Answer user task-related queries and call tools to get the final output.",
     tools=[add_task, check_due_date, mark_complete],
     model=model,
-    hooks=TaskManagementHook()  # Attach the custom hooks
+    hooks=DispatchingAgentHooks(TaskManagementHook(), dispatcher)  # Attach the custom hooks, dispatched off the agent loop
 )
 
-# Run the agent synchronously with a sample input
-response = Runner.run_sync(TaskAgent, "add task", run_config=config)
+async def main():
+    # Run the agent with a sample input
+    response = await Runner.run(TaskAgent, "add task", run_config=config)
+
+    # Let the queued hook calls finish before the event loop is closed
+    await dispatcher.drain()
+
+    # Print the final output from the agent
+    print(response.final_output)
+    print(dispatcher.report())
 
-# Print the final output from the agent
-print(response.final_output)
+asyncio.run(main())
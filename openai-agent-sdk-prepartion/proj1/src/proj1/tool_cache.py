@@ -0,0 +1,163 @@
+"""
+Memoize pure function tools.
+
+Lookups like `get_product_info` in `customer_support_agent.py` or `get_pakistan_history` in
+`tracing/example.py` always give the same answer for the same arguments, yet the model calls them
+again and again within a conversation and across conversations. `cached_tool` wraps a `FunctionTool`
+so results are kept per canonical JSON arguments (key order and whitespace do not matter), with LRU
+and TTL eviction. Identical calls that are in flight at the same time share one execution.
+
+    @cached_tool(ttl=3600, maxsize=512)
+    @function_tool
+    def get_product_info(product: str) -> str:
+        return f"{product} has a 1-year warranty."
+
+`scope="context"` keeps a separate cache per `RunContextWrapper`, i.e. per run, for tools whose answer
+is only stable for the duration of one run. Hit rates per tool are in `cache_stats`.
+"""
+from __future__ import annotations
+
+import asyncio
+import dataclasses
+import json
+import time
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Literal
+
+from agents import FunctionTool, RunContextWrapper
+
+_MISSING = object()
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    shared: int = 0
+    """Calls that awaited an identical call already in flight instead of running the tool."""
+    evictions: int = 0
+    expirations: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses + self.shared
+        return (self.hits + self.shared) / lookups if lookups else 0.0
+
+
+cache_stats: dict[str, CacheStats] = {}
+
+
+class TTLCache:
+    def __init__(self, maxsize: int = 256, ttl: float | None = None, stats: CacheStats | None = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.stats = stats or CacheStats()
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str, default: Any = _MISSING) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            return default
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            self.stats.expirations += 1
+            return default
+        self._entries.move_to_end(key)
+        return value
+
+    def put(self, key: str, value: Any) -> None:
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else float("inf")
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.stats.evictions += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+def canonical_arguments(arguments: str) -> str:
+    """The tool call arguments as compact JSON with sorted keys, or unchanged if they are not JSON."""
+    try:
+        return json.dumps(json.loads(arguments or "{}"), sort_keys=True, separators=(",", ":"))
+    except ValueError:
+        return arguments
+
+
+def cached_tool(
+    tool: FunctionTool | None = None,
+    *,
+    ttl: float | None = None,
+    maxsize: int = 256,
+    scope: Literal["global", "context"] = "global",
+) -> FunctionTool | Callable[[FunctionTool], FunctionTool]:
+    """
+    Return a copy of `tool` whose results are memoized on its canonical JSON arguments.
+
+    Only use it on tools without side effects. Exceptions are never cached, but with the default
+    `failure_error_function` an error comes back as a normal result string and is cached like any
+    other result.
+    """
+
+    def decorate(tool: FunctionTool) -> FunctionTool:
+        stats = cache_stats.setdefault(tool.name, CacheStats())
+        shared_cache = TTLCache(maxsize, ttl, stats)
+        run_caches: dict[int, TTLCache] = {}
+        inflight: dict[tuple[int, str], asyncio.Future[Any]] = {}
+        invoke = tool.on_invoke_tool
+
+        def cache_for(ctx: RunContextWrapper[Any]) -> TTLCache:
+            if scope == "global":
+                return shared_cache
+            cache = run_caches.get(id(ctx))
+            if cache is None:
+                cache = run_caches[id(ctx)] = TTLCache(maxsize, ttl, stats)
+                weakref.finalize(ctx, run_caches.pop, id(ctx), None)
+            return cache
+
+        async def on_invoke_tool(ctx: RunContextWrapper[Any], arguments: str) -> Any:
+            cache = cache_for(ctx)
+            key = canonical_arguments(arguments)
+            value = cache.get(key)
+            if value is not _MISSING:
+                stats.hits += 1
+                return value
+
+            flight_key = (id(cache), key)
+            pending = inflight.get(flight_key)
+            if pending is not None:
+                stats.shared += 1
+                return await asyncio.shield(pending)
+
+            stats.misses += 1
+            future = asyncio.get_running_loop().create_future()
+            inflight[flight_key] = future
+            try:
+                value = await invoke(ctx, arguments)
+            except asyncio.CancelledError:
+                future.cancel()
+                raise
+            except Exception as e:
+                future.set_exception(e)
+                # Nobody may be waiting on it, don't let asyncio warn about an unretrieved exception
+                future.exception()
+                raise
+            else:
+                cache.put(key, value)
+                future.set_result(value)
+                return value
+            finally:
+                del inflight[flight_key]
+
+        return dataclasses.replace(tool, on_invoke_tool=on_invoke_tool)
+
+    if tool is not None:
+        return decorate(tool)
+    return decorate
@@ -5,6 +5,7 @@ from dotenv import load_dotenv, find_dotenv
 from openai import AsyncOpenAI
 from pydantic import BaseModel
 from agents import Agent, OpenAIChatCompletionsModel, Runner, set_tracing_disabled, RunContextWrapper, function_tool
+from proj1.tool_predicates import stable_predicate
 
 _ = load_dotenv(find_dotenv())
 
@@ -27,6 +28,8 @@ class UserContext(BaseModel):
 
 
 
+# Only depends on the tier, so it is evaluated once per run instead of on every turn
+@stable_predicate(fields=("subscription_tier",))
 def premium_feature_enabled(context: RunContextWrapper, agent: Agent) -> bool:
     print(f"premium_feature_enabled()")
     print(context.context.subscription_tier, context.context.subscription_tier in ["premium", "enterprise"])
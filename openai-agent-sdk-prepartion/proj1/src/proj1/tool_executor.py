@@ -0,0 +1,403 @@
+"""
+Concurrent execution of function tools.
+
+The runner already starts all tool calls of a turn together with `asyncio.gather`, but a sync
+`@function_tool` like `add_task` in `task_manager.py` runs right on the event loop thread, so
+several of them in one turn still execute one after the other and block every other run meanwhile.
+
+`concurrent_function_tool` is a drop-in replacement for `@function_tool`. Sync functions are moved to
+a bounded thread pool, async functions stay on the loop, and both get a per-tool concurrency limit
+and timeout. Each call records a `tool_execution` span under the SDK's function span with the queue
+wait and run time.
+
+    @concurrent_function_tool(max_concurrency=2, timeout=5)
+    def check_due_date() -> str:
+        return "Due date is 7/12/2025."
+
+CPU-bound tools can declare `executor="process"` to run in a warm, shared `ProcessPoolExecutor`
+instead, so they do not hold the GIL of the server process. Only the function's module and qualified
+name plus the call arguments are pickled, the worker imports the function once and keeps it.
+`cpu_time_limit` bounds the CPU seconds of a single call (on platforms with `setitimer`), and
+`process_pool_stats` shows how saturated the pool is. A call over its limit raises `CpuTimeExceeded` at
+the next bytecode. A single long C-level operation (a huge `**`, a regex) never reaches one, so the
+worker also gets an `RLIMIT_CPU` a second past the limit and is killed by the kernel if it gets there,
+the pool is then replaced. Tools must let `CpuTimeExceeded` propagate for it to be counted.
+
+A dead worker breaks the whole shared pool, and every call it had fails with it. Each worker notes
+which call it is running in shared memory, so only the call whose worker the kernel killed gets
+`CpuTimeExceeded`. The others, queued or running in workers the pool terminated, get
+`ProcessPoolRestarted` and can simply be retried.
+
+    @concurrent_function_tool(executor="process", cpu_time_limit=2.0)
+    def calculate_math(expression: str) -> str:
+        ...
+
+Process tools must be defined at module level so a worker can import them.
+"""
+from __future__ import annotations
+
+import asyncio
+import functools
+import importlib
+import inspect
+import itertools
+import multiprocessing
+import os
+import signal
+import sys
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from typing import Any, Callable, Literal
+
+from agents import FunctionTool, function_tool
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None  # type: ignore[assignment]
+from agents.tracing import custom_span
+
+_default_executor: ThreadPoolExecutor | None = None
+
+
+def default_executor() -> ThreadPoolExecutor:
+    global _default_executor
+    if _default_executor is None:
+        _default_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="function-tool")
+    return _default_executor
+
+
+class CpuTimeExceeded(Exception):
+    """A process tool used more CPU time than its `cpu_time_limit`."""
+
+
+class ProcessPoolRestarted(BrokenProcessPool):
+    """Another call broke the process pool while this one was queued or running in it."""
+
+
+@dataclass
+class ProcessPoolStats:
+    workers: int = 0
+    submitted: int = 0
+    in_flight: int = 0
+    peak_in_flight: int = 0
+    total_queue_wait: float = 0.0
+    max_queue_wait: float = 0.0
+    cpu_time: float = 0.0
+    cpu_limit_hits: int = 0
+    pool_restarts: int = 0
+
+    @property
+    def queued(self) -> int:
+        """Calls waiting for a free worker right now."""
+        return max(0, self.in_flight - self.workers)
+
+    @property
+    def saturation(self) -> float:
+        return self.in_flight / self.workers if self.workers else 0.0
+
+    @property
+    def mean_queue_wait(self) -> float:
+        completed = self.submitted - self.in_flight
+        return self.total_queue_wait / completed if completed > 0 else 0.0
+
+
+process_pool_stats = ProcessPoolStats()
+_process_pool: _TrackedProcessPool | None = None
+_process_functions: dict[tuple[str, str], Callable[..., Any]] = {}
+_call_ids = itertools.count(1)
+
+# Exit codes of a worker the kernel stopped for going over RLIMIT_CPU, at the soft or the hard limit
+_CPU_LIMIT_EXIT_CODES = {-sig for sig in (getattr(signal, "SIGXCPU", None), getattr(signal, "SIGKILL", None)) if sig}
+
+# Set in each worker by `_init_worker`: its slot in the pool's shared arrays
+_worker_slot = -1
+_slot_calls: Any = None
+
+
+def _init_worker(slot_counter: Any, slot_pids: Any, slot_calls: Any) -> None:
+    global _worker_slot, _slot_calls
+    with slot_counter.get_lock():
+        _worker_slot = slot_counter.value
+        slot_counter.value += 1
+    slot_pids[_worker_slot] = os.getpid()
+    _slot_calls = slot_calls
+
+
+class _WorkerContext:
+    """The default multiprocessing context, keeping the worker processes it starts."""
+
+    def __init__(self) -> None:
+        self._context = multiprocessing.get_context()
+        self.processes: list[Any] = []
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._context, name)
+
+    def Process(self, *args: Any, **kwargs: Any) -> Any:
+        process = self._context.Process(*args, **kwargs)
+        self.processes.append(process)
+        return process
+
+
+class _TrackedProcessPool(ProcessPoolExecutor):
+    """A process pool whose workers note the id of the call they run, so a broken pool can tell who broke it."""
+
+    def __init__(self, max_workers: int):
+        self.worker_context = _WorkerContext()
+        self.slot_pids = self.worker_context.Array("q", max_workers, lock=False)
+        self.slot_calls = self.worker_context.Array("q", max_workers, lock=False)
+        super().__init__(
+            max_workers=max_workers,
+            mp_context=self.worker_context,
+            initializer=_init_worker,
+            initargs=(self.worker_context.Value("i", 0), self.slot_pids, self.slot_calls),
+        )
+
+    def exit_code_of(self, call_id: int) -> int | None:
+        """Exit code of the worker running `call_id`, None if the call never started or its worker lives."""
+        for slot, running in enumerate(self.slot_calls):
+            if running != call_id:
+                continue
+            for process in self.worker_context.processes:
+                if process.pid == self.slot_pids[slot]:
+                    try:
+                        return process.exitcode
+                    except ValueError:  # already closed by the pool
+                        return None
+        return None
+
+
+def process_pool(max_workers: int | None = None) -> ProcessPoolExecutor:
+    global _process_pool
+    if _process_pool is None:
+        workers = max_workers or max(1, (os.cpu_count() or 2) - 1)
+        _process_pool = _TrackedProcessPool(max_workers=workers)
+        process_pool_stats.workers = workers
+    return _process_pool
+
+
+def warm_process_pool(max_workers: int | None = None) -> None:
+    """Start all workers up front so the first tool calls do not pay for process startup."""
+    pool = process_pool(max_workers)
+    for future in [pool.submit(os.getpid) for _ in range(process_pool_stats.workers)]:
+        future.result()
+
+
+def _on_cpu_limit(signum: int, frame: Any) -> None:
+    raise CpuTimeExceeded("Tool exceeded its CPU time limit")
+
+
+def _limit_cpu(seconds: float) -> tuple[int, int] | None:
+    """Let the kernel kill this worker once it used `seconds` more CPU time (plus rounding), returns the old limit."""
+    if resource is None:
+        return None
+    previous = resource.getrlimit(resource.RLIMIT_CPU)
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    # RLIMIT_CPU has whole-second granularity and is process-wide, so it is set relative to what was used
+    soft = int(usage.ru_utime + usage.ru_stime + seconds) + 1
+    hard = previous[1]
+    if hard != resource.RLIM_INFINITY:
+        soft = min(soft, hard)
+    signal.signal(signal.SIGXCPU, signal.SIG_DFL)
+    resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+    return previous
+
+
+def _run_in_worker(
+    call_id: int, module: str, qualname: str, args: tuple[Any, ...], kwargs: dict[str, Any], cpu_time_limit: float | None
+) -> tuple[float, float, Any]:
+    """Runs inside a pool worker and returns `(started_at, cpu_seconds, result)`."""
+    started_at = time.time()
+    # Left in place if the kernel kills this worker, which is how the parent finds the culprit
+    _slot_calls[_worker_slot] = call_id
+    func = _process_functions.get((module, qualname))
+    if func is None:
+        # Importing the module re-runs its decorators, which register the function in this process
+        loaded = sys.modules.get(module) or importlib.import_module(module)
+        func = _process_functions[(module, qualname)] = _process_functions[(loaded.__name__, qualname)]
+
+    limited = cpu_time_limit is not None and hasattr(signal, "setitimer")
+    previous_rlimit = None
+    if limited:
+        signal.signal(signal.SIGPROF, _on_cpu_limit)
+        signal.setitimer(signal.ITIMER_PROF, cpu_time_limit)
+        previous_rlimit = _limit_cpu(cpu_time_limit)
+    cpu_started = time.process_time()
+    try:
+        result = func(*args, **kwargs)
+    finally:
+        if limited:
+            signal.setitimer(signal.ITIMER_PROF, 0)
+        if previous_rlimit is not None:
+            resource.setrlimit(resource.RLIMIT_CPU, previous_rlimit)
+        _slot_calls[_worker_slot] = 0
+    return started_at, time.process_time() - cpu_started, result
+
+
+async def _submit_to_process(
+    func: Callable[..., Any], args: tuple[Any, ...], kwargs: dict[str, Any], cpu_time_limit: float | None, span: Any
+) -> Any:
+    global _process_pool
+    stats = process_pool_stats
+    pool = process_pool()
+    call_id = next(_call_ids)
+    submitted_at = time.time()
+    stats.submitted += 1
+    stats.in_flight += 1
+    stats.peak_in_flight = max(stats.peak_in_flight, stats.in_flight)
+    try:
+        future = pool.submit(_run_in_worker, call_id, func.__module__, func.__qualname__, args, kwargs, cpu_time_limit)
+        started_at, cpu_time, result = await asyncio.wrap_future(future)
+    except CpuTimeExceeded:
+        stats.cpu_limit_hits += 1
+        span.span_data.data["cpu_limit_exceeded"] = True
+        raise
+    except BrokenProcessPool as e:
+        # A worker died (crashed or was killed), the pool failed all its calls and is unusable from now on.
+        # The pool cancels nothing itself, so calls of other callers are left to fail on their own.
+        exit_code = pool.exit_code_of(call_id)
+        if _process_pool is pool:
+            _process_pool = None
+            stats.pool_restarts += 1
+            pool.shutdown(wait=False)
+        if exit_code is None or exit_code == -signal.SIGTERM:
+            # Queued, or running in a worker the pool terminated because another one died
+            span.span_data.data["pool_restarted"] = True
+            raise ProcessPoolRestarted("The tool process pool was restarted while this call was in it") from e
+        if cpu_time_limit is not None and exit_code in _CPU_LIMIT_EXIT_CODES:
+            # RLIMIT_CPU: the call was stuck in C code past its limit
+            stats.cpu_limit_hits += 1
+            span.span_data.data["cpu_limit_exceeded"] = True
+            raise CpuTimeExceeded(
+                f"Tool worker was killed after exceeding its CPU time limit of {cpu_time_limit}s"
+            ) from e
+        raise
+    finally:
+        stats.in_flight -= 1
+
+    queue_wait = max(0.0, started_at - submitted_at)
+    stats.total_queue_wait += queue_wait
+    stats.max_queue_wait = max(stats.max_queue_wait, queue_wait)
+    stats.cpu_time += cpu_time
+    span.span_data.data["worker_queue_wait_ms"] = round(queue_wait * 1000, 3)
+    span.span_data.data["cpu_ms"] = round(cpu_time * 1000, 3)
+    return result
+
+
+@dataclass
+class ToolCallStats:
+    calls: int = 0
+    timeouts: int = 0
+    errors: int = 0
+    total_time: float = 0.0
+    max_time: float = 0.0
+    total_wait: float = 0.0
+
+    @property
+    def mean_time(self) -> float:
+        return self.total_time / self.calls if self.calls else 0.0
+
+
+tool_stats: dict[str, ToolCallStats] = {}
+
+
+class _Limiter:
+    """A per-tool semaphore that follows the running event loop (run_sync creates a new one each time)."""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._semaphore: asyncio.Semaphore | None = None
+
+    def get(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._loop is not loop:
+            self._loop = loop
+            self._semaphore = asyncio.Semaphore(self.limit)
+        return self._semaphore
+
+
+def _wrap(
+    func: Callable[..., Any],
+    name: str,
+    max_concurrency: int,
+    timeout: float | None,
+    executor: Literal["thread", "process"] | Executor | None,
+    cpu_time_limit: float | None,
+) -> Callable[..., Any]:
+    limiter = _Limiter(max_concurrency)
+    stats = tool_stats.setdefault(name, ToolCallStats())
+    is_async = inspect.iscoroutinefunction(func)
+    in_process = executor == "process"
+    if in_process:
+        if is_async:
+            raise ValueError(f"Tool {name} is async, only sync tools can use executor='process'")
+        if "<locals>" in func.__qualname__:
+            raise ValueError(f"Tool {name} must be defined at module level to use executor='process'")
+        _process_functions[(func.__module__, func.__qualname__)] = func
+    kind = "loop" if is_async else "process" if in_process else "thread"
+
+    @functools.wraps(func)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        with custom_span("tool_execution", data={"tool": name, "executor": kind}) as span:
+            queued = time.perf_counter()
+            async with limiter.get():
+                started = time.perf_counter()
+                if is_async:
+                    call = func(*args, **kwargs)
+                elif in_process:
+                    call = _submit_to_process(func, args, kwargs, cpu_time_limit, span)
+                else:
+                    pool = executor if isinstance(executor, Executor) else default_executor()
+                    call = asyncio.get_running_loop().run_in_executor(pool, functools.partial(func, *args, **kwargs))
+                try:
+                    return await asyncio.wait_for(call, timeout)
+                except asyncio.TimeoutError:
+                    stats.timeouts += 1
+                    span.span_data.data["timed_out"] = True
+                    raise TimeoutError(f"Tool {name} did not finish within {timeout}s")
+                except Exception:
+                    stats.errors += 1
+                    raise
+                finally:
+                    elapsed = time.perf_counter() - started
+                    stats.calls += 1
+                    stats.total_time += elapsed
+                    stats.max_time = max(stats.max_time, elapsed)
+                    stats.total_wait += started - queued
+                    span.span_data.data["latency_ms"] = round(elapsed * 1000, 3)
+                    span.span_data.data["queue_wait_ms"] = round((started - queued) * 1000, 3)
+
+    return wrapper
+
+
+def concurrent_function_tool(
+    func: Callable[..., Any] | None = None,
+    *,
+    max_concurrency: int = 4,
+    timeout: float | None = None,
+    executor: Literal["thread", "process"] | Executor = "thread",
+    cpu_time_limit: float | None = None,
+    **function_tool_kwargs: Any,
+) -> FunctionTool | Callable[[Callable[..., Any]], FunctionTool]:
+    """
+    Like `@function_tool`, but sync tools run in a thread pool with a concurrency limit and timeout.
+
+    `executor` is "thread" for the shared thread pool, "process" for the shared process pool, or an
+    `Executor` of your own. `cpu_time_limit` only applies to "process".
+
+    Any other keyword (`name_override`, `description_override`, ...) is passed on to `function_tool`.
+    A timeout surfaces like any other tool error, so by default the model gets an error message
+    instead of the run failing.
+    """
+
+    def decorate(f: Callable[..., Any]) -> FunctionTool:
+        name = function_tool_kwargs.get("name_override") or f.__name__
+        return function_tool(_wrap(f, name, max_concurrency, timeout, executor, cpu_time_limit), **function_tool_kwargs)
+
+    if func is not None:
+        return decorate(func)
+    return decorate
@@ -0,0 +1,262 @@
+"""
+Deadlines, hedged calls and a circuit breaker for function tools.
+
+A slow lookup like `get_customer_info` in `hanoff2.py` holds up the whole turn, and a backend that is
+down gets called again by every run. `guarded_tool` wraps a `FunctionTool` with a `ToolPolicy`:
+
+- `deadline`: the call is abandoned after this many seconds.
+- `idempotent`: once enough latencies are known, a second identical call is started when the first
+  one has not answered within the recent p95, and whichever finishes first wins.
+- A circuit breaker opens after `failure_threshold` consecutive failures. While it is open, calls
+  return the last good result for the same arguments, or `fallback`, without touching the backend.
+  After `recovery_time` one trial call is let through to test the backend.
+
+    @guarded_tool(ToolPolicy(deadline=2.0, idempotent=True, fallback="Customer info is unavailable."))
+    @concurrent_function_tool(failure_error_function=None)
+    def get_customer_info(customer_id: str) -> str:
+        ...
+
+Build the tool with `failure_error_function=None` so errors reach the policy. A sync `function_tool`
+runs inline on the event loop, where nothing can preempt it, so `guarded_tool` refuses one when the
+policy has a deadline or hedging: use `concurrent_function_tool` or an async function instead. The policy turns them
+into the usual error message for the model itself. Each call records a `tool_policy` span with its
+outcome, whether it was hedged and the breaker state.
+"""
+from __future__ import annotations
+
+import asyncio
+import dataclasses
+import inspect
+import statistics
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Literal
+
+from agents import FunctionTool, RunContextWrapper
+from agents.tool import default_tool_error_function
+from agents.tracing import custom_span
+
+from proj1.tool_cache import TTLCache, canonical_arguments
+
+_NOT_FOUND = object()
+
+BreakerState = Literal["closed", "open", "half_open"]
+Fallback = str | Callable[[RunContextWrapper[Any], str], Any] | None
+
+
+@dataclass
+class ToolPolicy:
+    deadline: float | None = None
+    idempotent: bool = False
+    hedge_quantile: float = 0.95
+    hedge_min_samples: int = 20
+    failure_threshold: int = 5
+    recovery_time: float = 30.0
+    fallback: Fallback = None
+    """Returned while the breaker is open and no earlier result for the arguments is known."""
+    remember_results: int = 256
+    """How many last good results (per distinct arguments) to keep for serving while open."""
+
+
+@dataclass
+class PolicyStats:
+    calls: int = 0
+    timeouts: int = 0
+    errors: int = 0
+    hedged: int = 0
+    hedge_wins: int = 0
+    short_circuited: int = 0
+    breaker_opened: int = 0
+    latencies: deque[float] = field(default_factory=lambda: deque(maxlen=200))
+
+    def quantile(self, q: float) -> float | None:
+        if len(self.latencies) < 2:
+            return None
+        return statistics.quantiles(self.latencies, n=100, method="inclusive")[min(98, int(q * 100) - 1)]
+
+
+policy_stats: dict[str, PolicyStats] = {}
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold: int, recovery_time: float):
+        self.failure_threshold = failure_threshold
+        self.recovery_time = recovery_time
+        self.failures = 0
+        self.opened_at: float | None = None
+        self._trial_running = False
+
+    @property
+    def state(self) -> BreakerState:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.recovery_time:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self._trial_running:
+            self._trial_running = True
+            return True
+        return False
+
+    def success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self._trial_running = False
+
+    def release(self) -> None:
+        """Forget a trial call that ended without a verdict, e.g. because it was cancelled."""
+        self._trial_running = False
+
+    def failure(self) -> bool:
+        """Record a failure, returns True if this opened the breaker."""
+        self.failures += 1
+        was_open = self.opened_at is not None
+        if was_open or self.failures >= self.failure_threshold:
+            # A failed trial call restarts the recovery period
+            self.opened_at = time.monotonic()
+            self._trial_running = False
+        return not was_open and self.opened_at is not None
+
+
+async def _first_of(calls: list[asyncio.Task[Any]]) -> tuple[int, Any]:
+    """Index and result of the first call to succeed, or the last error if all of them fail."""
+    pending = set(calls)
+    error: BaseException | None = None
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return calls.index(task), task.result()
+                error = task.exception()
+        raise error
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+def _tool_function(tool: FunctionTool) -> Callable[..., Any] | None:
+    """The function a `function_tool` wraps, found in the closures of its invoke callback."""
+    seen: set[int] = set()
+    pending: list[Any] = [tool.on_invoke_tool]
+    while pending:
+        func = pending.pop()
+        if id(func) in seen:
+            continue
+        seen.add(id(func))
+        code = getattr(func, "__code__", None)
+        for name, cell in zip(code.co_freevars if code else (), getattr(func, "__closure__", None) or ()):
+            try:
+                value = cell.cell_contents
+            except ValueError:
+                continue
+            if name == "the_func":
+                return value
+            if inspect.isfunction(value):
+                pending.append(value)
+    return None
+
+
+def guarded_tool(policy: ToolPolicy) -> Callable[[FunctionTool], FunctionTool]:
+    def decorate(tool: FunctionTool) -> FunctionTool:
+        if policy.deadline is not None or policy.idempotent:
+            func = _tool_function(tool)
+            if func is not None and not inspect.iscoroutinefunction(func):
+                raise TypeError(
+                    f"{tool.name} is a sync function_tool, it blocks the event loop and can be neither timed "
+                    "out nor hedged; build it with concurrent_function_tool or make it async"
+                )
+        stats = policy_stats.setdefault(tool.name, PolicyStats())
+        breaker = CircuitBreaker(policy.failure_threshold, policy.recovery_time)
+        last_good = TTLCache(maxsize=policy.remember_results)
+        invoke = tool.on_invoke_tool
+
+        async def degraded(ctx: RunContextWrapper[Any], arguments: str, key: str, error: Exception | None) -> Any:
+            """What to answer while the breaker is open: a remembered result, the fallback or an error."""
+            remembered = last_good.get(key, _NOT_FOUND)
+            if remembered is not _NOT_FOUND:
+                return remembered
+            if callable(policy.fallback):
+                result = policy.fallback(ctx, arguments)
+                return await result if inspect.isawaitable(result) else result
+            if policy.fallback is not None:
+                return policy.fallback
+            if error is None:
+                error = RuntimeError(f"{tool.name} is temporarily unavailable")
+            return default_tool_error_function(ctx, error)
+
+        async def call(ctx: RunContextWrapper[Any], arguments: str, span: Any) -> Any:
+            hedge_after = stats.quantile(policy.hedge_quantile) if policy.idempotent else None
+            if hedge_after is None or len(stats.latencies) < policy.hedge_min_samples:
+                return await invoke(ctx, arguments)
+
+            first = asyncio.ensure_future(invoke(ctx, arguments))
+            try:
+                done, _ = await asyncio.wait({first}, timeout=hedge_after)
+            except asyncio.CancelledError:
+                first.cancel()
+                raise
+            if done:
+                return first.result()
+            stats.hedged += 1
+            span.span_data.data["hedged"] = True
+            winner, result = await _first_of([first, asyncio.ensure_future(invoke(ctx, arguments))])
+            if winner == 1:
+                stats.hedge_wins += 1
+                span.span_data.data["hedge_won"] = True
+            return result
+
+        async def on_invoke_tool(ctx: RunContextWrapper[Any], arguments: str) -> Any:
+            key = canonical_arguments(arguments)
+            stats.calls += 1
+            with custom_span("tool_policy", data={"tool": tool.name, "breaker": breaker.state}) as span:
+                data = span.span_data.data
+                trial = breaker.state == "half_open"
+                if not breaker.allow():
+                    stats.short_circuited += 1
+                    data["outcome"] = "short_circuit"
+                    return await degraded(ctx, arguments, key, None)
+
+                started = time.perf_counter()
+                try:
+                    result = await asyncio.wait_for(call(ctx, arguments, span), policy.deadline)
+                except asyncio.TimeoutError:
+                    stats.timeouts += 1
+                    error: Exception = TimeoutError(f"{tool.name} did not answer within {policy.deadline}s")
+                    data["outcome"] = "timeout"
+                except Exception as e:
+                    stats.errors += 1
+                    error = e
+                    data["outcome"] = "error"
+                except BaseException:
+                    # Cancelled: no verdict on the backend, so a half-open breaker lets the next call try
+                    if trial:
+                        breaker.release()
+                    data["outcome"] = "cancelled"
+                    raise
+                else:
+                    elapsed = time.perf_counter() - started
+                    stats.latencies.append(elapsed)
+                    breaker.success()
+                    last_good.put(key, result)
+                    data["outcome"] = "ok"
+                    data["latency_ms"] = round(elapsed * 1000, 3)
+                    return result
+
+                if breaker.failure():
+                    stats.breaker_opened += 1
+                    data["breaker_opened"] = True
+                if breaker.state == "closed":
+                    # A single failure is not an unhealthy backend yet, let the model see the error
+                    return default_tool_error_function(ctx, error)
+                return await degraded(ctx, arguments, key, error)
+
+        return dataclasses.replace(tool, on_invoke_tool=on_invoke_tool)
+
+    return decorate
@@ -0,0 +1,102 @@
+"""
+Per-run memoization of dynamic `is_enabled` predicates.
+
+The runner calls every tool's `is_enabled` on every turn while building the request, so a predicate
+like `premium_feature_enabled` in `tool_dynamic_permission.py.py` runs (and prints) once per turn per
+tool although its answer only depends on the user's subscription tier. `stable_predicate` caches the
+answer per run and agent, and recomputes it only when one of the named context fields changes.
+
+    @stable_predicate(fields=("subscription_tier",))
+    def premium_feature_enabled(context: RunContextWrapper, agent: Agent) -> bool:
+        return context.context.subscription_tier in ["premium", "enterprise"]
+
+Without `fields` the answer is kept for the whole run. Async predicates work the same way, only a
+cache miss is awaited.
+"""
+from __future__ import annotations
+
+import functools
+import inspect
+import weakref
+from collections.abc import Mapping
+from dataclasses import dataclass
+from typing import Any, Callable
+
+from agents import Agent, RunContextWrapper
+
+Predicate = Callable[[RunContextWrapper[Any], Agent[Any]], Any]
+
+
+@dataclass
+class PredicateStats:
+    evaluations: int = 0
+    hits: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        calls = self.evaluations + self.hits
+        return self.hits / calls if calls else 0.0
+
+
+predicate_stats: dict[str, PredicateStats] = {}
+
+
+def field_value(context: Any, field: str) -> Any:
+    """A (dotted) attribute or key of the run context, made hashable."""
+    value = context
+    for part in field.split("."):
+        value = value[part] if isinstance(value, Mapping) else getattr(value, part, None)
+    try:
+        hash(value)
+    except TypeError:
+        return repr(value)
+    return value
+
+
+def stable_predicate(
+    predicate: Predicate | None = None, *, fields: tuple[str, ...] | None = None
+) -> Predicate | Callable[[Predicate], Predicate]:
+    """
+    Cache an `is_enabled` predicate per run and agent.
+
+    `fields` names the attributes (or keys, dotted for nested values) of the run context the answer
+    depends on. The cached answer is reused as long as all of them are unchanged.
+    """
+
+    def decorate(predicate: Predicate) -> Predicate:
+        stats = predicate_stats.setdefault(predicate.__qualname__, PredicateStats())
+        # id(run context) -> {(id(agent), field values): answer}, dropped when the run context goes away
+        runs: dict[int, dict[tuple[Any, ...], bool]] = {}
+
+        def answers_for(ctx: RunContextWrapper[Any]) -> dict[tuple[Any, ...], bool]:
+            answers = runs.get(id(ctx))
+            if answers is None:
+                answers = runs[id(ctx)] = {}
+                weakref.finalize(ctx, runs.pop, id(ctx), None)
+            return answers
+
+        @functools.wraps(predicate)
+        def wrapper(ctx: RunContextWrapper[Any], agent: Agent[Any]) -> Any:
+            answers = answers_for(ctx)
+            key = (id(agent), *(field_value(ctx.context, field) for field in fields or ()))
+            if key in answers:
+                stats.hits += 1
+                return answers[key]
+
+            stats.evaluations += 1
+            result = predicate(ctx, agent)
+            if not inspect.isawaitable(result):
+                answers[key] = bool(result)
+                return answers[key]
+
+            async def remember() -> bool:
+                answers[key] = bool(await result)
+                return answers[key]
+
+            return remember()
+
+        return wrapper
+
+    if predicate is not None:
+        return decorate(predicate)
+    return decorate
@@ -0,0 +1,231 @@
+"""
+A tool registry with a persistent JSON-schema cache.
+
+`@function_tool` builds the tool schema at import. It inspects the signature, parses the docstring,
+creates a pydantic model and runs `model_json_schema()` plus the strict-schema pass, for every tool
+on every start. `ToolRegistry.tool` keeps the finished schemas in a JSON file keyed by a hash of the
+function source, the source of the types its annotations refer to and the schema options. On a warm
+start the `FunctionTool` is created straight from the cache, and the real `function_tool` wrapper,
+which is still needed to validate arguments, is only built the first time the model calls the tool.
+
+    registry = ToolRegistry(Path(__file__).with_name(".tool_schemas.json"))
+
+    @registry.tool(name_override="Add_two_numbers", description_override="This tool add two numbers")
+    def calculator(a, b):
+        return a + b
+
+    registry.save()
+
+The cache file is only written by `save()`, to the path given, never implicitly. Without a path the
+registry keeps its schemas in memory.
+
+The registry also keeps each tool in Chat Completions form and the whole `tools` array pre-serialized
+(`tool_block`), for request builders that write the body themselves. `install_converter_cache`
+makes `OpenAIChatCompletionsModel` reuse the cached tool params instead of converting every tool on
+every request, until `uninstall_converter_cache`.
+"""
+from __future__ import annotations
+
+import hashlib
+import inspect
+import json
+import os
+import typing
+from dataclasses import dataclass
+from importlib.metadata import PackageNotFoundError, version
+from pathlib import Path
+from typing import Any, Callable
+
+from agents import FunctionTool, RunContextWrapper, function_tool
+
+from proj1.converter_hooks import add_tool_spec_lookup, remove_tool_spec_lookup
+
+try:
+    _SDK_VERSION = version("openai-agents")
+except PackageNotFoundError:
+    _SDK_VERSION = "unknown"
+
+# function_tool options that change the schema, the rest (failure handling, is_enabled) do not
+_SCHEMA_OPTIONS = ("name_override", "description_override", "docstring_style", "use_docstring_info", "strict_mode")
+
+
+@dataclass
+class RegistryStats:
+    schema_hits: int = 0
+    schema_misses: int = 0
+    deferred_builds: int = 0
+    """Tools whose `function_tool` wrapper was built on first call instead of at import."""
+
+
+def _referenced_types(annotation: Any, found: dict[str, type]) -> None:
+    """Collect the classes an annotation refers to, through generics and the fields of those classes."""
+    for arg in typing.get_args(annotation):
+        _referenced_types(arg, found)
+    origin = typing.get_origin(annotation)
+    if origin is not None:
+        _referenced_types(origin, found)
+        return
+    if not isinstance(annotation, type) or annotation.__module__ in ("builtins", "typing", "collections.abc"):
+        return
+    name = f"{annotation.__module__}.{annotation.__qualname__}"
+    if name in found:
+        return
+    found[name] = annotation
+    try:
+        hints = typing.get_type_hints(annotation, include_extras=True)
+    except Exception:
+        hints = {}
+    for hint in hints.values():
+        _referenced_types(hint, found)
+
+
+def _type_sources(func: Callable[..., Any]) -> list[str] | None:
+    """The source of every type the annotations of `func` use, None if they can't be resolved."""
+    try:
+        hints = typing.get_type_hints(func, include_extras=True)
+    except Exception:
+        return None
+    found: dict[str, type] = {}
+    for hint in hints.values():
+        _referenced_types(hint, found)
+    sources = []
+    for name, cls in sorted(found.items()):
+        try:
+            sources.append(inspect.getsource(cls))
+        except (OSError, TypeError):
+            # Compiled or dynamically created types, their name is all there is to go on
+            sources.append(name)
+    return sources
+
+
+def source_key(func: Callable[..., Any], options: dict[str, Any]) -> str | None:
+    """
+    Hash of the function source, the source of the types it refers to, the schema options and the SDK
+    version. None when the source or the annotations are not available, such a tool is not cached.
+    """
+    try:
+        source = inspect.getsource(func)
+    except (OSError, TypeError):
+        return None
+    type_sources = _type_sources(func)
+    if type_sources is None:
+        return None
+    relevant = {name: options[name] for name in _SCHEMA_OPTIONS if name in options}
+    payload = json.dumps([func.__module__, func.__qualname__, source, type_sources, relevant, _SDK_VERSION], default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class ToolRegistry:
+    def __init__(self, cache_path: str | Path | None = None):
+        self.cache_path = Path(cache_path) if cache_path is not None else None
+        self.tools: dict[str, FunctionTool] = {}
+        self.stats = RegistryStats()
+
+        self._schemas: dict[str, dict[str, Any]] = {}
+        self._params: dict[str, dict[str, Any]] = {}
+        self._blocks: dict[tuple[str, ...], bytes] = {}
+        self._dirty = False
+        if self.cache_path is not None and self.cache_path.exists():
+            try:
+                cached = json.loads(self.cache_path.read_text(encoding="utf-8"))
+                self._schemas = cached.get("schemas", {}) if cached.get("sdk") == _SDK_VERSION else {}
+            except (OSError, ValueError):
+                self._schemas = {}
+
+    def tool(self, func: Callable[..., Any] | None = None, **function_tool_kwargs: Any) -> Any:
+        """Drop-in for `@function_tool` (with or without arguments) that registers the tool."""
+
+        def decorate(f: Callable[..., Any]) -> FunctionTool:
+            return self.register(f, **function_tool_kwargs)
+
+        if func is not None:
+            return decorate(func)
+        return decorate
+
+    def register(self, func: Callable[..., Any], **function_tool_kwargs: Any) -> FunctionTool:
+        key = source_key(func, function_tool_kwargs)
+        cached = self._schemas.get(key) if key is not None else None
+        if cached is None:
+            self.stats.schema_misses += 1
+            tool = function_tool(func, **function_tool_kwargs)
+            if key is not None:
+                self._schemas[key] = {
+                    "name": tool.name,
+                    "description": tool.description,
+                    "params_json_schema": tool.params_json_schema,
+                    "strict_json_schema": tool.strict_json_schema,
+                }
+                self._dirty = True
+        else:
+            self.stats.schema_hits += 1
+            tool = self._deferred_tool(func, function_tool_kwargs, cached)
+
+        self.tools[tool.name] = tool
+        self._params.pop(tool.name, None)
+        self._blocks.clear()
+        return tool
+
+    def _deferred_tool(
+        self, func: Callable[..., Any], function_tool_kwargs: dict[str, Any], cached: dict[str, Any]
+    ) -> FunctionTool:
+        built: FunctionTool | None = None
+
+        async def on_invoke_tool(ctx: RunContextWrapper[Any], arguments: str) -> Any:
+            nonlocal built
+            if built is None:
+                self.stats.deferred_builds += 1
+                built = function_tool(func, **function_tool_kwargs)
+            return await built.on_invoke_tool(ctx, arguments)
+
+        return FunctionTool(
+            name=cached["name"],
+            description=cached["description"],
+            params_json_schema=cached["params_json_schema"],
+            on_invoke_tool=on_invoke_tool,
+            strict_json_schema=cached["strict_json_schema"],
+            is_enabled=function_tool_kwargs.get("is_enabled", True),
+        )
+
+    def save(self) -> None:
+        """Write the schema cache if anything changed, atomically so a crash can't leave half a file."""
+        if not self._dirty or self.cache_path is None:
+            return
+        tmp = self.cache_path.with_name(self.cache_path.name + ".tmp")
+        tmp.write_text(json.dumps({"sdk": _SDK_VERSION, "schemas": self._schemas}), encoding="utf-8")
+        os.replace(tmp, self.cache_path)
+        self._dirty = False
+
+    def tool_param(self, tool: Any) -> dict[str, Any] | None:
+        """The Chat Completions form of a registered tool, built once. None for foreign tools."""
+        if not isinstance(tool, FunctionTool) or self.tools.get(tool.name) is not tool:
+            return None
+        param = self._params.get(tool.name)
+        if param is None:
+            param = self._params[tool.name] = {
+                "type": "function",
+                "function": {
+                    "name": tool.name,
+                    "description": tool.description or "",
+                    "parameters": tool.params_json_schema,
+                },
+            }
+        return param
+
+    def tool_block(self, names: list[str] | None = None) -> bytes:
+        """The `tools` array of a request as JSON bytes, serialized once per set of tools."""
+        key = tuple(names) if names is not None else tuple(self.tools)
+        block = self._blocks.get(key)
+        if block is None:
+            params = [self.tool_param(self.tools[name]) for name in key]
+            block = self._blocks[key] = json.dumps(params, separators=(",", ":")).encode()
+        return block
+
+
+def install_converter_cache(registry: ToolRegistry) -> None:
+    """Make the Chat Completions converter return the registry's cached params for its tools, once per registry."""
+    add_tool_spec_lookup(registry.tool_param)
+
+
+def uninstall_converter_cache(registry: ToolRegistry) -> None:
+    """Let the converter build the params of the registry's tools itself again."""
+    remove_tool_spec_lookup(registry.tool_param)
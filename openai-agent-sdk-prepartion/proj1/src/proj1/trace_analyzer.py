@@ -0,0 +1,281 @@
+"""
+Critical-path and flame-graph analysis of agent traces.
+
+Collect the spans of a run (for example `run_multi_agent_demo` in
+`Api-Refrence/tracing/example.py`) with `CollectingTraceProcessor`, then build span trees and find out
+whether the time went to model generation, tool execution, guardrails or handoffs.
+
+    processor = CollectingTraceProcessor()
+    set_trace_processors([processor])
+    ... run agents ...
+    for tree in processor.trees():
+        print(format_summary(tree))
+        write_collapsed_stacks([tree], "run.folded")   # flamegraph.pl run.folded > run.svg
+"""
+from __future__ import annotations
+
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Iterable
+
+from agents.tracing import Span, Trace, TracingProcessor
+
+
+def _parse_time(value: str | None) -> float | None:
+    # The SDK stores span times as ISO-8601 strings (see agents.tracing.util.time_iso)
+    if value is None:
+        return None
+    return datetime.fromisoformat(value).timestamp()
+
+
+def span_label(span_data: dict[str, Any]) -> str:
+    """Return a short `type:name` label for an exported span_data dict."""
+    kind = span_data.get("type", "span")
+    if kind == "handoff":
+        return f"handoff:{span_data.get('from_agent')}->{span_data.get('to_agent')}"
+    if kind == "generation":
+        return f"generation:{span_data.get('model') or 'model'}"
+    name = span_data.get("name")
+    return f"{kind}:{name}" if name else kind
+
+
+@dataclass
+class SpanNode:
+    span_id: str
+    parent_id: str | None
+    label: str
+    kind: str
+    start: float
+    end: float
+    children: list[SpanNode] = field(default_factory=list)
+
+    @property
+    def duration(self) -> float:
+        return max(0.0, self.end - self.start)
+
+    @property
+    def child_time(self) -> float:
+        """Wall time covered by children, clipped to this span. Overlapping children count once."""
+        intervals = sorted(
+            (max(c.start, self.start), min(c.end, self.end)) for c in self.children
+        )
+        covered = 0.0
+        cur_start = cur_end = None
+        for s, e in intervals:
+            if e <= s:
+                continue
+            if cur_end is None or s > cur_end:
+                if cur_end is not None:
+                    covered += cur_end - cur_start
+                cur_start, cur_end = s, e
+            else:
+                cur_end = max(cur_end, e)
+        if cur_end is not None:
+            covered += cur_end - cur_start
+        return covered
+
+    @property
+    def self_time(self) -> float:
+        return max(0.0, self.duration - self.child_time)
+
+    def walk(self, stack: tuple[str, ...] = ()) -> Iterable[tuple[tuple[str, ...], SpanNode]]:
+        stack = stack + (self.label,)
+        yield stack, self
+        for child in self.children:
+            yield from child.walk(stack)
+
+
+def build_span_trees(spans: Iterable[Span[Any] | dict[str, Any]], trace_name: str = "trace") -> list[SpanNode]:
+    """
+    Build one tree per trace from SDK spans or their `export()` dicts.
+
+    Spans without a parent are hung under a synthetic trace root that covers all of them, so a
+    trace always has a single root. Spans that have not finished yet are skipped.
+    """
+    by_trace: dict[str, list[dict[str, Any]]] = defaultdict(list)
+    for span in spans:
+        exported = span if isinstance(span, dict) else span.export()
+        if not exported or exported.get("ended_at") is None or exported.get("started_at") is None:
+            continue
+        by_trace[exported["trace_id"]].append(exported)
+
+    trees = []
+    for trace_id, exported_spans in by_trace.items():
+        nodes: dict[str, SpanNode] = {}
+        for exported in exported_spans:
+            span_data = exported.get("span_data") or {}
+            nodes[exported["id"]] = SpanNode(
+                span_id=exported["id"],
+                parent_id=exported.get("parent_id"),
+                label=span_label(span_data),
+                kind=span_data.get("type", "span"),
+                start=_parse_time(exported["started_at"]),
+                end=_parse_time(exported["ended_at"]),
+            )
+
+        root = SpanNode(
+            span_id=trace_id,
+            parent_id=None,
+            label=f"trace:{trace_name}",
+            kind="trace",
+            start=min(n.start for n in nodes.values()),
+            end=max(n.end for n in nodes.values()),
+        )
+        for node in nodes.values():
+            parent = nodes.get(node.parent_id) if node.parent_id else None
+            (parent or root).children.append(node)
+        for node in [root, *nodes.values()]:
+            node.children.sort(key=lambda n: n.start)
+        trees.append(root)
+    return trees
+
+
+def critical_path(node: SpanNode) -> list[SpanNode]:
+    """
+    Return the chain of spans that determined the end-to-end latency of `node`.
+
+    Walks backwards from the end of the span, each time picking the child that finished last
+    before the cursor, then continues from that child's start. Parallel children that finished
+    earlier are off the critical path.
+    """
+    chosen = []
+    cursor = node.end
+    remaining = list(node.children)
+    while remaining:
+        candidates = [c for c in remaining if c.end <= cursor + 1e-9]
+        if not candidates:
+            break
+        child = max(candidates, key=lambda c: c.end)
+        chosen.append(child)
+        cursor = child.start
+        remaining = [c for c in remaining if c.end <= cursor + 1e-9]
+
+    path = [node]
+    for child in reversed(chosen):
+        path.extend(critical_path(child))
+    return path
+
+
+def collapsed_stacks(trees: Iterable[SpanNode]) -> dict[str, int]:
+    """Aggregate self-time per stack in microseconds, keyed by `a;b;c` as flamegraph.pl expects."""
+    folded: dict[str, int] = defaultdict(int)
+    for tree in trees:
+        for stack, node in tree.walk():
+            micros = int(round(node.self_time * 1_000_000))
+            if micros > 0:
+                folded[";".join(frame.replace(";", ",").replace(" ", "_") for frame in stack)] += micros
+    return dict(folded)
+
+
+def write_collapsed_stacks(trees: Iterable[SpanNode], path: str) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        for stack, micros in sorted(collapsed_stacks(trees).items()):
+            f.write(f"{stack} {micros}\n")
+
+
+def top_time_sinks(trees: Iterable[SpanNode], limit: int = 10) -> list[tuple[str, float, int]]:
+    """Return `(label, total_self_time, count)` sorted by self time, largest first."""
+    totals: dict[str, list[float]] = defaultdict(lambda: [0.0, 0])
+    for tree in trees:
+        for _, node in tree.walk():
+            totals[node.label][0] += node.self_time
+            totals[node.label][1] += 1
+    ranked = sorted(totals.items(), key=lambda kv: kv[1][0], reverse=True)
+    return [(label, total, int(count)) for label, (total, count) in ranked[:limit]]
+
+
+def time_by_kind(trees: Iterable[SpanNode]) -> dict[str, float]:
+    """Self time grouped by span type (generation, function, guardrail, handoff, agent, ...)."""
+    totals: dict[str, float] = defaultdict(float)
+    for tree in trees:
+        for _, node in tree.walk():
+            totals[node.kind] += node.self_time
+    return dict(totals)
+
+
+def format_summary(tree: SpanNode, limit: int = 10) -> str:
+    lines = [f"{tree.label}  total {tree.duration * 1000:.1f} ms"]
+
+    lines.append("\nTime by span type (self time):")
+    for kind, seconds in sorted(time_by_kind([tree]).items(), key=lambda kv: kv[1], reverse=True):
+        share = seconds / tree.duration * 100 if tree.duration else 0.0
+        lines.append(f"  {kind:<12} {seconds * 1000:>10.1f} ms  {share:5.1f}%")
+
+    lines.append(f"\nTop {limit} time sinks (self time):")
+    for label, seconds, count in top_time_sinks([tree], limit):
+        lines.append(f"  {seconds * 1000:>10.1f} ms  x{count:<3} {label}")
+
+    lines.append("\nCritical path:")
+    for node in critical_path(tree):
+        lines.append(
+            f"  {node.label:<40} {node.duration * 1000:>10.1f} ms  (self {node.self_time * 1000:.1f} ms)"
+        )
+    return "\n".join(lines)
+
+
+class CollectingTraceProcessor(TracingProcessor):
+    """Keeps finished spans in memory, grouped by trace, so they can be analyzed after the run."""
+
+    def __init__(self):
+        self.trace_names: dict[str, str] = {}
+        self.spans: dict[str, list[dict[str, Any]]] = defaultdict(list)
+
+    def on_trace_start(self, trace: Trace) -> None:
+        self.trace_names[trace.trace_id] = trace.name
+
+    def on_trace_end(self, trace: Trace) -> None:
+        pass
+
+    def on_span_start(self, span: Span[Any]) -> None:
+        pass
+
+    def on_span_end(self, span: Span[Any]) -> None:
+        exported = span.export()
+        if exported:
+            self.spans[span.trace_id].append(exported)
+
+    def trees(self) -> list[SpanNode]:
+        trees = []
+        for trace_id, spans in self.spans.items():
+            trees.extend(build_span_trees(spans, self.trace_names.get(trace_id, trace_id)))
+        return trees
+
+    def force_flush(self) -> None:
+        pass
+
+    def shutdown(self) -> None:
+        pass
+
+
+def main():
+    import time
+    from agents.tracing import agent_span, function_span, generation_span, guardrail_span, set_trace_processors, trace
+
+    processor = CollectingTraceProcessor()
+    set_trace_processors([processor])
+
+    # Simulated multi-agent run, same shape as run_multi_agent_demo: guardrail, generation, handoff, tool
+    with trace("Simulated multi-agent run"):
+        with agent_span("panacloud_agent"):
+            with guardrail_span("safety_input_guardrail"):
+                time.sleep(0.01)
+            with generation_span(model="gemini-2.0-flash"):
+                time.sleep(0.05)
+        with agent_span("MathSpecialist"):
+            with generation_span(model="gemini-2.0-flash"):
+                time.sleep(0.04)
+            with function_span("calculate_math", input='{"expression": "(15 + 7) * 3"}'):
+                time.sleep(0.02)
+            with generation_span(model="gemini-2.0-flash"):
+                time.sleep(0.03)
+
+    trees = processor.trees()
+    for tree in trees:
+        print(format_summary(tree))
+    write_collapsed_stacks(trees, "agent_trace.folded")
+    print("\nCollapsed stacks written to agent_trace.folded")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+"""
+Token usage accounting across nested runs, with per-request budgets.
+
+Each `Runner.run` counts usage in its own `RunContextWrapper`, so the tokens spent by an `as_tool()`
+agent, a guardrail agent or a second run in the same request never show up in one place, and a flow
+like `story_api.py`'s three runs has no overall limit. A `UsageLedger` is activated around a request
+and every model call made while it is active, including those of nested runs and guardrails (they
+run in tasks that inherit the caller's context), is recorded in it by `MeteredModel`.
+
+    model = MeteredModel(OpenAIChatCompletionsModel(model="gemini-2.0-flash", openai_client=client))
+
+    with UsageLedger("/generate-story", max_tokens=20_000, max_cost=0.01).activate() as ledger:
+        result = await Runner.run(story_outline_agent, prompt, run_config=config)
+    print(ledger.report())
+
+Once a budget is used up the next model call raises `BudgetExceeded` instead of starting another turn,
+and the run stops there. A stream that is cancelled or fails before its `ResponseCompletedEvent` never
+reports its usage, so its tokens are not in the totals, such calls are counted in `interrupted`. When
+a ledger is deactivated its totals are added to `endpoint_usage`, and `export_metrics()` renders
+those in the Prometheus text format.
+"""
+from __future__ import annotations
+
+import contextvars
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Iterator
+
+from agents import AgentsException, Model, ModelResponse, Usage
+from openai.types.responses import ResponseCompletedEvent
+
+PRICES: dict[str, tuple[float, float, float]] = {
+    "gemini-2.0-flash": (0.10, 0.025, 0.40),
+    "gemini-2.0-flash-lite": (0.075, 0.01875, 0.30),
+    "gpt-4o": (2.50, 1.25, 10.00),
+    "gpt-4o-mini": (0.15, 0.075, 0.60),
+}
+"""USD per 1M tokens: input, cached input, output."""
+
+_current: contextvars.ContextVar[UsageLedger | None] = contextvars.ContextVar("usage_ledger", default=None)
+
+
+class BudgetExceeded(AgentsException):
+    def __init__(self, ledger: UsageLedger, reason: str):
+        self.ledger = ledger
+        super().__init__(f"{ledger.endpoint}: {reason}")
+
+
+@dataclass
+class UsageTotals:
+    requests: int = 0
+    input_tokens: int = 0
+    cached_tokens: int = 0
+    output_tokens: int = 0
+    cost: float = 0.0
+
+    @property
+    def total_tokens(self) -> int:
+        return self.input_tokens + self.output_tokens
+
+    def add(self, other: UsageTotals) -> None:
+        self.requests += other.requests
+        self.input_tokens += other.input_tokens
+        self.cached_tokens += other.cached_tokens
+        self.output_tokens += other.output_tokens
+        self.cost += other.cost
+
+
+@dataclass
+class EndpointUsage(UsageTotals):
+    runs: int = 0
+    budget_stops: int = 0
+    by_model: dict[str, UsageTotals] = field(default_factory=dict)
+
+
+endpoint_usage: dict[str, EndpointUsage] = {}
+_endpoint_lock = threading.Lock()
+
+
+def current_ledger() -> UsageLedger | None:
+    return _current.get()
+
+
+class UsageLedger:
+    def __init__(
+        self,
+        endpoint: str = "default",
+        max_tokens: int | None = None,
+        max_cost: float | None = None,
+        prices: dict[str, tuple[float, float, float]] | None = None,
+    ):
+        self.endpoint = endpoint
+        self.max_tokens = max_tokens
+        self.max_cost = max_cost
+        self.prices = PRICES if prices is None else prices
+        self.totals = UsageTotals()
+        self.by_model: dict[str, UsageTotals] = {}
+        self.by_label: dict[str, UsageTotals] = {}
+        self.interrupted = 0
+        """Streamed calls that ended before reporting their usage, their tokens are missing."""
+        self.stopped: str | None = None
+
+    def record(self, model_name: str, usage: Usage, label: str | None = None) -> None:
+        cached = usage.input_tokens_details.cached_tokens if usage.input_tokens_details else 0
+        entry = UsageTotals(
+            requests=usage.requests or 1,
+            input_tokens=usage.input_tokens,
+            cached_tokens=cached or 0,
+            output_tokens=usage.output_tokens,
+        )
+        input_price, cached_price, output_price = self.prices.get(model_name, (0.0, 0.0, 0.0))
+        entry.cost = (
+            (entry.input_tokens - entry.cached_tokens) * input_price
+            + entry.cached_tokens * cached_price
+            + entry.output_tokens * output_price
+        ) / 1_000_000
+        self.totals.add(entry)
+        self.by_model.setdefault(model_name, UsageTotals()).add(entry)
+        if label is not None:
+            self.by_label.setdefault(label, UsageTotals()).add(entry)
+
+    def remaining_tokens(self) -> int | None:
+        return None if self.max_tokens is None else max(self.max_tokens - self.totals.total_tokens, 0)
+
+    def check(self) -> None:
+        """Raise `BudgetExceeded` if another model call would go over a budget."""
+        if self.max_tokens is not None and self.totals.total_tokens >= self.max_tokens:
+            self.stopped = f"token budget of {self.max_tokens} used up ({self.totals.total_tokens} tokens)"
+        elif self.max_cost is not None and self.totals.cost >= self.max_cost:
+            self.stopped = f"cost budget of ${self.max_cost:.4f} used up (${self.totals.cost:.4f})"
+        if self.stopped:
+            raise BudgetExceeded(self, self.stopped)
+
+    @contextmanager
+    def activate(self) -> Iterator[UsageLedger]:
+        """Record every model call made in this context, then publish the totals to `endpoint_usage`."""
+        token = _current.set(self)
+        try:
+            yield self
+        finally:
+            _current.reset(token)
+            self._publish()
+
+    def _publish(self) -> None:
+        with _endpoint_lock:
+            usage = endpoint_usage.setdefault(self.endpoint, EndpointUsage())
+            usage.runs += 1
+            usage.budget_stops += 1 if self.stopped else 0
+            usage.add(self.totals)
+            for model_name, totals in self.by_model.items():
+                usage.by_model.setdefault(model_name, UsageTotals()).add(totals)
+
+    def report(self) -> str:
+        t = self.totals
+        lines = [
+            f"{self.endpoint}: {t.requests} model calls, {t.input_tokens} input ({t.cached_tokens} cached), "
+            f"{t.output_tokens} output tokens, ${t.cost:.6f}"
+        ]
+        for model_name, m in self.by_model.items():
+            lines.append(f"  {model_name}: {m.requests} calls, {m.total_tokens} tokens, ${m.cost:.6f}")
+        for label, m in self.by_label.items():
+            lines.append(f"  via {label}: {m.requests} calls, {m.total_tokens} tokens, ${m.cost:.6f}")
+        if self.interrupted:
+            lines.append(f"  interrupted: {self.interrupted} streamed calls without reported usage")
+        if self.stopped:
+            lines.append(f"  stopped: {self.stopped}")
+        return "\n".join(lines)
+
+
+class MeteredModel(Model):
+    """
+    Wraps a model so each call is checked against and recorded in the active ledger.
+
+    `as_tool()` runs its agent without the caller's `run_config`, so a nested agent only goes through
+    the ledger when its own `model=` is metered. `labelled()` gives it a copy that also reports its
+    calls separately in `UsageLedger.by_label`.
+    """
+
+    def __init__(self, model: Model, name: str | None = None, label: str | None = None):
+        self.model = model
+        self.name = name or str(getattr(model, "model", type(model).__name__))
+        self.label = label
+
+    def labelled(self, label: str) -> MeteredModel:
+        return MeteredModel(self.model, self.name, label)
+
+    async def get_response(self, *args: Any, **kwargs: Any) -> ModelResponse:
+        ledger = _current.get()
+        if ledger is not None:
+            ledger.check()
+        response = await self.model.get_response(*args, **kwargs)
+        if ledger is not None:
+            ledger.record(self.name, response.usage, self.label)
+        return response
+
+    async def stream_response(self, *args: Any, **kwargs: Any) -> AsyncIterator[Any]:
+        ledger = _current.get()
+        if ledger is not None:
+            ledger.check()
+        completed = False
+        try:
+            async for event in self.model.stream_response(*args, **kwargs):
+                if isinstance(event, ResponseCompletedEvent):
+                    completed = True
+                    if ledger is not None and event.response.usage:
+                        usage = event.response.usage
+                        ledger.record(
+                            self.name,
+                            Usage(
+                                requests=1,
+                                input_tokens=usage.input_tokens,
+                                input_tokens_details=usage.input_tokens_details,
+                                output_tokens=usage.output_tokens,
+                                output_tokens_details=usage.output_tokens_details,
+                                total_tokens=usage.total_tokens,
+                            ),
+                            self.label,
+                        )
+                yield event
+        finally:
+            if ledger is not None and not completed:
+                ledger.interrupted += 1
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def export_metrics() -> str:
+    """Per-endpoint usage in the Prometheus text exposition format."""
+    lines = [
+        "# TYPE agent_runs_total counter",
+        "# TYPE agent_budget_stops_total counter",
+        "# TYPE agent_model_requests_total counter",
+        "# TYPE agent_tokens_total counter",
+        "# TYPE agent_cost_usd_total counter",
+    ]
+    with _endpoint_lock:
+        for endpoint, usage in sorted(endpoint_usage.items()):
+            e = f'endpoint="{_label(endpoint)}"'
+            lines.append(f"agent_runs_total{{{e}}} {usage.runs}")
+            lines.append(f"agent_budget_stops_total{{{e}}} {usage.budget_stops}")
+            for model_name, m in sorted(usage.by_model.items()):
+                labels = f'{e},model="{_label(model_name)}"'
+                lines.append(f"agent_model_requests_total{{{labels}}} {m.requests}")
+                lines.append(f'agent_tokens_total{{{labels},kind="input"}} {m.input_tokens - m.cached_tokens}')
+                lines.append(f'agent_tokens_total{{{labels},kind="cached"}} {m.cached_tokens}')
+                lines.append(f'agent_tokens_total{{{labels},kind="output"}} {m.output_tokens}')
+                lines.append(f"agent_cost_usd_total{{{labels}}} {m.cost:.8f}")
+    return "\n".join(lines) + "\n"